@@ -1221,7 +1221,9 @@ class CppGenerator(AbstractCppGenerator):
   def genValueWrite(self, var, fty, options, level=0):
     iteratorName = 'it' if level == 0 else 'i' + str(level)
     fkind = fty.typeId()
-    fixedParam = ', true' if options.isFixed() else ''
+    fixedParam = ''
+    if fkind in (types.TypeKind.LIST, types.TypeKind.SET) and self.isPackable(fty, options):
+      fixedParam = ', ' + str(self.bitsOf(types.unmodified(fty.getElementType())))
     if fkind == types.TypeKind.BOOL:
       self.writeLnFmt("encoder->writeBoolean({0});", var)
     elif fkind == types.TypeKind.INTEGER:
@@ -1278,6 +1280,20 @@ class CppGenerator(AbstractCppGenerator):
     else:
       assert False, 'Illegal type kind: ' + str(fkind)
 
+  def isPackable(self, fty, options):
+    '''Return true if 'fty' is a list or set type that should be written as a packed
+       list - that is, a [fixed] collection of integers, floats or doubles.'''
+    return options.isFixed() and types.unmodified(fty.getElementType()).typeId() in (
+        types.TypeKind.INTEGER, types.TypeKind.FLOAT, types.TypeKind.DOUBLE)
+
+  def bitsOf(self, ty):
+    '''Return the width in bits of a fixed-width numeric type.'''
+    if ty.typeId() == types.TypeKind.FLOAT:
+      return 32
+    elif ty.typeId() == types.TypeKind.DOUBLE:
+      return 64
+    return ty.getBits()
+
   def formatOptions(self, opts):
     def setOptionValues(opts, struct):
       if struct.getBaseType():
@@ -208,6 +208,26 @@ class Python3Generator(genbase.CodeGenerator):
       self.checkTypes = options.checkTypes in ['True', 'true', 'yes', 1]
     else:
       self.checkTypes = False
+    if 'binaryReaders' in options:
+      self.binaryReaders = options.binaryReaders in ['True', 'true', 'yes', 1]
+    else:
+      self.binaryReaders = False
+    if 'binaryWriters' in options:
+      self.binaryWriters = options.binaryWriters in ['True', 'true', 'yes', 1]
+    else:
+      self.binaryWriters = False
+    if 'lazyFields' in options:
+      self.lazyFields = options.lazyFields in ['True', 'true', 'yes', 1]
+    else:
+      self.lazyFields = False
+    if 'compactLayout' in options:
+      self.compactLayout = options.compactLayout in ['True', 'true', 'yes', 1]
+    else:
+      self.compactLayout = False
+    if 'materializeBytes' in options:
+      self.materializeBytes = options.materializeBytes in ['True', 'true', 'yes', 1]
+    else:
+      self.materializeBytes = False
 
   def calcSourcePath(self, fd, options, decl):
     '''@type fd: coda.descriptors.FileDescriptor
@@ -319,6 +339,10 @@ class Python3Generator(genbase.CodeGenerator):
       self.unindent()
       self.writeLn(']')
       self.writeLn()
+    elif self.compactLayout:
+      # Without slots, each instance would have a __dict__.
+      self.writeLn('__slots__ = ()')
+      self.writeLn()
     self.unindent()
 
   def genStructMetadata(self, fd, struct):
@@ -398,7 +422,14 @@ class Python3Generator(genbase.CodeGenerator):
     self.genEqualsMethod(fd, struct)
     self.genHashMethod(fd, struct)
     self.genFreezeMethod(fd, struct)
+    self.genCloneMethod(fd, struct)
     self.genWriteMethods(fd, struct)
+    if self.binaryWriters:
+      self.genBinaryWriteMethod(fd, struct)
+    if self.binaryReaders:
+      self.genBinaryReadMethod(fd, struct)
+    if self.lazyFields:
+      self.genLoadLazyMethod(fd, struct)
     self.genMergeMethod(fd, struct)
 
   def genEqualsMethod(self, fd, struct):
@@ -415,7 +446,8 @@ class Python3Generator(genbase.CodeGenerator):
         for field in struct.getFields():
           self.write(' and\n')
           self.writeIndent()
-          self.write('self._{0} == other._{0}'.format(field.getName()))
+          self.write('{0} == {1}'.format(
+              self.fieldValue(field), self.fieldValue(field, 'other')))
         self.unindent()
         self.write(')')
         self.writeLn()
@@ -439,13 +471,26 @@ class Python3Generator(genbase.CodeGenerator):
       for field in struct.getFields():
         self.write(',\n')
         self.writeIndent()
-        self.write('self._{0}'.format(field.getName()))
+        self.write(self.fieldValue(field))
       self.write('))')
       self.unindent()
       self.writeLn()
       self.unindent()
       self.writeLn()
 
+  def freezeElementLines(self, values, elementType):
+    '''Return the lines that freeze the objects in 'values' if they are structs.'''
+    if elementType.typeId() == types.TypeKind.MODIFIED:
+      elementType = elementType.getElementType()
+    if elementType.typeId() != types.TypeKind.STRUCT or self.useCompareByReference(elementType):
+      return []
+    return [
+      'if deep:',
+      '  for v in {0}:'.format(values),
+      '    if v is not None and v.isMutable():',
+      '      v._freezeInto(deep)',
+    ]
+
   def genFreezeMethod(self, fd, struct):
     # Freezing
     if struct.getFields():
@@ -459,29 +504,60 @@ class Python3Generator(genbase.CodeGenerator):
           ftype = ftype.getElementType()
         shared |= self.isSharedType(ftype)
         fkind = ftype.typeId()
-        if fkind == types.TypeKind.LIST:
-          # Ooops, we forgot to freeze the objects referenced here.
+        if self.isLazyField(field):
+          lines.extend(self.lazyLoadLines(fname))
+        if fkind in (types.TypeKind.LIST, types.TypeKind.SET) and \
+            self.isMaterialized(ftype.getElementType()):
+          # Replace bytes views with bytes.
+          lines.append('self._{0} = {1}({2} for v in self._{0})'.format(
+              fname, 'tuple' if fkind == types.TypeKind.LIST else 'frozenset',
+              self.materializedValue('v')))
+        elif fkind == types.TypeKind.MAP and (self.isMaterialized(ftype.getKeyType()) or
+            self.isMaterialized(ftype.getValueType())):
+          key = self.materializedValue('k') if self.isMaterialized(ftype.getKeyType()) else 'k'
+          value = self.materializedValue('v') if self.isMaterialized(ftype.getValueType()) else 'v'
+          lines.append(
+              'self._{0} = coda.runtime.FrozenDict(({1}, {2}) for k, v in self._{0}.items())'.format(
+                  fname, key, value))
+        elif fkind == types.TypeKind.LIST:
           lines.append('if type(self._{0}) is not tuple:'.format(fname))
           lines.append('  self._{0} = tuple(self._{0})'.format(fname))
         elif fkind == types.TypeKind.SET:
-          # Ooops, we forgot to freeze the objects referenced here.
           lines.append('if type(self._{0}) is not frozenset:'.format(fname))
-          lines.append('  self._{0} = frozenset(self._{0})'.format(fname))
+          if self.compactLayout:
+            # Empty collections share a single empty instance.
+            lines.append(
+                '  self._{0} = frozenset(self._{0}) if self._{0} else '
+                'coda.runtime.Object.EMPTY_SET'.format(fname))
+          else:
+            lines.append('  self._{0} = frozenset(self._{0})'.format(fname))
         elif fkind == types.TypeKind.MAP:
-          # Ooops, we forgot to freeze the objects referenced here.
           lines.append(
               'if type(self._{0}) is not coda.runtime.FrozenDict:'.format(
                   fname))
-          lines.append(
-              '  self._{0} = coda.runtime.FrozenDict(self._{0})'.format(fname))
+          if self.compactLayout:
+            lines.append(
+                '  self._{0} = coda.runtime.FrozenDict(self._{0}) if self._{0} else '
+                'coda.runtime.Object.EMPTY_MAP'.format(fname))
+          else:
+            lines.append(
+                '  self._{0} = coda.runtime.FrozenDict(self._{0})'.format(fname))
+        elif fkind == types.TypeKind.BYTES and self.materializeBytes:
+          lines.append('if type(self._{0}) is memoryview:'.format(fname))
+          lines.append('  self._{0} = bytes(self._{0})'.format(fname))
         elif fkind == types.TypeKind.STRUCT:
           if field.getOptions().isNullable() or shared:
             if not self.useCompareByReference(ftype):
               lines.append('if deep and self._{0} and self._{0}.isMutable():'.format(fname))
-              lines.append('  self._{0}.freeze(deep)'.format(fname))
+              lines.append('  self._{0}._freezeInto(deep)'.format(fname))
           else:
             lines.append('if deep and self._{0}.isMutable():'.format(fname))
-            lines.append('  self._{0}.freeze(deep)'.format(fname))
+            lines.append('  self._{0}._freezeInto(deep)'.format(fname))
+        if fkind in (types.TypeKind.LIST, types.TypeKind.SET):
+          lines.extend(self.freezeElementLines('self._' + fname, ftype.getElementType()))
+        elif fkind == types.TypeKind.MAP:
+          lines.extend(self.freezeElementLines(
+              'self._{0}.values()'.format(fname), ftype.getValueType()))
       if lines:
         self.writeLn('def _freezeImpl(self, deep=True):')
         self.indent()
@@ -491,12 +567,96 @@ class Python3Generator(genbase.CodeGenerator):
         self.unindent()
         self.writeLn()
 
+  def genCloneMethod(self, fd, struct):
+    '''Generate a _cloneImpl() method, which copies the fields of this struct to a new
+       instance. Containers are copied, and the structs they hold and the structs in
+       fields are copied through the memo table, unless they are frozen or compared by
+       reference. A deferred field that has not been loaded yet gets a new placeholder
+       for the same data, since a placeholder caches its value when loaded. Deferred
+       values that contain shared structs are loaded instead, so that the copies of
+       the structs stay shared.'''
+    if not struct.getFields():
+      return
+    self.writeLn('def _cloneImpl(self, memo):')
+    self.indent()
+    self.writeLn('result = super()._cloneImpl(memo)')
+    for field in struct.getFields():
+      fname = field.getName()
+      ftype = types.unmodified(field.getType())
+      fkind = ftype.typeId()
+      value = 'self._' + fname
+      lazy = self.isLazyField(field)
+      # The first use of the value goes through the getter, which replaces a loaded
+      # placeholder with its value.
+      loaded = self.fieldValue(field)
+      if fkind == types.TypeKind.LIST:
+        lazy = lazy and not self.isSharedValue(ftype.getElementType())
+        if self.isClonedStruct(ftype.getElementType()):
+          copied = '[v._clone(memo) for v in {0}]'.format(value)
+        else:
+          copied = 'list({0})'.format(value)
+        empty = 'coda.runtime.Object.EMPTY_LIST'
+      elif fkind == types.TypeKind.SET:
+        # Set members are hashable, so structs in sets are frozen.
+        copied = 'set({0})'.format(value)
+        empty = 'coda.runtime.Object.EMPTY_SET'
+      elif fkind == types.TypeKind.MAP:
+        lazy = lazy and not self.isSharedValue(ftype.getValueType())
+        if self.isClonedStruct(ftype.getValueType()):
+          copied = '{{k: v._clone(memo) for k, v in {0}.items()}}'.format(value)
+        else:
+          copied = 'dict({0})'.format(value)
+        empty = 'coda.runtime.Object.EMPTY_MAP'
+      elif fkind == types.TypeKind.STRUCT and self.isClonedStruct(ftype):
+        shared = self.isSharedValue(field.getType())
+        lazy = lazy and not shared
+        if field.getOptions().isNullable() or shared:
+          copied = '{0} and {1}._clone(memo)'.format(loaded, value)
+        else:
+          copied = '{0}._clone(memo)'.format(loaded)
+        empty = None
+      elif lazy:
+        # Structs that are compared by reference are shared.
+        copied = loaded
+        empty = None
+      else:
+        self.writeLnFmt('result._{0} = {1}', fname, value)
+        continue
+      if lazy:
+        self.writeLnFmt(
+            'if type({0}) is coda.runtime.LazyValue and not {0}.isLoaded():', value)
+        self.writeLnFmt('  result._{0} = {1}.copy()', fname, value)
+      if empty:
+        self.writeLnFmt('{0}if {1} is {2}:', 'el' if lazy else '', loaded, empty)
+        self.writeLnFmt('  result._{0} = {1}', fname, empty)
+      if lazy or empty:
+        self.writeLn('else:')
+        self.writeLnFmt('  result._{0} = {1}', fname, copied)
+      else:
+        self.writeLnFmt('result._{0} = {1}', fname, copied)
+    self.writeLn('return result')
+    self.unindent()
+    self.writeLn()
+
+  def isSharedValue(self, ftype):
+    '''True if values of type 'ftype' are shared structs.'''
+    if ftype.typeId() == types.TypeKind.MODIFIED and ftype.isShared():
+      return True
+    return self.isSharedType(types.unmodified(ftype))
+
+  def isClonedStruct(self, ftype):
+    '''True if values of type 'ftype' are structs that are copied by _cloneImpl().'''
+    ftype = types.unmodified(ftype)
+    return ftype.typeId() == types.TypeKind.STRUCT and not self.useCompareByReference(ftype)
+
   def genWriteMethods(self, fd, struct):
     # Serialization
     writeableFields = self.getWriteableFields(struct)
     if struct.hasTypeId() or writeableFields:
       self.writeLn('def _writeFields(self, encoder):')
       self.indent()
+      if self.hasLazyFields(struct):
+        self.writeLn('self._loadLazyFields()')
       if struct.hasTypeId():
         self.writeLnFmt('encoder.writeSubtypeHeader(\'{0}\', {1})',
             struct.getName(), struct.getTypeId())
@@ -517,6 +677,225 @@ class Python3Generator(genbase.CodeGenerator):
       self.unindent()
       self.writeLn()
 
+  def genBinaryWriteMethod(self, fd, struct):
+    '''Generate a _writeFieldsBinary() method, which appends the binary encoding of the
+       fields of this struct directly to the output buffer of a BinaryEncoder. Data type
+       codes are the ones in coda.io.binarycodec.DataType. The output is the same as
+       that of _writeFields(); containers and structs, fields whose header can't be
+       computed inline, and the subtype records of base classes are written by the
+       generic encoder methods.'''
+    writeableFields = self.getWriteableFields(struct)
+    if not struct.hasTypeId() and not writeableFields:
+      return
+    self.writeLn('def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):')
+    self.indent()
+    self.writeLn('"""Write the fields of this object to \'out\', the output buffer of \'encoder\'.')
+    self.writeLn('   \'last\' is the id of the previous field written, and \'subtype\' is true if')
+    self.writeLn('   a subtype header has already been written."""')
+    if self.hasLazyFields(struct):
+      self.writeLn('self._loadLazyFields()')
+    if struct.hasTypeId():
+      self.writeLn('if subtype:')
+      self.writeLn('  encoder.resumeFields(last, subtype)')
+      self.writeLn('  __class__._writeFields(self, encoder)')
+      self.writeLn('  return')
+      self.writeLnFmt('out += {0!r}', self.binarySubtypeHeader(int(struct.getTypeId())))
+      self.writeLn('last = 0')
+      self.writeLn('subtype = True')
+    for field in writeableFields:
+      fty = field.getType()
+      if isinstance(fty, types.CollectionType):
+        self.writeLnFmt('if len(self._{0}):', field.getName())
+      else:
+        self.writeLnFmt('if self.has{0}():', self.capitalize(field.getName()))
+      self.indent()
+      if self.isBinaryInline(fty, field.getOptions()):
+        self.writeLnFmt('value = self._{0}', field.getName())
+        # Strings written using a string table are left to the encoder.
+        condition = ''
+        if types.unmodified(fty).typeId() == types.TypeKind.STRING:
+          condition = ' and not encoder.usesStringTable()'
+        if field.getId() <= 15:
+          self.writeLnFmt('if last < {0}{1}:', field.getId(), condition)
+        else:
+          self.writeLnFmt('if {0} <= last < {1}{2}:', field.getId() - 15, field.getId(), condition)
+        self.indent()
+        self.genBinaryFieldWrite(field.getId() << 4, fty, field.getOptions())
+        self.unindent()
+        self.writeLn('else:')
+        self.indent()
+        self.writeLn('encoder.resumeFields(last, subtype)')
+        self.writeLnFmt(
+            "encoder.writeFieldHeader('{0}', {1})",
+            field.getName(), field.getId())
+        self.genValueWrite('value', fty, field.getOptions())
+        self.unindent()
+      else:
+        self.writeLn('encoder.resumeFields(last, subtype)')
+        self.writeLnFmt(
+            "encoder.writeFieldHeader('{0}', {1})",
+            field.getName(), field.getId())
+        self.genValueWrite('self._' + field.getName(), fty, field.getOptions())
+      self.writeLnFmt('last = {0}', field.getId())
+      self.unindent()
+    if struct.getBaseType():
+      self.writeLn('super()._writeFieldsBinary(out, encoder, last, subtype)')
+    self.unindent()
+    self.writeLn()
+
+  def binarySubtypeHeader(self, sid):
+    '''The encoded subtype header for subtype id 'sid'.'''
+    if sid > 0 and sid <= 15:
+      return bytes([(sid << 4) | 15])
+    header = [15]
+    while sid > 0x7f:
+      header.append((sid & 0x7f) | 0x80)
+      sid >>= 7
+    header.append(sid)
+    return bytes(header)
+
+  def isBinaryInline(self, fty, options):
+    '''True if the generated binary writer encodes values of type 'fty' inline.'''
+    fkind = types.unmodified(fty).typeId()
+    if fkind == types.TypeKind.INTEGER and options.isFixed():
+      return types.unmodified(fty).getBits() in (16, 32, 64)
+    return fkind in self.BINARY_READ_KINDS
+
+  def genBinaryFieldWrite(self, header, fty, options):
+    '''Write a field value, given the field id shifted into position for the field
+       header.'''
+    fkind = types.unmodified(fty).typeId()
+    if fkind == types.TypeKind.BOOL:
+      self.writeLnFmt(
+          'out.append(({0:#04x} if value else {1:#04x}) - (last << 4))', header | 2, header | 1)
+    elif fkind == types.TypeKind.INTEGER and options.isFixed():
+      bits = types.unmodified(fty).getBits()
+      if bits == 16:
+        self.writeLn('if value == 0 or value == 1:')
+        self.writeLnFmt('  out.append({0:#04x} + value - (last << 4))', header | 1)
+        self.writeLn('else:')
+        self.writeLnFmt('  out.append({0:#04x} - (last << 4))', header | 4)
+        self.writeLn('  out += encoder.FIXED16.pack(value)')
+      else:
+        self.writeLnFmt('out.append({0:#04x} - (last << 4))', header | (5 if bits == 32 else 6))
+        self.writeLnFmt('out += encoder.FIXED{0}.pack(value)', bits)
+    elif fkind in (types.TypeKind.INTEGER, types.TypeKind.ENUM):
+      self.writeLn('if value == 0 or value == 1:')
+      self.writeLnFmt('  out.append({0:#04x} + value - (last << 4))', header | 1)
+      self.writeLn('else:')
+      self.indent()
+      self.writeLnFmt('out.append({0:#04x} - (last << 4))', header | 3)
+      self.writeLn('value = value << 1 if value >= 0 else ~(value << 1)')
+      self.genBinaryVarIntWrite('value')
+      self.unindent()
+    elif fkind == types.TypeKind.FLOAT:
+      self.writeLnFmt('out.append({0:#04x} - (last << 4))', header | 7)
+      self.writeLn('out += encoder.FLOAT.pack(value)')
+    elif fkind == types.TypeKind.DOUBLE:
+      self.writeLnFmt('out.append({0:#04x} - (last << 4))', header | 8)
+      self.writeLn('out += encoder.DOUBLE.pack(value)')
+    elif fkind in (types.TypeKind.STRING, types.TypeKind.BYTES):
+      self.writeLnFmt('out.append({0:#04x} - (last << 4))', header | 9)
+      if fkind == types.TypeKind.STRING:
+        self.writeLn('value = value.encode()')
+      self.writeLn('length = len(value)')
+      self.genBinaryVarIntWrite('length')
+      self.writeLn('out += value')
+    else:
+      assert False, 'Illegal type kind: ' + str(fty)
+
+  def genBinaryVarIntWrite(self, var):
+    self.writeLnFmt('while {0} > 0x7f:', var)
+    self.writeLnFmt('  out.append(({0} & 0x7f) | 0x80)', var)
+    self.writeLnFmt('  {0} >>= 7', var)
+    self.writeLnFmt('out.append({0})', var)
+
+  # Field types that can be read by the generated binary readers.
+  BINARY_READ_KINDS = frozenset([
+    types.TypeKind.BOOL,
+    types.TypeKind.INTEGER,
+    types.TypeKind.ENUM,
+    types.TypeKind.FLOAT,
+    types.TypeKind.DOUBLE,
+    types.TypeKind.STRING,
+    types.TypeKind.BYTES,
+  ])
+
+  def genBinaryReadMethod(self, fd, struct):
+    '''Generate a _readFieldsBinary() method, which decodes the scalar fields declared
+       in this struct directly from a binary buffer. Data type codes are the ones in
+       coda.io.binarycodec.DataType. Subtype headers, extended data types, containers,
+       structs and unknown fields are left for the generic decoder.'''
+    fields = [field for field in struct.getFields()
+        if types.unmodified(field.getType()).typeId() in self.BINARY_READ_KINDS]
+    if not fields:
+      return
+    self.writeLn('def _readFieldsBinary(self, buf, pos, ctx, fid=0):')
+    self.indent()
+    self.writeLn('"""Read fields from the binary buffer \'buf\' starting at \'pos\', where \'fid\'')
+    self.writeLn('   is the id of the previous field. Returns the position and id at which')
+    self.writeLn('   reading stopped; the field header at that position is left for \'ctx\'."""')
+    self.writeLn('end = len(buf)')
+    self.writeLn('while pos < end:')
+    self.indent()
+    self.writeLn('header = buf[pos]')
+    self.writeLn('dt = header & 0x0f')
+    self.writeLn('if header < 0x10 or dt == 0 or dt == 15:')
+    self.writeLn('  break')
+    self.writeLn('nfid = fid + (header >> 4)')
+    keyword = 'if'
+    for field in fields:
+      self.writeLnFmt('{0} nfid == {1}:', keyword, field.getId())
+      keyword = 'elif'
+      self.indent()
+      self.genBinaryFieldRead('self._' + field.getName(), field.getType())
+      self.writeLnFmt("self._present |= {0:#x}", self.presentBit(struct, field))
+      self.unindent()
+    self.writeLn('else:')
+    self.writeLn('  break')
+    self.writeLn('fid = nfid')
+    self.unindent()
+    self.writeLn('return pos, fid')
+    self.unindent()
+    self.writeLn()
+
+  def genBinaryFieldRead(self, var, fty):
+    fkind = types.unmodified(fty).typeId()
+    if fkind == types.TypeKind.BOOL:
+      self.writeLn('if dt == 2:')
+      self.writeLnFmt('  {0} = True', var)
+      self.writeLn('elif dt == 1:')
+      self.writeLnFmt('  {0} = False', var)
+      self.writeLn('else:')
+      self.writeLn('  break')
+      self.writeLn('pos += 1')
+    elif fkind in (types.TypeKind.INTEGER, types.TypeKind.ENUM):
+      self.writeLn('if dt == 3:')
+      self.writeLn('  value, pos = ctx.readVarIntAt(buf, pos + 1)')
+      self.writeLnFmt('  {0} = (value >> 1) ^ -(value & 1)', var)
+      self.writeLn('elif dt == 1 or dt == 2:')
+      self.writeLnFmt('  {0} = dt - 1', var)
+      self.writeLn('  pos += 1')
+      if fkind == types.TypeKind.INTEGER:
+        self.writeLn('elif dt <= 6:')
+        self.writeLnFmt('  {0}, pos = ctx.readFormatAt(buf, pos + 1, dt)', var)
+      self.writeLn('else:')
+      self.writeLn('  break')
+    elif fkind in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
+      self.writeLn('if dt != 7 and dt != 8:')
+      self.writeLn('  break')
+      self.writeLnFmt('{0}, pos = ctx.readFormatAt(buf, pos + 1, dt)', var)
+    elif fkind == types.TypeKind.STRING:
+      self.writeLn('if dt != 9:')
+      self.writeLn('  break')
+      self.writeLnFmt('{0}, pos = ctx.readStringAt(buf, pos + 1)', var)
+    elif fkind == types.TypeKind.BYTES:
+      self.writeLn('if dt != 9:')
+      self.writeLn('  break')
+      self.writeLnFmt('{0}, pos = ctx.readBytesAt(buf, pos + 1)', var)
+    else:
+      assert False, 'Illegal type kind: ' + str(fty)
+
   def genValueWrite(self, var, fty, options):
     fkind = fty.typeId()
     fixedParam = ', True' if options.isFixed() else ''
@@ -535,6 +914,10 @@ class Python3Generator(genbase.CodeGenerator):
         self.writeLnFmt("encoder.writeString({0})", var)
     elif fkind == types.TypeKind.BYTES:
         self.writeLnFmt("encoder.writeBytes({0})", var)
+    elif fkind in (types.TypeKind.LIST, types.TypeKind.SET) and self.isPackable(fty, options):
+      ety = types.unmodified(fty.getElementType())
+      self.writeLnFmt(
+          "encoder.writePackedList({1}, {2}, {0})", var, ety.typeId(), self.bitsOf(ety))
     elif fkind == types.TypeKind.LIST:
       self.writeLnFmt(
           "encoder.writeBeginList({1}, len({0}){2})",
@@ -581,6 +964,75 @@ class Python3Generator(genbase.CodeGenerator):
     else:
       assert False, 'Illegal type kind: ' + str(fty)
 
+  def isPackable(self, fty, options):
+    '''Return true if 'fty' is a list or set type that should be written as a packed
+       list - that is, a [fixed] collection of integers, floats or doubles.'''
+    return options.isFixed() and types.unmodified(fty.getElementType()).typeId() in (
+        types.TypeKind.INTEGER, types.TypeKind.FLOAT, types.TypeKind.DOUBLE)
+
+  def bitsOf(self, ty):
+    '''Return the width in bits of a fixed-width numeric type.'''
+    if ty.typeId() == types.TypeKind.FLOAT:
+      return 32
+    elif ty.typeId() == types.TypeKind.DOUBLE:
+      return 64
+    return ty.getBits()
+
+  def genLoadLazyMethod(self, fd, struct):
+    '''Generate a _loadLazyFields() method, which decodes any fields of this struct
+       that were left as a coda.runtime.LazyValue by a lazy BinaryDecoder. The
+       decoder only defers fields of classes that have this method.'''
+    if not self.hasLazyFields(struct):
+      return
+    self.writeLn('def _loadLazyFields(self):')
+    self.indent()
+    self.writeLn('super()._loadLazyFields()')
+    for field in struct.getFields():
+      if self.isLazyField(field):
+        for line in self.lazyLoadLines(field.getName()):
+          self.writeLn(line)
+    self.unindent()
+    self.writeLn()
+
+  def hasLazyFields(self, struct):
+    return any(self.isLazyField(field) for field in struct.getFields())
+
+  def isLazyField(self, field):
+    '''True if 'field' can hold a deferred value when decoded lazily.'''
+    return self.lazyFields and types.unmodified(field.getType()).typeId() in (
+        types.TypeKind.LIST, types.TypeKind.SET, types.TypeKind.MAP, types.TypeKind.STRUCT)
+
+  def presentBit(self, struct, field):
+    '''The bit in an object's 'present' mask for 'field'. Each field in the class
+       hierarchy has a bit, following those of the base class, in the order of the
+       __fields__ table; ObjectMeta assigns the same bits from that table.'''
+    offset = 0
+    base = struct.getBaseType()
+    while base is not None:
+      offset += len(base.getFields())
+      base = base.getBaseType()
+    return 1 << (offset + list(struct.getFields()).index(field))
+
+  def isMaterialized(self, ftype):
+    '''True if values of type 'ftype' are bytes that may need to be copied out of a
+       bytes view when frozen (the 'materializeBytes' option).'''
+    return self.materializeBytes and types.unmodified(ftype).typeId() == types.TypeKind.BYTES
+
+  def materializedValue(self, var):
+    return 'bytes({0}) if type({0}) is memoryview else {0}'.format(var)
+
+  def lazyLoadLines(self, fname):
+    return [
+        'if type(self._{0}) is coda.runtime.LazyValue:'.format(fname),
+        '  self._{0} = self._{0}.load()'.format(fname)]
+
+  def fieldValue(self, field, obj='self'):
+    '''Expression for the value of 'field' of 'obj'. Fields that can hold a deferred
+       value are read through the getter.'''
+    if self.isLazyField(field):
+      return '{0}.get{1}()'.format(obj, self.capitalize(field.getName()))
+    return '{0}._{1}'.format(obj, field.getName())
+
   def genMergeMethod(self, fd, struct):
     if len(struct.getFields()) == 0:
       return
@@ -630,7 +1082,7 @@ class Python3Generator(genbase.CodeGenerator):
        @type field: coda.descriptors.StructType.Field'''
     self.writeLnFmt('def has{0}(self):', self.capitalize(field.getName()))
     self.indent()
-    self.writeLnFmt('return self._isPresent(\'{0}\')', field.getName())
+    self.writeLnFmt('return (self._present & {0:#x}) != 0', self.presentBit(struct, field))
     self.unindent()
     self.writeLn()
 
@@ -645,6 +1097,9 @@ class Python3Generator(genbase.CodeGenerator):
     self.indent()
     if field.getType().typeId() == types.TypeKind.STRUCT:
       self.writeLnFmt('"""@return {0}"""', self.formatTypeName(field.getType()))
+    if self.isLazyField(field):
+      for line in self.lazyLoadLines(field.getName()):
+        self.writeLn(line)
     self.writeLnFmt('return self._{0}', field.getName())
     self.unindent()
     self.writeLn()
@@ -659,6 +1114,9 @@ class Python3Generator(genbase.CodeGenerator):
     if field.getType().typeId() == types.TypeKind.STRUCT:
       self.writeLnFmt('"""@return {0}"""', self.formatTypeName(field.getType()))
     self.writeLn('self.checkMutable()')
+    if self.isLazyField(field):
+      for line in self.lazyLoadLines(field.getName()):
+        self.writeLn(line)
 #    if field.getOptions().?? (nullable? shared?)
     defaultValue = self.defaultValueOf(field)
     emptyValue = self.emptyValueOf(field)
@@ -673,7 +1131,7 @@ class Python3Generator(genbase.CodeGenerator):
       self.writeLnFmt('if self._{0} is {1}:', field.getName(), defaultValue)
     self.indent()
     if self.isFieldPresentable(field):
-      self.writeLnFmt('self._setPresent(\'{0}\')', field.getName())
+      self.writeLnFmt('self._present |= {0:#x}', self.presentBit(struct, field))
     self.writeLnFmt('self._{0} = {1}', field.getName(), emptyValue)
     self.unindent()
     self.writeLnFmt('return self._{0}', field.getName())
@@ -694,7 +1152,7 @@ class Python3Generator(genbase.CodeGenerator):
 
     self.writeLnFmt('self._{0} = {1}', field.getName(), varName)
     if self.isFieldPresentable(field):
-      self.writeLnFmt('self._setPresent(\'{0}\')', field.getName())
+      self.writeLnFmt('self._present |= {0:#x}', self.presentBit(struct, field))
     self.writeLn('return self')
     self.unindent()
     self.writeLn()
@@ -711,7 +1169,7 @@ class Python3Generator(genbase.CodeGenerator):
     self.writeLnFmt('self._{0} = {1}',
         field.getName(), self.defaultValueOf(field))
     if self.isFieldPresentable(field):
-      self.writeLnFmt('self._clearPresent(\'{0}\')', field.getName())
+      self.writeLnFmt('self._present &= ~{0:#x}', self.presentBit(struct, field))
     self.writeLn('return self')
     self.unindent()
     self.writeLn()
@@ -735,7 +1193,7 @@ class Python3Generator(genbase.CodeGenerator):
     elif fkind == types.TypeKind.STRING:
       self.writeLnFmt("assert isinstance({0}, str), type({0})", varName)
     elif fkind == types.TypeKind.BYTES:
-      self.writeLnFmt("assert isinstance({0}, (str, bytes)), type({0})", varName)
+      self.writeLnFmt("assert isinstance({0}, (str, bytes, memoryview)), type({0})", varName)
     elif fkind == types.TypeKind.LIST:
       self.writeLnFmt("assert isinstance({0}, (list, tuple)), type({0})", varName)
     elif fkind == types.TypeKind.SET:
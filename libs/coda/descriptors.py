@@ -47,6 +47,7 @@ class StructDescriptor(StructType):
     self._fieldsById = OrderedDict()
     self._methods = []
     self._class = cls
+    self._plans = {}
 
   def getFields(self):
     'Returns the list of field definitions for this struct, in order by ID'
@@ -126,6 +127,24 @@ class StructDescriptor(StructType):
       else:
         return False
 
+  def getPlan(self, key, factory):
+    '''Return a codec-specific table for this struct, calling 'factory(self)' to
+       build it the first time it is requested. The table is shared by all codec
+       instances that use the same key.'''
+    try:
+      return self._plans[key]
+    except KeyError:
+      plan = self._plans[key] = factory(self)
+      return plan
+
+  def _equalsImpl(self, other):
+    # There is one descriptor per struct class, so descriptors are compared by
+    # identity, the same as structs with the 'reference' option.
+    return self is other
+
+  def __hash__(self):
+    return hash(id(self))
+
   def getClass(self):
     return self._class
 
@@ -0,0 +1,45 @@
+'''Reading and writing record streams with asyncio.
+
+readRecords() decodes the records arriving on an asyncio.StreamReader as they are
+received, without blocking the event loop on a partially received record, and
+writeRecords() writes records to an asyncio.StreamWriter, waiting for the transport to
+drain so that a slow reader applies backpressure to the writer. The stream format is the
+same as for record files (see coda.io.recordfile).'''
+
+from coda.io.binarycodec import BinaryCodec
+from coda.io.recordfile import RecordWriter
+
+READ_SIZE = 64 * 1024
+
+async def readRecords(reader, cls, typeRegistry=None, readSize=READ_SIZE):
+  '''Asynchronously iterate over the records read from the asyncio.StreamReader 'reader',
+     decoding each one as an instance of 'cls'. The stream is read in pieces of up to
+     'readSize' bytes. Raises an EncodingError if the stream ends with part of a record.'''
+  decoder = BinaryCodec.createPushDecoder(cls, typeRegistry=typeRegistry)
+  while True:
+    data = await reader.read(readSize)
+    if not data:
+      break
+    for obj in decoder.feed(data).objects():
+      yield obj
+  decoder.close()
+
+async def writeRecords(writer, objects, framed=False, stringTable=False, keepTables=False,
+    resetInterval=None):
+  '''Write each object in 'objects', which can be an iterable or an asynchronous iterable,
+     to the asyncio.StreamWriter 'writer' as a record. Waits for the writer to drain after
+     each record. The options are the same as for RecordWriter. Returns the number of
+     records written.'''
+  records = RecordWriter(writer, framed, stringTable, keepTables, resetInterval)
+  count = 0
+  if hasattr(objects, '__aiter__'):
+    async for obj in objects:
+      records.write(obj)
+      count += 1
+      await writer.drain()
+  else:
+    for obj in objects:
+      records.write(obj)
+      count += 1
+      await writer.drain()
+  return count
@@ -0,0 +1,216 @@
+'''Indexed archives: record files with an index for random access.
+
+An archive consists of a sequence of records in the same format as a record file (see
+coda.io.recordfile), followed by an index and a fixed-size trailer:
+
+  Archive ::= Record* Offsets Keys? Trailer
+  Offsets ::= FIXED64*                        (the offset of each record, one per record)
+  Keys ::= (KeyValue VarInt)*                 (key value, record number)
+  KeyValue ::= DATA_VARINT VarInt | DATA_BYTES VarInt byte*
+  Trailer ::= FIXED64 FIXED64 FIXED64 MAGIC   (offsets position, record count, keys position)
+
+Integer key values are zig-zag encoded, and string key values are UTF-8 encoded. The
+keys position is zero if the archive has no key table.'''
+
+import mmap
+import struct
+from coda.io.binarycodec import BinaryCodec, BinaryDecoder, BinaryEncoder, DataType
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordWriter, encodeLength
+
+MAGIC = b'CODAARC1'
+TRAILER = struct.Struct('!QQQ8s')
+OFFSET = struct.Struct('!Q')
+
+class ArchiveWriter:
+  '''Writes objects to an indexed archive. If 'keyField' is the name of an integer or
+     string field, the value of that field is recorded in the index for each object that
+     has it set, so that objects can be looked up by key. The index is written when
+     the writer is closed.'''
+  def __init__(self, stream, keyField=None, framed=False):
+    self.__stream = stream
+    self.__records = RecordWriter(stream, framed)
+    self.__keyField = keyField
+    self.__offsets = []
+    self.__keys = {}
+    self.__ownsStream = False
+    self.__closed = False
+
+  @staticmethod
+  def open(path, keyField=None, framed=False):
+    '''Create the archive file at 'path'. The file is closed when the writer is closed.'''
+    writer = ArchiveWriter(open(path, 'wb'), keyField, framed)
+    writer.__ownsStream = True
+    return writer
+
+  def write(self, obj):
+    '''Append 'obj' to the archive, and return its record number.'''
+    index = len(self.__offsets)
+    if self.__keyField is not None and obj._isPresent(self.__keyField):
+      key = getattr(obj, '_' + self.__keyField)
+      if not isinstance(key, (int, str)):
+        raise EncodingError("Key field '{0}' should be an integer or string, not '{1}'".format(
+            self.__keyField, type(key).__name__))
+      if key in self.__keys:
+        raise EncodingError('Duplicate archive key: {0!r}'.format(key))
+      self.__keys[key] = index
+    self.__offsets.append(self.__records.getOffset())
+    self.__records.write(obj)
+    return index
+
+  def writeAll(self, objects):
+    for obj in objects:
+      self.write(obj)
+    return self
+
+  def close(self):
+    '''Write the index, and close the stream if it was opened by this writer.'''
+    if self.__closed:
+      return
+    self.__closed = True
+    offsetsPos = self.__records.getOffset()
+    stream = self.__stream
+    stream.write(b''.join(OFFSET.pack(offset) for offset in self.__offsets))
+    keysPos = 0
+    if self.__keys:
+      keysPos = offsetsPos + OFFSET.size * len(self.__offsets)
+      table = bytearray()
+      for key, index in self.__keys.items():
+        if isinstance(key, int):
+          table.append(DataType.VARINT)
+          table += encodeLength(BinaryEncoder.zigZagEncode(key))
+        else:
+          data = key.encode()
+          table.append(DataType.BYTES)
+          table += encodeLength(len(data))
+          table += data
+        table += encodeLength(index)
+      stream.write(table)
+    stream.write(TRAILER.pack(offsetsPos, len(self.__offsets), keysPos, MAGIC))
+    stream.flush()
+    if self.__ownsStream:
+      stream.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+class Archive:
+  '''Random access to the records of an archive held in 'buffer', which can be a bytes,
+     bytearray, memoryview or mmap object. Records are decoded as instances of 'cls'
+     directly from the buffer, only when they are requested. If 'lazy' is true, the
+     records are decoded lazily, see BinaryDecoder.'''
+  def __init__(self, buffer, cls, typeRegistry=None, lazy=False):
+    self.__view = memoryview(buffer).cast('B')
+    self.__cls = cls
+    self.__typeRegistry = typeRegistry
+    self.__lazy = lazy
+    self.__keys = None
+    self.__mmap = None
+    if len(self.__view) < TRAILER.size:
+      raise EncodingError('Not an archive: too short')
+    self.__offsetsPos, self.__count, self.__keysPos, magic = TRAILER.unpack_from(
+        self.__view, len(self.__view) - TRAILER.size)
+    if magic != MAGIC:
+      raise EncodingError('Not an archive: bad magic number')
+    self.__recordsEnd = self.__offsetsPos
+
+  @staticmethod
+  def open(path, cls, typeRegistry=None, lazy=False):
+    '''Open the archive file at 'path', which is memory-mapped rather than read.'''
+    with open(path, 'rb') as fh:
+      mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    archive = Archive(mm, cls, typeRegistry, lazy)
+    archive.__mmap = mm
+    return archive
+
+  def __len__(self):
+    return self.__count
+
+  def __getitem__(self, index):
+    '''Decode and return record number 'index'.'''
+    return self.__decode(self.getRecord(index))
+
+  def __iter__(self):
+    for index in range(self.__count):
+      yield self[index]
+
+  def getRecord(self, index):
+    '''Return the encoded data of record number 'index', as a memoryview of the buffer.'''
+    if index < 0:
+      index += self.__count
+    if index < 0 or index >= self.__count:
+      raise IndexError('Archive record index out of range: {0}'.format(index))
+    offset, = OFFSET.unpack_from(self.__view, self.__offsetsPos + index * OFFSET.size)
+    length, start = BinaryDecoder.readVarIntAt(self.__view, offset)
+    if start + length > self.__recordsEnd:
+      raise EncodingError('Error:{0:x}: Record extends past the end of the records'.format(offset))
+    return self.__view[start:start + length]
+
+  def lookup(self, key):
+    '''Decode and return the record whose key is 'key'. Raises KeyError if there is no
+       such record.'''
+    return self[self.indexOf(key)]
+
+  def indexOf(self, key):
+    '''Return the record number of the record whose key is 'key'.'''
+    if self.__keys is None:
+      self.__keys = self.__readKeys()
+    return self.__keys[key]
+
+  def keys(self):
+    if self.__keys is None:
+      self.__keys = self.__readKeys()
+    return self.__keys.keys()
+
+  def close(self):
+    '''Release the buffer, and unmap the file if the archive was opened with open().
+       The file is not unmapped while records returned by getRecord(), or objects
+       decoded lazily, still refer to it; it is unmapped when they are garbage
+       collected instead, so they remain valid after the archive is closed.'''
+    try:
+      self.__view.release()
+      if self.__mmap is not None:
+        self.__mmap.close()
+    except BufferError:
+      # Other views of the buffer exist.
+      pass
+    self.__mmap = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def __decode(self, data):
+    if not data:
+      # An object with no fields set
+      return self.__cls()
+    return BinaryCodec.createBufferDecoder(
+        data, typeRegistry=self.__typeRegistry, lazy=self.__lazy).decode(self.__cls)
+
+  def __readKeys(self):
+    keys = {}
+    if self.__keysPos == 0:
+      return keys
+    view = self.__view
+    pos = self.__keysPos
+    end = len(view) - TRAILER.size
+    readVarIntAt = BinaryDecoder.readVarIntAt
+    try:
+      while pos < end:
+        keyType = view[pos]
+        if keyType == DataType.VARINT:
+          value, pos = readVarIntAt(view, pos + 1)
+          key = BinaryDecoder.zigZagDecode(value)
+        elif keyType == DataType.BYTES:
+          key, pos = BinaryDecoder.readStringAt(view, pos + 1)
+        else:
+          raise EncodingError('Error:{0:x}: Invalid archive key type: {1}'.format(pos, keyType))
+        keys[key], pos = readVarIntAt(view, pos)
+    except IndexError:
+      raise EncodingError('Error:{0:x}: Truncated archive key table'.format(pos))
+    return keys
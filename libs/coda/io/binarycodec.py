@@ -3,6 +3,7 @@ import coda.io
 import coda.runtime
 from coda.io.codec import EncodingError
 from coda import types
+from coda.runtime import LazyValue
 
 # =============================================================================
 # Encoding for Data types
@@ -29,9 +30,17 @@ class DataType:
   # Extended types - low bits must be 0
   SHARED_REF = 0x10   # Reference to a shared object (followed by object id). Used in maps/lists.
   SHARED_DEF = 0x20   # Definition of a shared object (followed by struct). Used in maps/lists.
+  FORMAT = 0x30       # File header (followed by format flags). Only at the start of a file.
+  STRING_DEF = 0x40   # Definition of a string table entry (followed by the string).
+  STRING_REF = 0x50   # Reference to a string table entry (followed by the entry index).
 
   MAXVAL = SUBTYPE
 
+class FormatFlags:
+  FRAMED = 1    # Struct fields and lists of structs are prefixed with their length
+  STRINGS = 2   # Strings are written once, and later occurrences refer to a string table
+  CONTINUED = 4 # The shared object and string tables of the previous object are kept
+
 class DataFormat:
   BYTE = struct.Struct('!B')
   FIXED16 = struct.Struct('!H')
@@ -40,6 +49,15 @@ class DataFormat:
   FLOAT = struct.Struct('!f')
   DOUBLE = struct.Struct('!d')
 
+# Struct format characters for the elements of packed lists, by element data type.
+PACKED_FORMATS = {
+  DataType.FIXED16: 'H',
+  DataType.FIXED32: 'I',
+  DataType.FIXED64: 'Q',
+  DataType.FLOAT: 'f',
+  DataType.DOUBLE: 'd',
+}
+
 DTYPE_NAMES = {
   DataType.END: 'end',
   DataType.ZERO: 'zero',
@@ -64,6 +82,22 @@ DTYPE_NAMES = {
 # =============================================================================
 
 class BinaryEncoder(coda.io.AbstractEncoder):
+  '''Encoder for the binary format. Output is accumulated in an internal buffer, which
+     is written to the stream by fileEnd(), or whenever a struct is completed and the size
+     of the buffer exceeds 'flushThreshold'. If 'stream' is None, the output is never
+     flushed and can be retrieved with getBytes().
+
+     If 'stringTable' is true, each distinct string value is written only once; later
+     occurrences of the same string are written as an index into a table of the strings
+     seen so far.
+
+     If 'keepTables' is true, the encoder can encode a sequence of objects, whose output is
+     retrieved with takeBytes() after each one. The shared object and string tables are
+     kept from one object to the next, so a shared object or string that was written for
+     an earlier object is written as a reference. Each object is marked as continuing the
+     tables of the previous one, except for the first and the first after resetTables().
+     A decoder can start decoding at any of those objects. Shared objects must not be
+     modified while the tables are in use.'''
   KIND_TO_DTYPE = {
       types.TypeKind.BOOL: DataType.ONE,
       types.TypeKind.INTEGER: DataType.VARINT,
@@ -78,6 +112,12 @@ class BinaryEncoder(coda.io.AbstractEncoder):
       types.TypeKind.ENUM: DataType.VARINT,
   }
 
+  FIXED_DTYPES = {
+      16: DataType.FIXED16,
+      32: DataType.FIXED32,
+      64: DataType.FIXED64,
+  }
+
   class State:
     CLEAR = 0
     STRUCT = 1
@@ -86,21 +126,87 @@ class BinaryEncoder(coda.io.AbstractEncoder):
     MAP_VALUE = 4
     SUBTYPE = 5
 
-  def __init__(self, stream):
+  # Formats used by generated _writeFieldsBinary() methods.
+  FIXED16 = DataFormat.FIXED16
+  FIXED32 = DataFormat.FIXED32
+  FIXED64 = DataFormat.FIXED64
+  FLOAT = DataFormat.FLOAT
+  DOUBLE = DataFormat.DOUBLE
+
+  DEFAULT_FLUSH_THRESHOLD = 64 * 1024
+
+  def __init__(self, stream, flushThreshold=DEFAULT_FLUSH_THRESHOLD, framed=False,
+      stringTable=False, keepTables=False):
     super().__init__()
     self.__stream = stream
+    self.__buffer = bytearray()
+    self.__flushThreshold = flushThreshold
     self.__subtypeId = None
     self.__fieldId = None
+    self.__fieldName = None
     self.__lastFieldId = 0
     self.__state = self.State.CLEAR
     self.__fieldHeader = False
     self.__inProgress = set()
+    # For the framed format: the start of each open frame, and the number of shared
+    # structs defined so far.
+    self.__framed = framed
+    self.__frames = []
+    self.__sharedDefs = 0
+    # For string tables: the table index of each string written so far.
+    self.__strings = {} if stringTable else None
+    # For sequences of objects: true if the next object continues the tables of the
+    # previous one.
+    self.__keepTables = keepTables
+    self.__continued = False
 
   def fileBegin(self):
     self.__state = self.State.STRUCT
+    self.__fieldId = None
+    self.__subtypeId = None
+    self.__lastFieldId = 0
+    flags = 0
+    if self.__framed:
+      flags |= FormatFlags.FRAMED
+    if self.__strings is not None:
+      flags |= FormatFlags.STRINGS
+    if self.__continued:
+      flags |= FormatFlags.CONTINUED
+    self.__continued = self.__keepTables
+    if flags:
+      self.__writeUByte(DataType.FORMAT)
+      self.__writeVarInt(flags)
 
   def fileEnd(self):
-    pass
+    self.flush()
+
+  def flush(self):
+    '''Write any buffered output to the stream.'''
+    if self.__stream is not None and self.__buffer:
+      self.__stream.write(self.__buffer)
+      # Clear the buffer in place, since generated writers hold a reference to it.
+      del self.__buffer[:]
+    return self
+
+  def getBytes(self):
+    '''Return the buffered output that has not yet been flushed.'''
+    return bytes(self.__buffer)
+
+  def takeBytes(self):
+    '''Return the buffered output that has not yet been flushed, and clear the buffer.'''
+    data = bytes(self.__buffer)
+    del self.__buffer[:]
+    return data
+
+  def resetTables(self):
+    '''Clear the shared object and string tables, so that the next object can be
+       decoded without the objects before it.'''
+    self.resetShared()
+    if self.__strings is not None:
+      self.__strings = {}
+    self.__sharedDefs = 0
+    self.__continued = False
+    return self
 
   def writeSubtypeHeader(self, name, sid):
     assert self.__state in (self.State.STRUCT, self.State.SUBTYPE, self.State.CLEAR)
@@ -113,6 +219,7 @@ class BinaryEncoder(coda.io.AbstractEncoder):
     assert self.__fieldId is None
     assert self.__state in (self.State.CLEAR, self.State.STRUCT, self.State.SUBTYPE), self.__state
     self.__fieldId = fid
+    self.__fieldName = name
     if self.__state == self.State.CLEAR:
       self.__state = self.State.STRUCT
 
@@ -147,51 +254,109 @@ class BinaryEncoder(coda.io.AbstractEncoder):
         self.__beginValue(DataType.ONE)
         return
     self.__beginValue(DataType.FIXED16)
-    self.__stream.write(DataFormat.FIXED16.pack(value))
+    self.__buffer += DataFormat.FIXED16.pack(value)
     return self
 
   def writeFixed32(self, value):
     self.__beginValue(DataType.FIXED32)
-    self.__stream.write(DataFormat.FIXED32.pack(value))
+    self.__buffer += DataFormat.FIXED32.pack(value)
     return self
 
   def writeFixed64(self, value):
     self.__beginValue(DataType.FIXED64)
-    self.__stream.write(DataFormat.FIXED64.pack(value))
+    self.__buffer += DataFormat.FIXED64.pack(value)
     return self
 
   def writeFloat(self, value):
     self.__beginValue(DataType.FLOAT)
-    self.__stream.write(DataFormat.FLOAT.pack(value))
+    self.__buffer += DataFormat.FLOAT.pack(value)
     return self
 
   def writeDouble(self, value):
     self.__beginValue(DataType.DOUBLE)
-    self.__stream.write(DataFormat.DOUBLE.pack(value))
+    self.__buffer += DataFormat.DOUBLE.pack(value)
     return self
 
   def writeString(self, value):
-    self.__beginValue(DataType.BYTES)
-    self.__writeVarInt(len(value))
-    self.__stream.write(value.encode())
+    strings = self.__strings
+    if strings is None:
+      data = value.encode()
+      self.__beginValue(DataType.BYTES)
+      self.__writeVarInt(len(data))
+      self.__buffer += data
+      return self
+
+    # In a field, the string table type precedes the field header. In a container, it
+    # follows the (absent) field header, in place of the DATA_BYTES tag.
+    index = strings.get(value)
+    inField = self.__fieldId is not None
+    if inField:
+      if self.__subtypeId is not None:
+        self.__beginSubtype()
+      self.__writeUByte(DataType.STRING_DEF if index is None else DataType.STRING_REF)
+    if index is None:
+      strings[value] = len(strings)
+      self.__beginValue(DataType.BYTES)
+      if not inField:
+        self.__writeUByte(DataType.STRING_DEF)
+      data = value.encode()
+      self.__writeVarInt(len(data))
+      self.__buffer += data
+    else:
+      self.__beginValue(DataType.VARINT)
+      if not inField:
+        self.__writeUByte(DataType.STRING_REF)
+      self.__writeVarInt(index)
     return self
 
   def writeBytes(self, value):
     self.__beginValue(DataType.BYTES)
+    if self.__strings is not None and self.__fieldId is None:
+      # Container elements are tagged, since they might be string table entries.
+      self.__writeUByte(DataType.BYTES)
     self.__writeVarInt(len(value))
-    self.__stream.write(value)
+    self.__buffer += value
     return self
 
+  def usesStringTable(self):
+    '''True if strings are written using a string table. Generated _writeFieldsBinary()
+       methods use the generic methods to write strings in this case.'''
+    return self.__strings is not None
+
   def writeBeginList(self, elementKind, length, fixed=False):
-    if fixed:
-      self.__beginValue(DataType.PLIST)
-    else:
-      self.__beginValue(DataType.LIST)
-    self.__writeUByte(self.KIND_TO_DTYPE[elementKind])
+    # Packed lists are written by writePackedList(), since the element width is needed.
+    self.__beginValue(DataType.LIST)
+    elementType = self.KIND_TO_DTYPE[elementKind]
+    self.__writeUByte(elementType)
+    if self.__framed:
+      self.__frames.append(self.__beginFrame() if elementType == DataType.STRUCT else None)
     self.__writeVarInt(length)
     return self
 
+  def writePackedList(self, elementKind, bits, values):
+    if elementKind == types.TypeKind.FLOAT:
+      dataType = DataType.FLOAT
+    elif elementKind == types.TypeKind.DOUBLE:
+      dataType = DataType.DOUBLE
+    else:
+      dataType = self.FIXED_DTYPES[bits]
+    try:
+      data = struct.pack('!{0}{1}'.format(len(values), PACKED_FORMATS[dataType]), *values)
+    except struct.error as e:
+      # Fixed-width integers are unsigned in the binary format.
+      raise EncodingError('Invalid value in packed list field {0}: {1}'.format(
+          self.__fieldName, e))
+    self.__beginValue(DataType.PLIST)
+    self.__writeUByte(dataType)
+    self.__writeVarInt(len(values))
+    self.__buffer += data
+    return self
+
   def writeEndList(self):
+    if self.__framed:
+      frame = self.__frames.pop()
+      if frame is not None:
+        self.__endFrame(frame)
     return self
 
   writeBeginSet = writeBeginList
@@ -199,8 +364,12 @@ class BinaryEncoder(coda.io.AbstractEncoder):
 
   def writeBeginMap(self, keyKind, valueKind, length):
     self.__beginValue(DataType.MAP)
-    self.__writeUByte(
-        (self.KIND_TO_DTYPE[keyKind] << 4) | self.KIND_TO_DTYPE[valueKind])
+    keyType = self.KIND_TO_DTYPE[keyKind]
+    valueType = self.KIND_TO_DTYPE[valueKind]
+    self.__writeUByte((keyType << 4) | valueType)
+    if self.__framed:
+      self.__frames.append(self.__beginFrame()
+          if keyType == DataType.STRUCT or valueType == DataType.STRUCT else None)
     self.__writeVarInt(length)
     return self
 
@@ -228,20 +397,93 @@ class BinaryEncoder(coda.io.AbstractEncoder):
             value.descriptor().getFullName())
       self.__inProgress.add(sid)
       savedState = self.__state
-      if self.__fieldId is None and shared:
-        self.__writeUByte(DataType.SHARED_DEF)
+      if shared:
+        self.__sharedDefs += 1
+        if self.__fieldId is None:
+          self.__writeUByte(DataType.SHARED_DEF)
+      # Only struct fields are framed, elements are framed as part of the container.
+      frame = None
+      framed = self.__framed and self.__fieldId is not None
       self.__beginValue(DataType.SSTRUCT if shared else DataType.STRUCT)
+      if framed:
+        frame = self.__beginFrame()
+        self.__frames.append(frame)
       savedFieldId = self.__lastFieldId
       self.__lastFieldId = 0
       self.__state = self.State.STRUCT
-      value.writeFields(self)
+      self.writeFields(value)
       self.__writeUByte(DataType.END)
+      if frame is not None:
+        self.__endFrame(self.__frames.pop())
       self.__subtypeId = None
       self.__state = savedState
       self.__lastFieldId = savedFieldId
       self.__inProgress.remove(sid)
+      # Open frames still need their length to be filled in.
+      if len(self.__buffer) > self.__flushThreshold and not self.__frames:
+        self.flush()
     return self
 
+  def writeFields(self, value):
+    desc = value.descriptor()
+    writer = None
+    if type(value) is desc.getClass():
+      writer = desc.getPlan(BinaryEncoder.findFieldsWriter, BinaryEncoder.findFieldsWriter)
+    if writer is None:
+      value.writeFields(self)
+    else:
+      writer(value, self.__buffer, self, self.__lastFieldId,
+          self.__state == self.State.SUBTYPE)
+    return self
+
+  def resumeFields(self, lastFieldId, subtype):
+    '''Called by generated _writeFieldsBinary() methods before writing a value with the
+       generic methods. 'lastFieldId' is the id of the last field written, and 'subtype'
+       is true if a subtype header has been written.'''
+    self.__lastFieldId = lastFieldId
+    if subtype:
+      self.__state = self.State.SUBTYPE
+    return self
+
+  @staticmethod
+  def findFieldsWriter(struct):
+    '''Return the _writeFieldsBinary() method for the class of 'struct', or None if
+       any class in the hierarchy writes fields but has no generated binary writer.'''
+    cls = struct.getClass()
+    if cls is None:
+      return None
+    base = struct
+    while base is not None:
+      members = vars(base.getClass())
+      if '_writeFields' in members and '_writeFieldsBinary' not in members:
+        return None
+      base = base.getBaseType()
+    return cls._writeFieldsBinary
+
+  def __beginFrame(self):
+    strings = self.__strings
+    return (len(self.__buffer), self.__sharedDefs, len(strings) if strings is not None else 0)
+
+  def __endFrame(self, frame):
+    '''Insert the frame header at the start of a framed value: the length of the
+       value, the number of shared structs defined within it, and the number of string
+       table entries defined within it if there is a string table.'''
+    start, sharedDefs, stringDefs = frame
+    header = self.__varIntBytes(self.__sharedDefs - sharedDefs)
+    if self.__strings is not None:
+      header += self.__varIntBytes(len(self.__strings) - stringDefs)
+    length = len(self.__buffer) - start + len(header)
+    self.__buffer[start:start] = self.__varIntBytes(length) + header
+
+  @staticmethod
+  def __varIntBytes(i):
+    result = bytearray()
+    while i > 0x7f:
+      result.append((i & 0x7f) | 0x80)
+      i = i >> 7
+    result.append(i)
+    return result
+
   def __beginSubtype(self):
     if self.__subtypeId > 0 and self.__subtypeId <= 15:
       self.__writeUByte((self.__subtypeId << 4) | DataType.SUBTYPE)
@@ -275,16 +517,15 @@ class BinaryEncoder(coda.io.AbstractEncoder):
       self.__state = self.State.MAP_KEY
 
   def __writeUByte(self, byte):
-    self.__stream.write(bytes((byte,)))
+    self.__buffer.append(byte)
 
   def __writeVarInt(self, i):
     assert i >= 0
-    b = bytearray()
+    b = self.__buffer
     while i > 0x7f:
-      b.append((i & 0xff) | 0x80)
+      b.append((i & 0x7f) | 0x80)
       i = i >> 7
     b.append(i)
-    self.__stream.write(b)
     return self
 
   @staticmethod
@@ -300,25 +541,108 @@ class BinaryEncoder(coda.io.AbstractEncoder):
 # =============================================================================
 
 class BinaryDecoder(coda.io.AbstractDecoder):
-  def __init__(self, stream, sourcePath, typeRegistry):
+  '''Decoder for the binary format. Input can come either from a file-like stream, or
+     from an in-memory buffer (bytes, bytearray, memoryview or mmap). In the latter case,
+     the decoder walks the buffer with an integer cursor instead of calling stream.read()
+     for every byte.
+
+     If 'lazy' is true, which requires a buffer, struct, list and map fields are not
+     decoded immediately. Instead, the field holds a LazyValue recording where the
+     value is in the buffer, which is decoded on first access through the field
+     getters. Only classes generated with the 'lazyFields' option support this; other
+     classes are decoded normally. The buffer must remain valid until all deferred
+     fields have been loaded.
+
+     Strings written using a string table (see BinaryEncoder) are decoded once, and each
+     later occurrence returns the same str object.
+
+     A sequence of objects encoded with 'keepTables' is decoded by calling decode() for
+     each object, using resetBuffer() to supply the data of the next object. The shared
+     object and string tables are kept from one object to the next when the object is
+     marked as continuing them.
+
+     If 'bytesViews' is true, which requires a buffer, bytes values are returned as
+     read-only memoryview slices of the buffer instead of being copied. A view keeps the
+     buffer alive, and while any view exists a bytearray buffer cannot be resized and an
+     mmap buffer cannot be closed; the contents of a writable buffer must not be changed
+     while the views are in use. Views compare equal to bytes, and hash like bytes if the
+     buffer is read-only. Classes generated with the 'materializeBytes' option replace
+     views with bytes when frozen.
+
+     If 'cls' is given instead of a stream or buffer, the decoder is a push decoder for
+     input that arrives in pieces, such as a non-blocking socket. The input is a record
+     stream (see coda.io.recordfile): a sequence of instances of 'cls', each preceded by
+     its length as a VarInt. Each piece is passed to feed(), and objects() yields the
+     objects that have been completely received. The decoder does not wait for the rest
+     of a record: it decodes as far as the data goes, keeping the structs and containers
+     that are open on an explicit stack of frames, and resumes from there when more data
+     is fed. 'fields' is a projection, as for decode().'''
+  def __init__(self, stream, sourcePath, typeRegistry, buffer=None, lazy=False,
+      bytesViews=False, cls=None, fields=None):
     super().__init__()
+    assert buffer is not None or not lazy, 'Lazy decoding requires a buffer'
+    assert buffer is not None or not bytesViews, 'Bytes views require a buffer'
+    assert cls is None or (stream is None and buffer is None), \
+        'Push decoders have no stream or buffer'
+
     if not typeRegistry:
       from coda.runtime.typeregistry import TypeRegistry
       typeRegistry = TypeRegistry.INSTANCE
+    if isinstance(buffer, memoryview) and buffer.format != 'B':
+      buffer = buffer.cast('B')
     self.__stream = stream
+    self.__buffer = buffer
+    self.__bufferEnd = len(buffer) if buffer is not None else 0
     self.__states = []
     self.__sourcePath = sourcePath
     self.__typeRegistry = typeRegistry
     self.__descriptor = None
+    self.__projection = None
+    self.__lazy = lazy
+    # For bytes views: a read-only view of the buffer.
+    self.__bytesView = None
+    if bytesViews:
+      self.__bytesView = memoryview(buffer).cast('B').toreadonly()
+    # For lazy decoding: the shared object index of each shared struct seen so far,
+    # by buffer position, and the buffer position of the shared structs that have been
+    # skipped but not decoded yet, by index.
+    self.__sharedAt = {} if lazy else None
+    self.__deferredShared = {}
+    # For the framed format: the end of the frame following the last field header
+    # read, and the number of shared structs defined within it.
+    self.__framed = False
+    self.__frameEnd = 0
+    self.__frameShared = 0
+    self.__frameStrings = 0
+    # For string tables: the strings defined so far, and for lazy decoding, the index of
+    # each string by buffer position.
+    self.__strings = None
+    self.__stringAt = None
+    # The tables of the previous object decoded, if any.
+    self.__previousTables = None
+    self.__decoded = False
     self.__instance = None
     self.__fieldId = 0
     self.__subtypeId = 0
     self.__atEof = False
     self.__indentLevel = 0
-    self.__readPos = self.__pos()
+    self.__readPos = 0 if stream is None else self.__pos()
     self.__lastReadPos = self.__readPos
     self.__debug = False
     self.__debugPos = self.__readPos
+    # For push decoding: the class of the objects, the data that has been fed, the
+    # position in it of the next byte to decode, and the stream offset of its first
+    # byte. 'frames' is the stack of open structs and containers, 'recordEnd' is the
+    # stream offset of the end of the record being decoded, or None between records,
+    # and 'result' is the object decoded from it once it is complete.
+    self.__pushClass = cls
+    self.__pushProjection = Projection.create(fields)
+    self.__pending = bytearray()
+    self.__pendingPos = 0
+    self.__pendingBase = 0
+    self.__frames = []
+    self.__recordEnd = None
+    self.__result = None
 
   def setDebug(self, value):
     self.__debug = value
@@ -326,12 +650,639 @@ class BinaryDecoder(coda.io.AbstractDecoder):
   def atEof(self):
     return self.__atEof
 
-  def decode(self, cls):
+  def decode(self, cls, fields=None):
+    '''Decode an instance of 'cls'. If 'fields' is given, only those fields are decoded,
+       and the rest are skipped and left absent on the result. 'fields' is either a list
+       of field names, or a dict mapping field names to a projection (of the same form)
+       that is applied to the structs within that field; a projection of None decodes
+       the entire field.'''
     if self.__atEof is None:
       return None
     assert cls.DESCRIPTOR, 'Missing descriptor for class ' + cls.__name__
+    self.__projection = Projection.create(fields)
+    self.__framed = False
+    self.__instance = None
+    self.__fieldId = 0
+    # The tables are cleared, unless the file header says that this object continues
+    # the tables of the previous one.
+    previous = self.__resetTables()
+    self.__previousTables = previous if self.__decoded else None
+    self.__decoded = True
     return self.__readStructFields(cls.DESCRIPTOR, first=True)
 
+  def resetBuffer(self, buffer):
+    '''Continue with the data of the next object in a sequence, held in 'buffer'. The
+       shared object and string tables are kept, so that the object can refer to the
+       objects and strings defined by the previous ones.'''
+    assert self.__buffer is not None and not self.__lazy, \
+        'Only non-lazy buffer decoders can be reset'
+    if isinstance(buffer, memoryview) and buffer.format != 'B':
+      buffer = buffer.cast('B')
+    self.__buffer = buffer
+    self.__bufferEnd = len(buffer)
+    if self.__bytesView is not None:
+      self.__bytesView = memoryview(buffer).cast('B').toreadonly()
+    self.__readPos = self.__lastReadPos = self.__debugPos = 0
+    self.__atEof = False
+    self.__states = []
+    return self
+
+  def __resetTables(self):
+    '''Clear the shared object and string tables, and return the tables of the
+       previous object, which are reinstated if the next object continues them.'''
+    tables = (self.resetShared(), self.__strings, self.__sharedAt, self.__deferredShared,
+        self.__stringAt)
+    self.__strings = None
+    self.__sharedAt = {} if self.__lazy else None
+    self.__deferredShared = {}
+    self.__stringAt = None
+    return tables
+
+  # Push decoding. Each step decodes one field header, element or scalar value, and
+  # either completes it or opens a frame for a struct or container. A step reads
+  # nothing unless all of the data it needs has arrived, so that if the data runs out
+  # it can be repeated once more has been fed.
+
+  class StructFrame:
+    '''A struct being decoded by a push decoder. 'field' is the plan entry of the field
+       whose value is being decoded, while that value is decoded by the frames above
+       this one. If 'expectedType' is None, the struct is being skipped.'''
+    __slots__ = ('expectedType', 'baseType', 'instance', 'shared', 'first', 'start',
+        'fieldId', 'plan', 'projection', 'stringTag', 'field')
+
+    def __init__(self, expectedType, baseType, shared, projection, start, first=False):
+      self.expectedType = expectedType
+      self.baseType = baseType
+      self.instance = None
+      self.shared = shared
+      # True for the top-level struct of a record, which ends with the record.
+      self.first = first
+      # The stream offset of the first field header
+      self.start = start
+      self.fieldId = 0
+      self.plan = None
+      self.projection = projection
+      self.stringTag = None
+      self.field = None
+
+  class ListFrame:
+    '''A list or set being decoded by a push decoder, with 'remaining' elements of
+       type 'dataType' left to decode. If 'expectedType' is None, the list is being
+       skipped.'''
+    __slots__ = ('expectedType', 'elementType', 'dataType', 'remaining', 'result',
+        'projection')
+
+    def __init__(self, expectedType, elementType, dataType, remaining, projection):
+      self.expectedType = expectedType
+      self.elementType = elementType
+      self.dataType = dataType
+      self.remaining = remaining
+      self.result = []
+      self.projection = projection
+
+  class MapFrame:
+    '''A map being decoded by a push decoder, with 'remaining' entries left to decode.
+       'key' holds the key of an entry while its value is decoded. If 'expectedType' is
+       None, the map is being skipped.'''
+    __slots__ = ('expectedType', 'keyType', 'valueType', 'keyDataType', 'valueDataType',
+        'remaining', 'result', 'key', 'hasKey', 'projection')
+
+    def __init__(self, expectedType, keyType, valueType, keyDataType, valueDataType,
+        remaining, projection):
+      self.expectedType = expectedType
+      self.keyType = keyType
+      self.valueType = valueType
+      self.keyDataType = keyDataType
+      self.valueDataType = valueDataType
+      self.remaining = remaining
+      self.result = {}
+      self.key = None
+      self.hasKey = False
+      self.projection = projection
+
+  class SkipFrame:
+    '''A run of bytes being skipped by a push decoder, such as a framed value that is
+       not being decoded.'''
+    __slots__ = ('remaining',)
+
+    def __init__(self, remaining):
+      self.remaining = remaining
+
+  # Returned by __pushValue() for a value that is decoded by a new frame.
+  __PENDING = object()
+
+  def feed(self, data):
+    '''Add the next piece of the input of a push decoder.'''
+    assert self.__pushClass is not None, 'Only push decoders can be fed'
+    pending = self.__pending
+    pos = self.__pendingPos
+    if pos and pos * 2 >= len(pending):
+      # Discard the data that has been decoded once it is at least half of what is held,
+      # so that a value which arrives in many pieces is not copied for each one.
+      del pending[:pos]
+      self.__pendingBase += pos
+      self.__pendingPos = 0
+    pending += data
+    return self
+
+  def objects(self):
+    '''Yield the objects of a push decoder whose records have been completely fed.
+       Iteration stops when the data runs out, which can be in the middle of a record;
+       it resumes from that point when objects() is called again after more data has
+       been fed.'''
+    assert self.__pushClass is not None, 'Only push decoders have objects'
+    frames = self.__frames
+    while True:
+      buf = self.__pending
+      pos = self.__pendingPos
+      try:
+        if frames:
+          frame = frames[-1]
+          kind = type(frame)
+          if kind is BinaryDecoder.StructFrame:
+            pos = self.__pushStructStep(frame, buf, pos)
+          elif kind is BinaryDecoder.ListFrame:
+            pos = self.__pushListStep(frame, buf, pos)
+          elif kind is BinaryDecoder.MapFrame:
+            pos = self.__pushMapStep(frame, buf, pos)
+          else:
+            pos = self.__pushSkipStep(frame, buf, pos)
+        elif self.__recordEnd is None:
+          length, pos = self.readVarIntAt(buf, pos)
+          self.__beginRecord(self.__pendingBase + pos, length)
+        else:
+          result = self.__result
+          self.__result = None
+          self.__recordEnd = None
+          yield result
+          continue
+      except (IndexError, struct.error):
+        if self.__recordEnd is not None and \
+            self.__pendingBase + len(buf) >= self.__recordEnd:
+          # The step needs data beyond the end of the record
+          self.__pushTruncated()
+        return
+      if self.__recordEnd is not None and self.__pendingBase + pos > self.__recordEnd:
+        self.__pushTruncated()
+      self.__pendingPos = pos
+
+  def close(self):
+    '''Signal the end of the input of a push decoder. Raises an EncodingError if the
+       input ends with part of a record.'''
+    assert self.__pushClass is not None, 'Only push decoders can be closed'
+    end = self.__pendingBase + len(self.__pending)
+    if self.__frames:
+      self.fatal(end, 'Truncated record, {0} bytes missing', self.__recordEnd - end)
+    elif self.__recordEnd is None and self.__pendingPos < len(self.__pending):
+      self.fatal(self.__pendingBase + self.__pendingPos, 'Truncated record length')
+
+  def __beginRecord(self, start, length):
+    '''Start decoding the record of 'length' bytes at the stream offset 'start'. The
+       tables are cleared, unless the file header says that this object continues the
+       tables of the previous one.'''
+    self.__recordEnd = start + length
+    self.__framed = False
+    previous = self.__resetTables()
+    self.__previousTables = previous if self.__decoded else None
+    self.__decoded = True
+    desc = self.__pushClass.DESCRIPTOR
+    self.__frames.append(BinaryDecoder.StructFrame(
+        desc, self.__getBase(desc), False, self.__pushProjection, start, first=True))
+
+  def __pushTruncated(self):
+    name = self.__pushClass.DESCRIPTOR.getName()
+    for frame in reversed(self.__frames):
+      if type(frame) is BinaryDecoder.StructFrame and frame.expectedType is not None:
+        name = frame.expectedType.getName()
+        break
+    self.fatal(self.__lastReadPos, 'Unexpected end of record while reading struct: {0}', name)
+
+  def __pushStructStep(self, frame, buf, pos):
+    '''Decode the next field header of the struct in 'frame', along with the field
+       value if it is a scalar. Returns the position following what was decoded.'''
+    base = self.__pendingBase
+    if frame.first and base + pos == self.__recordEnd:
+      # The top-level struct ends with the record
+      self.__endStruct(frame, pos)
+      return pos
+    self.__lastReadPos = base + pos
+    skipping = frame.expectedType is None
+    if not skipping:
+      self.__descriptor = frame.expectedType
+    byte = buf[pos]
+    pos += 1
+    delta = byte >> 4
+    dataType = byte & 0x0f
+    if dataType == DataType.SUBTYPE:
+      if delta > 0:
+        subtypeId = delta
+      else:
+        subtypeId, pos = self.readVarIntAt(buf, pos)
+      if not skipping:
+        self.__pushSubtype(frame, subtypeId)
+      return pos
+    elif dataType == 0:
+      # A delta of 0 means that the data type is an extended data type (>15).
+      if byte == DataType.END:
+        self.__endStruct(frame, pos)
+      elif byte == DataType.FORMAT:
+        if not frame.first or base + pos != frame.start + 1:
+          self.fatal(self.__lastReadPos, 'File header is only allowed at the start of a file')
+        flags, pos = self.readVarIntAt(buf, pos)
+        self.__setFormat(flags)
+      elif byte == DataType.SHARED_DEF:
+        if skipping:
+          self.addShared(None)
+        else:
+          frame.shared = True
+      elif byte == DataType.SHARED_REF:
+        oid, pos = self.readVarIntAt(buf, pos)
+        value = None
+        if not skipping:
+          value = self.__getShared(self.zigZagDecode(oid), frame.expectedType)
+        self.__frames.pop()
+        self.__pushAccept(value)
+      elif byte == DataType.STRING_DEF or byte == DataType.STRING_REF:
+        # The field that follows is a string table entry
+        if self.__strings is None:
+          self.fatal(self.__lastReadPos, 'String table entry without a string table')
+        frame.stringTag = byte
+      else:
+        self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', byte)
+      return pos
+
+    fieldId = frame.fieldId
+    if delta > 0:
+      fieldId += delta
+    else:
+      fieldId, pos = self.readVarIntAt(buf, pos)
+      if 0 < fieldId - frame.fieldId < 15:
+        self.fatal(self.__lastReadPos, 'Invalid field ID encoding: {0} -> {1}',
+            frame.fieldId, fieldId)
+    header = None
+    if self.__framed and (dataType == DataType.STRUCT or dataType == DataType.SSTRUCT):
+      header, pos = self.__frameHeaderAt(buf, pos)
+
+    entry = None
+    projection = None
+    if not skipping:
+      if frame.instance is None:
+        self.__newInstance(frame)
+      if frame.plan is None:
+        frame.plan = frame.expectedType.getPlan(BinaryDecoder, BinaryDecoder.buildPlan)
+        if frame.projection is not None:
+          frame.plan = frame.projection.getPlan(
+              frame.expectedType, frame.plan, self.__typeRegistry)
+      # None for a field from a newer version of the schema, or not in the projection
+      entry = frame.plan.get(fieldId)
+      if entry is not None and frame.projection is not None:
+        projection = frame.projection.fields[entry[2]]
+
+    if frame.stringTag is not None:
+      tag = frame.stringTag
+      if dataType != (DataType.BYTES if tag == DataType.STRING_DEF else DataType.VARINT):
+        self.fatal(self.__lastReadPos, 'Invalid string table entry: 0x{0:x}', dataType)
+      value, pos = self.__tableStringAt(tag, buf, pos)
+      frame.stringTag = None
+      frame.fieldId = fieldId
+      if entry is not None:
+        field, slotName, fieldName, fieldType, _ = entry
+        if types.unmodified(fieldType).typeId() != types.TypeKind.STRING:
+          self.typeError(self.__lastReadPos, str,
+              "value of field '{0}:{1}'".format(
+                  frame.instance.descriptor().getName(), field.getName()), fieldType)
+        setattr(frame.instance, slotName, value)
+        frame.instance._setPresent(fieldName)
+      return pos
+
+    value, pos = self.__pushValue(
+        entry[3] if entry is not None else None, dataType, buf, pos, projection, header)
+    frame.fieldId = fieldId
+    frame.field = entry
+    if value is not self.__PENDING:
+      self.__pushAccept(value)
+    return pos
+
+  def __pushListStep(self, frame, buf, pos):
+    '''Decode the next element of the list in 'frame'.'''
+    self.__lastReadPos = self.__pendingBase + pos
+    value, pos = self.__pushElement(
+        frame.elementType, frame.dataType, buf, pos, frame.projection)
+    if value is not self.__PENDING:
+      self.__pushAccept(value)
+    return pos
+
+  def __pushMapStep(self, frame, buf, pos):
+    '''Decode the next key or value of the map in 'frame'.'''
+    self.__lastReadPos = self.__pendingBase + pos
+    if frame.hasKey:
+      value, pos = self.__pushElement(
+          frame.valueType, frame.valueDataType, buf, pos, frame.projection)
+    else:
+      value, pos = self.__pushElement(
+          frame.keyType, frame.keyDataType, buf, pos, frame.projection)
+    if value is not self.__PENDING:
+      self.__pushAccept(value)
+    return pos
+
+  def __pushSkipStep(self, frame, buf, pos):
+    '''Skip as much of the bytes in 'frame' as have been fed.'''
+    available = len(buf) - pos
+    if available <= 0:
+      raise IndexError('No more data')
+    if available < frame.remaining:
+      frame.remaining -= available
+      return len(buf)
+    pos += frame.remaining
+    self.__frames.pop()
+    self.__pushAccept(None)
+    return pos
+
+  def __pushElement(self, expectedType, dataType, buf, pos, projection):
+    '''Decode a list, set or map element for a push decoder, see __readElement().'''
+    if dataType == DataType.ONE or dataType == DataType.ZERO:
+      dataType = DataType.ONE if buf[pos] else DataType.ZERO
+      pos += 1
+    elif dataType == DataType.BYTES and self.__strings is not None:
+      tag = buf[pos]
+      if tag == DataType.STRING_DEF or tag == DataType.STRING_REF:
+        if expectedType is not None and \
+            types.unmodified(expectedType).typeId() != types.TypeKind.STRING:
+          self.typeError(self.__lastReadPos, str, 'string table entry', expectedType)
+        return self.__tableStringAt(tag, buf, pos + 1)
+      elif tag != DataType.BYTES:
+        self.fatal(self.__lastReadPos, 'Invalid string element tag: 0x{0:x}', tag)
+      pos += 1
+    return self.__pushValue(expectedType, dataType, buf, pos, projection)
+
+  def __pushValue(self, expectedType, dataType, buf, pos, projection, header=None):
+    '''Decode a value of type 'dataType' at 'pos' for a push decoder. Returns the value
+       and the position following it; structs and containers are decoded by a new
+       frame, and the value returned for them is __PENDING. If 'expectedType' is None,
+       the value is skipped, and the value returned is None. 'header' is the frame header
+       that follows the field header of a framed struct field. Raises IndexError or
+       struct.error, without changing anything, if the data runs out.'''
+    if expectedType is not None:
+      expectedType = types.unmodified(expectedType)
+      expectedKind = expectedType.typeId()
+    if dataType == DataType.ZERO:
+      value = 0
+    elif dataType == DataType.ONE:
+      value = 1
+    elif dataType == DataType.VARINT:
+      value, pos = self.readVarIntAt(buf, pos)
+      value = self.zigZagDecode(value)
+    elif dataType in (DataType.FIXED16, DataType.FIXED32, DataType.FIXED64):
+      value, pos = self.readFormatAt(buf, pos, dataType)
+    elif dataType == DataType.FLOAT or dataType == DataType.DOUBLE:
+      value, pos = self.readFormatAt(buf, pos, dataType)
+      if expectedType is None:
+        return None, pos
+      return self.__floatValue(expectedType, expectedKind, value), pos
+    elif dataType == DataType.BYTES:
+      length, pos = self.readVarIntAt(buf, pos)
+      if expectedType is None:
+        return self.__pushSkip(length), pos
+      end = pos + length
+      if end > len(buf):
+        raise IndexError('bytes value extends past the end of the data')
+      if expectedKind == types.TypeKind.STRING:
+        return str(buf[pos:end], 'utf-8'), end
+      elif expectedKind == types.TypeKind.BYTES:
+        return bytes(buf[pos:end]), end
+      self.fatal(self.__lastReadPos,
+          'Type error: Expecting {0}, got bytes', expectedType.getName())
+    elif dataType == DataType.PLIST:
+      elementDataType = buf[pos]
+      code = PACKED_FORMATS.get(elementDataType)
+      if code is None:
+        self.fatal(self.__lastReadPos,
+            'Invalid packed list element type: 0x{0:x}', elementDataType)
+      length, pos = self.readVarIntAt(buf, pos + 1)
+      size = length * struct.calcsize('!' + code)
+      if expectedType is None:
+        return self.__pushSkip(size), pos
+      if expectedKind != types.TypeKind.LIST and expectedKind != types.TypeKind.SET:
+        self.fatal(self.__lastReadPos,
+            'Type error: Expecting {0}, got a list', expectedType.getName())
+      elementType = expectedType.getElementType()
+      elementKind = types.unmodified(elementType).typeId()
+      if elementDataType in (DataType.FLOAT, DataType.DOUBLE):
+        if elementKind not in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
+          self.typeError(self.__lastReadPos, elementDataType, 'list element', elementType)
+      elif elementKind != types.TypeKind.INTEGER:
+        self.typeError(self.__lastReadPos, elementDataType, 'list element', elementType)
+      if pos + size > len(buf):
+        raise IndexError('packed list extends past the end of the data')
+      values = struct.unpack_from('!{0}{1}'.format(length, code), buf, pos)
+      if expectedKind == types.TypeKind.SET:
+        return set(values), pos + size
+      return list(values), pos + size
+    elif dataType == DataType.LIST:
+      elementDataType = buf[pos]
+      pos += 1
+      if elementDataType > DataType.MAXVAL:
+        self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', elementDataType)
+      if self.__framed and elementDataType == DataType.STRUCT:
+        header, pos = self.__frameHeaderAt(buf, pos)
+        if expectedType is None and header[2] == 0:
+          return self.__pushSkipFrame(header), pos
+      length, pos = self.readVarIntAt(buf, pos)
+      if expectedType is None:
+        elementType = None
+      elif expectedKind == types.TypeKind.LIST or expectedKind == types.TypeKind.SET:
+        elementType = expectedType.getElementType()
+      else:
+        self.fatal(self.__lastReadPos,
+            'Type error: Expecting {0}, got a list', expectedType.getName())
+      if length == 0:
+        if expectedType is None:
+          return None, pos
+        return set() if expectedKind == types.TypeKind.SET else [], pos
+      self.__frames.append(BinaryDecoder.ListFrame(
+          expectedType, elementType, elementDataType, length, projection))
+      return self.__PENDING, pos
+    elif dataType == DataType.MAP:
+      byte = buf[pos]
+      pos += 1
+      keyDataType = byte >> 4
+      valueDataType = byte & 0x0f
+      if self.__framed and DataType.STRUCT in (keyDataType, valueDataType):
+        header, pos = self.__frameHeaderAt(buf, pos)
+        if expectedType is None and header[2] == 0:
+          return self.__pushSkipFrame(header), pos
+      length, pos = self.readVarIntAt(buf, pos)
+      if expectedType is None:
+        keyType = valueType = None
+      elif expectedKind == types.TypeKind.MAP:
+        keyType = expectedType.getKeyType()
+        valueType = expectedType.getValueType()
+      else:
+        self.fatal(self.__lastReadPos,
+            'Type error: Expecting {0}, got a map', expectedType.getName())
+      if length == 0:
+        return None if expectedType is None else {}, pos
+      self.__frames.append(BinaryDecoder.MapFrame(expectedType, keyType, valueType,
+          keyDataType, valueDataType, length, projection))
+      return self.__PENDING, pos
+    elif dataType == DataType.STRUCT or dataType == DataType.SSTRUCT:
+      shared = dataType == DataType.SSTRUCT
+      if expectedType is None:
+        if shared:
+          self.addShared(None)
+        if header is not None and header[2] == 0:
+          return self.__pushSkipFrame(header), pos
+        self.__frames.append(BinaryDecoder.StructFrame(
+            None, None, False, None, self.__pendingBase + pos))
+        return self.__PENDING, pos
+      if expectedKind != types.TypeKind.STRUCT:
+        self.fatal(self.__lastReadPos,
+            'Type error: Expecting {0}, got a struct', expectedType.getName())
+      self.__frames.append(BinaryDecoder.StructFrame(expectedType,
+          self.__getBase(expectedType), shared, projection, self.__pendingBase + pos))
+      return self.__PENDING, pos
+    else:
+      self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', dataType)
+
+    # Integers
+    if expectedType is None:
+      return None, pos
+    return self.__integerValue(expectedType, expectedKind, dataType, value), pos
+
+  def __pushAccept(self, value):
+    '''Pass a decoded value to the frame on top of the stack: a field value for a
+       struct, or an element for a container. Containers that are completed by this
+       are popped, and their value is passed to the frame below them in turn.'''
+    frames = self.__frames
+    while frames:
+      frame = frames[-1]
+      kind = type(frame)
+      if kind is BinaryDecoder.StructFrame:
+        entry = frame.field
+        if entry is not None:
+          frame.field = None
+          self.__setField(frame.instance, entry, value)
+        return
+      elif kind is BinaryDecoder.ListFrame:
+        if frame.expectedType is not None:
+          if not frame.elementType.isAssignable(value):
+            self.typeError(self.__lastReadPos, type(value), 'list element', frame.elementType)
+          frame.result.append(value)
+        frame.remaining -= 1
+        if frame.remaining:
+          return
+        frames.pop()
+        value = frame.result
+        if frame.expectedType is None:
+          value = None
+        elif frame.expectedType.typeId() == types.TypeKind.SET:
+          value = set(value)
+      elif kind is BinaryDecoder.MapFrame:
+        if not frame.hasKey:
+          if frame.expectedType is not None and not frame.keyType.isAssignable(value):
+            self.typeError(self.__lastReadPos, type(value), 'map key', frame.keyType)
+          frame.key = value
+          frame.hasKey = True
+          return
+        if frame.expectedType is not None:
+          if not frame.valueType.isAssignable(value):
+            self.typeError(self.__lastReadPos, type(value), 'map value', frame.valueType)
+          frame.result[frame.key] = value
+        frame.key = None
+        frame.hasKey = False
+        frame.remaining -= 1
+        if frame.remaining:
+          return
+        frames.pop()
+        value = frame.result if frame.expectedType is not None else None
+      else:
+        return
+
+  def __setField(self, instance, entry, value):
+    field, slotName, fieldName, fieldType, _ = entry
+    if value is None and not field.getOptions().isNullable():
+      self.fatal(self.__lastReadPos, "Null value not allowed for field '{0}'", field.getName())
+    elif not fieldType.isAssignable(value):
+      self.typeError(self.__lastReadPos, type(value),
+          "value of field '{0}:{1}'".format(
+              instance.descriptor().getName(), field.getName()), fieldType)
+    setattr(instance, slotName, value)
+    instance._setPresent(fieldName)
+
+  def __newInstance(self, frame):
+    frame.instance = frame.expectedType.new()
+    if frame.shared:
+      self.addShared(frame.instance)
+
+  def __pushSubtype(self, frame, subtypeId):
+    '''Continue the struct in 'frame' with the fields of the subtype 'subtypeId'.'''
+    baseType = frame.baseType
+    if subtypeId == baseType.getTypeId():
+      subtype = baseType
+    else:
+      subtype = self.__typeRegistry.getSubtype(baseType, subtypeId)
+    if subtype is None:
+      self.fatal(self.__lastReadPos, 'No subtype id {0} found for base type {1}',
+          subtypeId, baseType.getName())
+    frame.expectedType = subtype
+    frame.plan = None
+    frame.fieldId = 0
+    if frame.instance is None:
+      self.__newInstance(frame)
+
+  def __endStruct(self, frame, pos):
+    '''Finish the struct in 'frame', which is on top of the stack, at 'pos'.'''
+    self.__frames.pop()
+    if frame.expectedType is None:
+      self.__pushAccept(None)
+      return
+    if frame.instance is None:
+      self.__newInstance(frame)
+    if not frame.first:
+      self.__pushAccept(frame.instance)
+      return
+    self.__result = frame.instance
+    remaining = self.__recordEnd - (self.__pendingBase + pos)
+    if remaining:
+      # Data following the end of the top-level struct is ignored.
+      self.__frames.append(BinaryDecoder.SkipFrame(remaining))
+
+  def __frameHeaderAt(self, buf, pos):
+    '''Read the frame header at 'pos' for a push decoder. Returns the number of bytes in
+       the frame following the header, the number of shared structs and of string table
+       entries defined within the frame, and the position following the header.'''
+    length, start = self.readVarIntAt(buf, pos)
+    shared, pos = self.readVarIntAt(buf, start)
+    strings = 0
+    if self.__strings is not None:
+      strings, pos = self.readVarIntAt(buf, pos)
+    return (start + length - pos, shared, strings), pos
+
+  def __pushSkipFrame(self, header):
+    '''Skip a frame, reserving the shared object indices of the shared structs within
+       it. Frames that define string table entries have to be walked instead.'''
+    for _ in range(header[1]):
+      self.addShared(None)
+    return self.__pushSkip(header[0])
+
+  def __pushSkip(self, length):
+    if length == 0:
+      return None
+    self.__frames.append(BinaryDecoder.SkipFrame(length))
+    return self.__PENDING
+
+  def __tableStringAt(self, tag, buf, pos):
+    '''Read a string table definition or reference at 'pos' for a push decoder.'''
+    strings = self.__strings
+    if tag == DataType.STRING_REF:
+      index, pos = self.readVarIntAt(buf, pos)
+      if index >= len(strings):
+        self.fatal(self.__lastReadPos, 'Invalid string table index: {0}', index)
+      return strings[index], pos
+    value, pos = self.readStringAt(buf, pos)
+    strings.append(value)
+    return value, pos
+
   def __readValue(self, expectedType, actualType):
     expectedKind = expectedType.typeId()
     if expectedKind == types.TypeKind.MODIFIED:
@@ -355,7 +1306,7 @@ class BinaryDecoder(coda.io.AbstractDecoder):
          expectedKind != types.TypeKind.SET:
         self.fatal(self.__lastReadPos,
             'Type error: Expecting {0}, got a list', expectedType.getName())
-      assert False, 'Packed list not implemented'
+      return self.__readPackedListValue(expectedType)
     elif actualType == DataType.MAP:
       return self.__readMapValue(expectedType)
     elif actualType in (DataType.ZERO, DataType.ONE, DataType.VARINT,
@@ -368,58 +1319,108 @@ class BinaryDecoder(coda.io.AbstractDecoder):
         value = self.__readVarInt()
         value = self.zigZagDecode(value)
       elif actualType == DataType.FIXED16:
-        value, = DataFormat.FIXED16.unpack(self.__readBytes(2))
+        value = self.__readFormat(DataFormat.FIXED16)
       elif actualType == DataType.FIXED32:
-        value, = DataFormat.FIXED16.unpack(self.__readBytes(4))
+        value = self.__readFormat(DataFormat.FIXED32)
       elif actualType == DataType.FIXED64:
-        value, = DataFormat.FIXED16.unpack(self.__readBytes(8))
+        value = self.__readFormat(DataFormat.FIXED64)
       else:
         assert False
-
-      if expectedKind == types.TypeKind.INTEGER:
-        return value
-      elif expectedKind == types.TypeKind.BOOL:
-        return bool(value)
-      elif expectedKind == types.TypeKind.STRUCT:
-        if actualType == DataType.ZERO:
-          return None
-        elif actualType == DataType.ONE:
-          return self.__getShared(1)
-        elif actualType == DataType.VARINT:
-          return self.__getShared(value)
-        # Fall through
-      elif expectedKind == types.TypeKind.ENUM:
-        return value
-      elif expectedKind in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
-        return float(value)
-
-      self.fatal(self.__lastReadPos,
-          'Type error: Expecting {0}, got an integer', expectedType.getName())
+      return self.__integerValue(expectedType, expectedKind, actualType, value)
     elif actualType in (DataType.FLOAT, DataType.DOUBLE):
       if actualType == DataType.FLOAT:
-        value, = DataFormat.FLOAT.unpack(self.__readBytes(4))
+        value = self.__readFormat(DataFormat.FLOAT)
       else:
-        value, = DataFormat.DOUBLE.unpack(self.__readBytes(8))
-
-      if expectedKind in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
-        return value
-
-      self.fatal(self.__lastReadPos,
-          'Type error: Expecting {0}, got a float', expectedType.getName())
+        value = self.__readFormat(DataFormat.DOUBLE)
+      return self.__floatValue(expectedType, expectedKind, value)
     elif actualType == DataType.BYTES:
       length = self.__readVarInt()
-      data = self.__readBytes(length)
-
       if expectedKind == types.TypeKind.STRING:
-        return data.decode()
+        return self.__readBytes(length).decode()
       elif expectedKind == types.TypeKind.BYTES:
-        return data
+        return self.__readBytesValue(length)
 
       self.fatal(self.__lastReadPos,
           'Type error: Expecting {0}, got bytes', expectedType.getName())
     else:
       assert False, 'Invalid data type'
 
+  def __integerValue(self, expectedType, expectedKind, actualType, value):
+    '''Convert 'value', which was encoded as 'actualType', to the expected type.
+       Integers are used for booleans and for shared struct references, as well as
+       numbers.'''
+    if expectedKind == types.TypeKind.INTEGER:
+      return value
+    elif expectedKind == types.TypeKind.BOOL:
+      return bool(value)
+    elif expectedKind == types.TypeKind.STRUCT:
+      if actualType == DataType.ZERO:
+        return None
+      elif actualType == DataType.ONE:
+        return self.__getShared(1, expectedType)
+      elif actualType == DataType.VARINT:
+        return self.__getShared(value, expectedType)
+      # Fall through
+    elif expectedKind == types.TypeKind.ENUM:
+      return value
+    elif expectedKind in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
+      return float(value)
+
+    self.fatal(self.__lastReadPos,
+        'Type error: Expecting {0}, got an integer', expectedType.getName())
+
+  def __floatValue(self, expectedType, expectedKind, value):
+    if expectedKind in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
+      return value
+
+    self.fatal(self.__lastReadPos,
+        'Type error: Expecting {0}, got a float', expectedType.getName())
+
+  def __readElement(self, expectedType, actualType):
+    '''Read a list, set or map element. Elements have no field header, so boolean
+       values are stored as a single byte rather than in the data type.'''
+    if actualType == DataType.ONE or actualType == DataType.ZERO:
+      actualType = DataType.ONE if self.__readUByte() else DataType.ZERO
+    elif actualType == DataType.BYTES and self.__strings is not None:
+      return self.__readStringElement(expectedType, actualType)
+    return self.__readValue(expectedType, actualType)
+
+  def __readStringElement(self, expectedType, actualType):
+    '''Read a list, set or map element of type DATA_BYTES, when there is a string table.
+       Each element is tagged to indicate whether it is a string table entry.'''
+    tag = self.__readTypeByte()
+    if tag == DataType.BYTES:
+      return self.__readValue(expectedType, DataType.BYTES)
+    elif tag == DataType.STRING_DEF or tag == DataType.STRING_REF:
+      if types.unmodified(expectedType).typeId() != types.TypeKind.STRING:
+        self.typeError(self.__lastReadPos, str, 'string table entry', expectedType)
+      return self.__readTableString(tag)
+    self.fatal(self.__lastReadPos, 'Invalid string element tag: 0x{0:x}', tag)
+
+  def __readTableString(self, tag):
+    '''Read a string table definition or reference, following its field header or tag.'''
+    if tag == DataType.STRING_REF:
+      index = self.__readVarInt()
+      try:
+        return self.__strings[index]
+      except IndexError:
+        self.fatal(self.__lastReadPos, 'Invalid string table index: {0}', index)
+    pos = self.__readPos
+    return self.__addString(pos, self.__readBytes(self.__readVarInt()).decode())
+
+  def __addString(self, pos, value):
+    '''Add 'value', the string table entry defined at 'pos', to the string table. When
+       decoding lazily, the same definition can be read more than once, so the existing
+       entry is returned in that case.'''
+    strings = self.__strings
+    if self.__stringAt is not None:
+      index = self.__stringAt.get(pos)
+      if index is not None:
+        return strings[index]
+      self.__stringAt[pos] = len(strings)
+    strings.append(value)
+    return value
+
   def __readStructValue(self, expectedType, shared):
     originalType = expectedType
     if expectedType.typeId() == types.TypeKind.MODIFIED:
@@ -462,6 +1463,8 @@ class BinaryDecoder(coda.io.AbstractDecoder):
           'Premature end of stream while reading map in struct {0}', self.__descriptor.getName())
     actualKeyType = actualType >> 4
     actualValueType = actualType & 0x0f
+    if self.__framed and (actualKeyType == DataType.STRUCT or actualValueType == DataType.STRUCT):
+      self.__readFrameHeader()
 
     length = self.__readVarInt()
     result = {}
@@ -469,10 +1472,10 @@ class BinaryDecoder(coda.io.AbstractDecoder):
       self.__debugf('begin {0} [{1}]', expectedType.getName(), length)
       self.__indentLevel += 1
     for _ in range(length):
-      key = self.__readValue(keyType, actualKeyType)
+      key = self.__readElement(keyType, actualKeyType)
       if not keyType.isAssignable(key):
         self.typeError(self.__lastReadPos, type(key), 'map key', keyType)
-      value = self.__readValue(valueType, actualValueType)
+      value = self.__readElement(valueType, actualValueType)
       if not valueType.isAssignable(value):
         self.typeError(self.__lastReadPos, type(value), 'map value', valueType)
       result[key] = value
@@ -495,17 +1498,26 @@ class BinaryDecoder(coda.io.AbstractDecoder):
           'Premature end of stream while reading list in struct {0}', self.__descriptor.getName())
     if actualElementType > DataType.MAXVAL:
       self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', elementType)
+    if self.__framed and actualElementType == DataType.STRUCT:
+      self.__readFrameHeader()
 
     length = self.__readVarInt()
     result = []
     if self.__debug:
       self.__debugf('begin {0} [{1}]', expectedType.getName(), length)
       self.__indentLevel += 1
-    for _ in range(length):
-      element = self.__readValue(elementType, actualElementType)
-      if not elementType.isAssignable(element):
-        self.typeError(self.__lastReadPos, type(element), 'list element', elementType)
-      result.append(element)
+    reader = self.ELEMENT_READERS.get(elementType.typeId())
+    if actualElementType == DataType.BYTES and self.__strings is not None:
+      reader = BinaryDecoder.__readStringElement
+    if reader is not None:
+      for _ in range(length):
+        result.append(reader(self, elementType, actualElementType))
+    else:
+      for _ in range(length):
+        element = self.__readElement(elementType, actualElementType)
+        if not elementType.isAssignable(element):
+          self.typeError(self.__lastReadPos, type(element), 'list element', elementType)
+        result.append(element)
 
     if expectedType.typeId() == types.TypeKind.SET:
       result = set(result)
@@ -516,11 +1528,365 @@ class BinaryDecoder(coda.io.AbstractDecoder):
 
     return result
 
+  def __readPackedListValue(self, expectedType):
+    if expectedType.typeId() == types.TypeKind.MODIFIED:
+      expectedType = expectedType.getElementType()
+    elementType = expectedType.getElementType()
+    elementKind = types.unmodified(elementType).typeId()
+    actualElementType = self.__readUByte()
+    if actualElementType is None:
+      self.fatal(self.__lastReadPos,
+          'Premature end of stream while reading list in struct {0}', self.__descriptor.getName())
+    code = PACKED_FORMATS.get(actualElementType)
+    if code is None:
+      self.fatal(self.__lastReadPos, 'Invalid packed list element type: 0x{0:x}', actualElementType)
+    if actualElementType in (DataType.FLOAT, DataType.DOUBLE):
+      if elementKind not in (types.TypeKind.FLOAT, types.TypeKind.DOUBLE):
+        self.typeError(self.__lastReadPos, actualElementType, 'list element', elementType)
+    elif elementKind != types.TypeKind.INTEGER:
+      self.typeError(self.__lastReadPos, actualElementType, 'list element', elementType)
+
+    length = self.__readVarInt()
+    values = self.__readPacked('!{0}{1}'.format(length, code), length * struct.calcsize('!' + code))
+    if self.__debug:
+      self.__debugf('packed {0} [{1}]', expectedType.getName(), length)
+
+    if expectedType.typeId() == types.TypeKind.SET:
+      return set(values)
+    return list(values)
+
+  # Sizes of fixed-width values, by data type.
+  FIXED_SIZES = {
+    DataType.FIXED16: 2,
+    DataType.FIXED32: 4,
+    DataType.FIXED64: 8,
+    DataType.FLOAT: 4,
+    DataType.DOUBLE: 8,
+  }
+
+  def skipValue(self, dataType):
+    '''Advance over a field value of type 'dataType' without decoding it. Shared
+       structs within the value are still counted, so that later shared object
+       references resolve correctly. 'dataType' is the type in the field header that
+       was just read.'''
+    if self.__framed and (dataType == DataType.STRUCT or dataType == DataType.SSTRUCT):
+      # The frame header was read along with the field header.
+      if dataType == DataType.SSTRUCT:
+        self.__skipShared(self.__readPos)
+      if self.__canSkipFrame():
+        self.__skipFrame()
+        return
+      dataType = DataType.STRUCT
+    if self.__buffer is not None:
+      try:
+        pos = self.__skipValueAt(self.__buffer, self.__readPos, dataType)
+      except IndexError:
+        pos = self.__bufferEnd + 1
+      if pos > self.__bufferEnd:
+        self.fatal(self.__lastReadPos,
+            'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+      self.__readPos = pos
+    elif dataType == DataType.ZERO or dataType == DataType.ONE:
+      pass
+    elif dataType == DataType.VARINT:
+      self.__readVarInt()
+    elif dataType in self.FIXED_SIZES:
+      self.__skipBytes(self.FIXED_SIZES[dataType])
+    elif dataType == DataType.BYTES:
+      self.__skipBytes(self.__readVarInt())
+    elif dataType == DataType.LIST:
+      elementType = self.__readTypeByte()
+      if self.__framed and elementType == DataType.STRUCT:
+        self.__readFrameHeader()
+        if self.__canSkipFrame():
+          self.__skipFrame()
+          return
+      for _ in range(self.__readVarInt()):
+        self.__skipElement(elementType)
+    elif dataType == DataType.PLIST:
+      elementType = self.__readTypeByte()
+      if elementType not in self.FIXED_SIZES:
+        self.fatal(self.__lastReadPos, 'Invalid packed list element type: {0}', elementType)
+      self.__skipBytes(self.__readVarInt() * self.FIXED_SIZES[elementType])
+    elif dataType == DataType.MAP:
+      elementTypes = self.__readTypeByte()
+      if self.__framed and DataType.STRUCT in (elementTypes >> 4, elementTypes & 0x0f):
+        self.__readFrameHeader()
+        if self.__canSkipFrame():
+          self.__skipFrame()
+          return
+      for _ in range(self.__readVarInt()):
+        self.__skipElement(elementTypes >> 4)
+        self.__skipElement(elementTypes & 0x0f)
+    elif dataType == DataType.STRUCT:
+      self.__skipStruct()
+    elif dataType == DataType.SSTRUCT:
+      self.addShared(None)
+      self.__skipStruct()
+    else:
+      self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', dataType)
+
+  def __skipElement(self, dataType):
+    if dataType == DataType.ZERO or dataType == DataType.ONE:
+      self.__skipBytes(1)
+    elif dataType == DataType.STRUCT:
+      self.__skipStruct()
+    elif dataType == DataType.BYTES and self.__strings is not None:
+      # String table definitions still have to be read.
+      tag = self.__readTypeByte()
+      if tag == DataType.STRING_DEF:
+        self.__readTableString(tag)
+      elif tag == DataType.STRING_REF:
+        self.__readVarInt()
+      elif tag == DataType.BYTES:
+        self.__skipBytes(self.__readVarInt())
+      else:
+        self.fatal(self.__lastReadPos, 'Invalid string element tag: 0x{0:x}', tag)
+    else:
+      self.skipValue(dataType)
+
+  def __skipStruct(self):
+    '''Advance over the fields of a struct, including subtype records, up to and
+       including the terminating END.'''
+    while True:
+      byte = self.__readTypeByte()
+      dataType = byte & 0x0f
+      if byte == DataType.END:
+        return
+      elif byte == DataType.SHARED_REF:
+        self.__readVarInt()
+        return
+      elif byte == DataType.SHARED_DEF:
+        self.addShared(None)
+      elif byte == DataType.STRING_DEF:
+        byte = self.__readTypeByte()
+        if byte & 0x0f != DataType.BYTES:
+          self.fatal(self.__lastReadPos, 'Invalid string table definition: 0x{0:x}', byte)
+        if byte >> 4 == 0:
+          self.__readVarInt()
+        self.__readTableString(DataType.STRING_DEF)
+      elif byte == DataType.STRING_REF:
+        # The index follows as an integer field
+        pass
+      elif dataType == DataType.END:
+        self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', byte)
+      elif dataType == DataType.SUBTYPE:
+        if byte >> 4 == 0:
+          self.__readVarInt()
+      else:
+        if byte >> 4 == 0:
+          self.__readVarInt()
+        if self.__framed and (dataType == DataType.STRUCT or dataType == DataType.SSTRUCT):
+          self.__readFrameHeader()
+        self.skipValue(dataType)
+
+  # Buffer versions of the skip methods, which take and return the read position.
+  # Reading past the end of the buffer raises IndexError, or returns a position
+  # beyond the end, which skipValue() reports.
+
+  def __skipValueAt(self, buf, pos, dataType):
+    if dataType == DataType.ZERO or dataType == DataType.ONE:
+      return pos
+    elif dataType == DataType.VARINT:
+      while buf[pos] & 0x80:
+        pos += 1
+      return pos + 1
+    elif dataType in self.FIXED_SIZES:
+      return pos + self.FIXED_SIZES[dataType]
+    elif dataType == DataType.BYTES:
+      length, pos = self.readVarIntAt(buf, pos)
+      return pos + length
+    elif dataType == DataType.LIST:
+      elementType = buf[pos]
+      pos += 1
+      if self.__framed and elementType == DataType.STRUCT:
+        end, pos = self.__skipFrameAt(buf, pos)
+        if end is not None:
+          return end
+      length, pos = self.readVarIntAt(buf, pos)
+      if elementType == DataType.ZERO or elementType == DataType.ONE:
+        return pos + length
+      elif elementType in self.FIXED_SIZES:
+        return pos + length * self.FIXED_SIZES[elementType]
+      for _ in range(length):
+        pos = self.__skipElementAt(buf, pos, elementType)
+      return pos
+    elif dataType == DataType.PLIST:
+      elementType = buf[pos]
+      if elementType not in self.FIXED_SIZES:
+        self.fatal(self.__lastReadPos, 'Invalid packed list element type: {0}', elementType)
+      length, pos = self.readVarIntAt(buf, pos + 1)
+      return pos + length * self.FIXED_SIZES[elementType]
+    elif dataType == DataType.MAP:
+      elementTypes = buf[pos]
+      pos += 1
+      if self.__framed and DataType.STRUCT in (elementTypes >> 4, elementTypes & 0x0f):
+        end, pos = self.__skipFrameAt(buf, pos)
+        if end is not None:
+          return end
+      length, pos = self.readVarIntAt(buf, pos)
+      for _ in range(length):
+        pos = self.__skipElementAt(buf, pos, elementTypes >> 4)
+        pos = self.__skipElementAt(buf, pos, elementTypes & 0x0f)
+      return pos
+    elif dataType == DataType.STRUCT:
+      return self.__skipStructAt(buf, pos)
+    elif dataType == DataType.SSTRUCT:
+      self.__skipShared(pos)
+      return self.__skipStructAt(buf, pos)
+    self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', dataType)
+
+  def __skipElementAt(self, buf, pos, dataType):
+    if dataType == DataType.ZERO or dataType == DataType.ONE:
+      return pos + 1
+    elif dataType == DataType.STRUCT:
+      return self.__skipStructAt(buf, pos)
+    elif dataType == DataType.BYTES and self.__strings is not None:
+      tag = buf[pos]
+      if tag == DataType.STRING_DEF:
+        return self.__skipStringDefAt(buf, pos + 1)
+      elif tag == DataType.STRING_REF or tag == DataType.BYTES:
+        return self.__skipValueAt(buf, pos + 1, DataType.VARINT if tag == DataType.STRING_REF
+            else DataType.BYTES)
+      self.fatal(self.__lastReadPos, 'Invalid string element tag: 0x{0:x}', tag)
+    return self.__skipValueAt(buf, pos, dataType)
+
+  def __skipStringDefAt(self, buf, pos):
+    '''Add the string table entry defined at 'pos' to the string table, and return the
+       position following it.'''
+    value, end = self.readStringAt(buf, pos)
+    self.__addString(pos, value)
+    return end
+
+  def __skipStructAt(self, buf, pos):
+    start = pos
+    while True:
+      byte = buf[pos]
+      pos += 1
+      dataType = byte & 0x0f
+      if byte == DataType.END:
+        return pos
+      elif byte == DataType.SHARED_REF:
+        _, pos = self.readVarIntAt(buf, pos)
+        return pos
+      elif byte == DataType.SHARED_DEF:
+        self.__skipShared(start)
+      elif byte == DataType.STRING_DEF:
+        byte = buf[pos]
+        pos += 1
+        if byte & 0x0f != DataType.BYTES:
+          self.fatal(self.__lastReadPos, 'Invalid string table definition: 0x{0:x}', byte)
+        if byte < 0x10:
+          _, pos = self.readVarIntAt(buf, pos)
+        pos = self.__skipStringDefAt(buf, pos)
+      elif byte == DataType.STRING_REF:
+        # The index follows as an integer field
+        pass
+      elif dataType == DataType.END:
+        self.fatal(self.__lastReadPos, 'Invalid data type: 0x{0:x}', byte)
+      else:
+        if byte < 0x10:
+          _, pos = self.readVarIntAt(buf, pos)
+        if dataType == DataType.SUBTYPE:
+          continue
+        if self.__framed and (dataType == DataType.STRUCT or dataType == DataType.SSTRUCT):
+          end, pos = self.__skipFrameAt(buf, pos)
+          if dataType == DataType.SSTRUCT:
+            self.__skipShared(pos)
+          if end is not None:
+            pos = end
+            continue
+          dataType = DataType.STRUCT
+        pos = self.__skipValueAt(buf, pos, dataType)
+
+  def __readFrameHeader(self):
+    length = self.__readVarInt()
+    self.__frameEnd = self.__readPos + length
+    self.__frameShared = self.__readVarInt()
+    if self.__strings is not None:
+      self.__frameStrings = self.__readVarInt()
+
+  def __canSkipFrame(self):
+    '''True if the frame whose header was just read can be skipped without walking it.
+       Frames that define string table entries have to be walked to read the strings,
+       and lazy decoding needs to know where the shared structs are.'''
+    return not self.__frameStrings and (not self.__frameShared or self.__sharedAt is None)
+
+  def __skipFrame(self):
+    '''Skip to the end of the frame whose header was just read, reserving the shared
+       object indices of the shared structs within it.'''
+    for _ in range(self.__frameShared):
+      self.addShared(None)
+    self.__skipBytes(self.__frameEnd - self.__readPos)
+
+  def __skipFrameAt(self, buf, pos):
+    '''Read the frame header at 'pos'. Returns the end of the frame, or None if the
+       contents need to be walked to locate the shared structs within it, and the
+       position following the frame header.'''
+    length, start = self.readVarIntAt(buf, pos)
+    count, pos = self.readVarIntAt(buf, start)
+    if self.__strings is not None:
+      stringCount, pos = self.readVarIntAt(buf, pos)
+      if stringCount:
+        return None, pos
+    if count and self.__sharedAt is not None:
+      return None, pos
+    for _ in range(count):
+      self.addShared(None)
+    return start + length, pos
+
+  def __skipShared(self, pos):
+    '''Reserve a shared object index for the shared struct at 'pos', which is being
+       skipped. When decoding lazily, the struct can be decoded later if it is
+       referenced.'''
+    sharedAt = self.__sharedAt
+    if sharedAt is None:
+      self.addShared(None)
+    elif pos not in sharedAt:
+      index = sharedAt[pos] = self.addShared(None)
+      self.__deferredShared[index] = pos
+
+  def __addSharedInstance(self, pos):
+    '''Add the instance being decoded, a shared struct at 'pos', to the shared object
+       table.'''
+    sharedAt = self.__sharedAt
+    if sharedAt is None:
+      return self.addShared(self.__instance)
+    index = sharedAt.get(pos)
+    if index is None:
+      index = sharedAt[pos] = self.addShared(self.__instance)
+    else:
+      # Reserved when the struct was skipped
+      self.setShared(index, self.__instance)
+      del self.__deferredShared[index]
+    return index
+
+  def __readTypeByte(self):
+    byte = self.__readUByte()
+    if byte is None:
+      self.fatal(self.__lastReadPos,
+          'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+    return byte
+
   def __readStructFields(self, expectedType, first=False, shared=False):
+    start = self.__readPos
+    if self.__sharedAt is not None and start in self.__sharedAt:
+      # A shared struct that was already decoded because it was referenced
+      existing = self.getShared(self.__sharedAt[start])
+      if existing is not None:
+        self.__readPos = self.__skipStructAt(self.__buffer, start)
+        return existing
     baseType = self.__getBase(expectedType)
     self.__descriptor = baseType
     self.__fieldId = 0
+    plan = None
+    lazyFields = None
+    stringTag = None
+    projection = self.__projection
+    fieldsReader = self.__getFieldsReader(expectedType)
     while not self.__atEof:
+      if fieldsReader is not None and self.__instance is not None and stringTag is None:
+        self.__readFieldsFast(fieldsReader)
       dataType = self.__readFieldHeader()
       if dataType is None:
         if first:
@@ -531,14 +1897,24 @@ class BinaryDecoder(coda.io.AbstractDecoder):
 
       if dataType == DataType.END:
         break
+      elif dataType == DataType.FORMAT:
+        if not first or self.__lastReadPos != start + 1:
+          self.fatal(self.__lastReadPos, 'File header is only allowed at the start of a file')
+        self.__setFormat(self.__readVarInt())
+        start = self.__readPos
       elif dataType == DataType.SHARED_DEF:
         shared = True
+      elif dataType == DataType.STRING_DEF or dataType == DataType.STRING_REF:
+        # The field that follows is a string table entry
+        if self.__strings is None:
+          self.fatal(self.__lastReadPos, 'String table entry without a string table')
+        stringTag = dataType
       elif dataType == DataType.SHARED_REF:
         assert not shared
         oid = self.zigZagDecode(self.__readVarInt())
         if self.__debug:
           self.__debugf('shared ref: {0}', oid)
-        return self.__getShared(oid)
+        return self.__getShared(oid, expectedType)
       elif dataType == DataType.SUBTYPE:
 #         base = self.__getBase(self.__descriptor)
         if self.__subtypeId == baseType.getTypeId():
@@ -548,6 +1924,8 @@ class BinaryDecoder(coda.io.AbstractDecoder):
         if subtype:
 #           self.__states.append((self.__fieldId, self.__descriptor))
           expectedType = subtype
+          plan = None
+          fieldsReader = self.__getFieldsReader(expectedType)
           self.__fieldId = 0
           if self.__debug:
             self.__debugf('subtype: {0}({1})',
@@ -566,7 +1944,7 @@ class BinaryDecoder(coda.io.AbstractDecoder):
         if self.__instance is None:
           self.__instance = expectedType.new()
           if shared:
-            index = self.addShared(self.__instance)
+            index = self.__addSharedInstance(start)
             if self.__debug:
               self.__debugf('+shared: {0}', index)
 #         assert self.__descriptor is subtype
@@ -578,43 +1956,299 @@ class BinaryDecoder(coda.io.AbstractDecoder):
         if self.__instance is None:
           self.__instance = expectedType.new()
           if shared:
-            index = self.addShared(self.__instance)
+            index = self.__addSharedInstance(start)
             if self.__debug:
               self.__debugf('+shared: {0}', index)
-        field = expectedType.getFieldById(self.__fieldId)
-        if not field:
-          self.fatal(self.__lastReadPos, 'Unknown field #{0} of type {1}',
-              self.__fieldId, expectedType.getName())
-        fieldType = field.getType();
+        if plan is None:
+          plan = expectedType.getPlan(BinaryDecoder, BinaryDecoder.buildPlan)
+          if projection is not None:
+            plan = projection.getPlan(expectedType, plan, self.__typeRegistry)
+          if self.__lazy:
+            lazyFields = expectedType.getPlan(
+                BinaryDecoder.findLazyFields, BinaryDecoder.findLazyFields)
+        if stringTag is not None:
+          # Read even if the field is skipped, since it may define a string table entry.
+          if dataType != (DataType.BYTES if stringTag == DataType.STRING_DEF else DataType.VARINT):
+            self.fatal(self.__lastReadPos, 'Invalid string table entry: 0x{0:x}', dataType)
+          value = self.__readTableString(stringTag)
+          stringTag = None
+        else:
+          value = None
+        try:
+          field, slotName, fieldName, fieldType, reader = plan[self.__fieldId]
+        except KeyError:
+          # Field from a newer version of the schema, or not in the projection
+          if self.__debug:
+            self.__debugf('skip field: {0}.#{1} data:{2}',
+                expectedType.getName(), self.__fieldId, DTYPE_NAMES[dataType])
+          if value is None:
+            self.skipValue(dataType)
+          continue
         if self.__debug:
           self.__debugf('field: {0}.{1}(2) type:{3} data:{4}',
               expectedType.getName(), field.getName(), self.__fieldId,
               fieldType.getName(), DTYPE_NAMES[dataType])
-        value = self.__readValue(fieldType, dataType)
-        if value is None and not field.getOptions().isNullable():
-          self.fatal(self.__lastReadPos, "Null value not allowed for field '{0}'", field.getName())
-        elif not fieldType.isAssignable(value):
-          self.typeError(self.__lastReadPos, type(value),
-              "value of field '{0}:{1}'".format(
-                  self.__instance.descriptor().getName(), field.getName()), fieldType)
-        field.setValue(self.__instance, value)
+        if value is not None:
+          if types.unmodified(fieldType).typeId() != types.TypeKind.STRING:
+            self.typeError(self.__lastReadPos, str,
+                "value of field '{0}:{1}'".format(
+                    self.__instance.descriptor().getName(), field.getName()), fieldType)
+        elif reader is not None:
+          value = reader(self, fieldType, dataType)
+        elif lazyFields and self.__fieldId in lazyFields and dataType in self.LAZY_DTYPES:
+          offset = self.__readPos
+          self.skipValue(dataType)
+          value = LazyValue(self, offset, self.__readPos - offset, dataType, fieldType)
+        else:
+          if projection is not None:
+            self.__projection = projection.fields[fieldName]
+            value = self.__readValue(fieldType, dataType)
+            self.__projection = projection
+          else:
+            value = self.__readValue(fieldType, dataType)
+          if value is None and not field.getOptions().isNullable():
+            self.fatal(self.__lastReadPos, "Null value not allowed for field '{0}'", field.getName())
+          elif not fieldType.isAssignable(value):
+            self.typeError(self.__lastReadPos, type(value),
+                "value of field '{0}:{1}'".format(
+                    self.__instance.descriptor().getName(), field.getName()), fieldType)
+        setattr(self.__instance, slotName, value)
+        self.__instance._setPresent(fieldName)
     if self.__instance is None:
       self.__instance = expectedType.new()
       if shared:
-        index = self.addShared(self.__instance)
+        index = self.__addSharedInstance(start)
         if self.__debug:
           self.__debugf('+shared: {0}', index)
     return self.__instance
 
-  def __readFieldHeader(self):
+  def __setFormat(self, flags):
+    '''Apply the format flags from the file header of an object.'''
+    if flags & ~(FormatFlags.FRAMED | FormatFlags.STRINGS | FormatFlags.CONTINUED):
+      self.fatal(self.__lastReadPos, 'Unsupported format flags: 0x{0:x}', flags)
+    self.__framed = bool(flags & FormatFlags.FRAMED)
+    if flags & FormatFlags.CONTINUED:
+      if self.__previousTables is None:
+        self.fatal(self.__lastReadPos,
+            'Object continues the tables of a previous object, which was not decoded')
+      shared, self.__strings, self.__sharedAt, self.__deferredShared, self.__stringAt = \
+          self.__previousTables
+      self.restoreShared(shared)
+    if not flags & FormatFlags.STRINGS:
+      self.__strings = None
+    elif self.__strings is None:
+      self.__strings = []
+      if self.__lazy:
+        self.__stringAt = {}
+
+  def loadValue(self, value):
+    '''Decode a field value that was deferred by lazy decoding. Called by
+       LazyValue.load().'''
+    result = self.__loadAt(value.offset, value.dataType, value.fieldType)
+    if not value.fieldType.isAssignable(result):
+      self.typeError(value.offset, type(result), 'deferred value', value.fieldType)
+    return result
+
+  def __loadAt(self, pos, dataType, expectedType):
+    '''Decode a value of type 'dataType' at buffer position 'pos', preserving the
+       state of any decoding in progress.'''
+    saved = (self.__readPos, self.__lastReadPos, self.__atEof, self.__instance,
+        self.__descriptor, self.__fieldId, self.__subtypeId, self.__projection, self.__states)
+    self.__readPos = self.__lastReadPos = pos
+    self.__atEof = False
+    self.__instance = None
+    self.__descriptor = types.unmodified(expectedType)
+    self.__projection = None
+    self.__states = []
+    try:
+      return self.__readValue(expectedType, dataType)
+    finally:
+      (self.__readPos, self.__lastReadPos, self.__atEof, self.__instance,
+          self.__descriptor, self.__fieldId, self.__subtypeId, self.__projection,
+          self.__states) = saved
+
+  def __getFieldsReader(self, struct):
+    '''Return the generated _readFieldsBinary() method for the fields of 'struct', if
+       there is one and the input is a buffer.'''
+    if self.__buffer is None or self.__debug or self.__projection is not None:
+      return None
+    return struct.getPlan(BinaryDecoder.findFieldsReader, BinaryDecoder.findFieldsReader)
+
+  def __readFieldsFast(self, fieldsReader):
+    try:
+      self.__readPos, self.__fieldId = fieldsReader(
+          self.__instance, self.__buffer, self.__readPos, self, self.__fieldId)
+    except (IndexError, struct.error):
+      self.fatal(self.__lastReadPos,
+          'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
     self.__lastReadPos = self.__readPos
-    data = self.__stream.read(1)
-    if len(data) == 0:
-      self.__atEof = True
+
+  def __readBooleanField(self, fieldType, dataType):
+    if dataType == DataType.ONE:
+      return True
+    elif dataType == DataType.ZERO:
+      return False
+    return self.__readValue(fieldType, dataType)
+
+  def __readIntegerField(self, fieldType, dataType):
+    if dataType == DataType.VARINT:
+      return self.zigZagDecode(self.__readVarInt())
+    elif dataType == DataType.ZERO:
+      return 0
+    elif dataType == DataType.ONE:
+      return 1
+    return self.__readValue(fieldType, dataType)
+
+  def __readFloatField(self, fieldType, dataType):
+    if dataType == DataType.FLOAT:
+      return self.__readFormat(DataFormat.FLOAT)
+    elif dataType == DataType.DOUBLE:
+      return self.__readFormat(DataFormat.DOUBLE)
+    return self.__readValue(fieldType, dataType)
+
+  def __readStringField(self, fieldType, dataType):
+    if dataType == DataType.BYTES:
+      return self.__readBytes(self.__readVarInt()).decode()
+    return self.__readValue(fieldType, dataType)
+
+  def __readBytesField(self, fieldType, dataType):
+    if dataType == DataType.BYTES:
+      return self.__readBytesValue(self.__readVarInt())
+    return self.__readValue(fieldType, dataType)
+
+  # Readers specialized for the expected type of a field. Each reader either returns a
+  # value of the expected type or reports an error, so the result needs no further
+  # checking. Other types are read by __readValue().
+  FIELD_READERS = {
+    types.TypeKind.BOOL: __readBooleanField,
+    types.TypeKind.INTEGER: __readIntegerField,
+    types.TypeKind.ENUM: __readIntegerField,
+    types.TypeKind.FLOAT: __readFloatField,
+    types.TypeKind.DOUBLE: __readFloatField,
+    types.TypeKind.STRING: __readStringField,
+    types.TypeKind.BYTES: __readBytesField,
+  }
+
+  # Readers for list elements. Booleans are excluded since they are encoded differently
+  # inside of containers (see __readElement).
+  ELEMENT_READERS = dict(FIELD_READERS)
+  del ELEMENT_READERS[types.TypeKind.BOOL]
+
+  @staticmethod
+  def buildPlan(struct):
+    '''Build the decoding plan for a struct descriptor: a table, indexed by field id,
+       of (field, slot name, field name, field type, reader) tuples. Plans are cached
+       on the descriptor so that they are shared by all decoder instances.'''
+    plan = {}
+    for field in struct.getFields():
+      fieldType = field.getType()
+      plan[field.getId()] = (
+          field,
+          '_' + field.getName(),
+          field.getName(),
+          fieldType,
+          BinaryDecoder.FIELD_READERS.get(fieldType.typeId()))
+    return plan
+
+  # Kinds of fields that can be deferred by lazy decoding, and the encodings of the
+  # values that are deferred. Shared struct references are always resolved.
+  LAZY_KINDS = (
+    types.TypeKind.LIST,
+    types.TypeKind.SET,
+    types.TypeKind.MAP,
+    types.TypeKind.STRUCT,
+  )
+  LAZY_DTYPES = frozenset([
+    DataType.LIST,
+    DataType.PLIST,
+    DataType.MAP,
+    DataType.STRUCT,
+    DataType.SSTRUCT,
+  ])
+
+  @staticmethod
+  def findLazyFields(struct):
+    '''Return the ids of the fields of 'struct' that can be deferred by lazy decoding.
+       This requires a class generated with the 'lazyFields' option, whose getters
+       load deferred values.'''
+    cls = struct.getClass()
+    if cls is None or '_loadLazyFields' not in cls.__dict__:
+      return frozenset()
+    return frozenset(field.getId() for field in struct.getFields()
+        if types.unmodified(field.getType()).typeId() in BinaryDecoder.LAZY_KINDS)
+
+  @staticmethod
+  def findFieldsReader(struct):
+    '''Return the _readFieldsBinary() method generated for the class of 'struct', or
+       None. Inherited methods are ignored, since they only know the fields of the
+       base class.'''
+    cls = struct.getClass()
+    if cls is None:
       return None
-    self.__readPos += 1
-    assert len(data) == 1
-    byte = data[0]
+    return cls.__dict__.get('_readFieldsBinary')
+
+  # Helpers for generated _readFieldsBinary() methods. Each one reads a value from
+  # 'buf' at 'pos', and returns the value and the position following it.
+
+  FIXED_FORMATS = {
+    DataType.FIXED16: DataFormat.FIXED16,
+    DataType.FIXED32: DataFormat.FIXED32,
+    DataType.FIXED64: DataFormat.FIXED64,
+    DataType.FLOAT: DataFormat.FLOAT,
+    DataType.DOUBLE: DataFormat.DOUBLE,
+  }
+
+  @staticmethod
+  def readVarIntAt(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+      b = buf[pos]
+      pos += 1
+      result |= (b & 0x7f) << shift
+      if b < 0x80:
+        return result, pos
+      shift += 7
+
+  @staticmethod
+  def readFormatAt(buf, pos, dataType):
+    fmt = BinaryDecoder.FIXED_FORMATS[dataType]
+    value, = fmt.unpack_from(buf, pos)
+    return value, pos + fmt.size
+
+  def readBytesAt(self, buf, pos):
+    length, pos = BinaryDecoder.readVarIntAt(buf, pos)
+    end = pos + length
+    if end > len(buf):
+      raise IndexError('bytes value extends past the end of the buffer')
+    if self.__bytesView is not None:
+      return self.__bytesView[pos:end], end
+    return bytes(buf[pos:end]), end
+
+  @staticmethod
+  def readStringAt(buf, pos):
+    length, pos = BinaryDecoder.readVarIntAt(buf, pos)
+    end = pos + length
+    if end > len(buf):
+      raise IndexError('string value extends past the end of the buffer')
+    return str(buf[pos:end], 'utf-8'), end
+
+  def __readFieldHeader(self):
+    self.__lastReadPos = self.__readPos
+    if self.__buffer is not None:
+      if self.__readPos >= self.__bufferEnd:
+        self.__atEof = True
+        return None
+      byte = self.__buffer[self.__readPos]
+      self.__readPos += 1
+    else:
+      data = self.__stream.read(1)
+      if len(data) == 0:
+        self.__atEof = True
+        return None
+      self.__readPos += 1
+      assert len(data) == 1
+      byte = data[0]
     delta = byte >> 4
     dataType = byte & 0x0f
 #     if dataType > DataType.MAXVAL:
@@ -643,6 +2277,8 @@ class BinaryDecoder(coda.io.AbstractDecoder):
         if odelta > 0 and odelta < 15:
           self.fatal(self.__lastReadPos, 'Invalid field ID encoding: {0} -> {1}', oid, self.__fieldId)
       self.__subtypeId = 0
+      if dataType >= DataType.STRUCT and self.__framed:
+        self.__readFrameHeader()
 #       if self.__debug:
 #         self.__debugf('-- field header: dataType:{0}, fieldId:{1}',
 #             DTYPE_NAMES[dataType], self.__fieldId)
@@ -652,6 +2288,25 @@ class BinaryDecoder(coda.io.AbstractDecoder):
     return dataType
 
   def __readVarInt(self):
+    buf = self.__buffer
+    if buf is not None:
+      pos = self.__readPos
+      end = self.__bufferEnd
+      result = 0
+      shift = 0
+      while True:
+        if pos >= end:
+          self.fatal(self.__lastReadPos,
+              'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if b < 0x80:
+          break
+        shift += 7
+      self.__readPos = pos
+      return result
+
     result = 0
     shift = 0
     while True:
@@ -670,7 +2325,26 @@ class BinaryDecoder(coda.io.AbstractDecoder):
 #       self.__debugf('-- varint: {0}', result)
     return result
 
+  def __readBytesValue(self, length):
+    '''Read the value of a bytes field or element, which is a view if 'bytesViews' is
+       in effect.'''
+    if self.__bytesView is None:
+      return self.__readBytes(length)
+    start = self.__readPos
+    if start + length > self.__bufferEnd:
+      self.fatal(self.__lastReadPos,
+          'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+    self.__readPos = start + length
+    return self.__bytesView[start:start + length]
+
   def __readBytes(self, length):
+    if self.__buffer is not None:
+      start = self.__readPos
+      if start + length > self.__bufferEnd:
+        self.fatal(self.__lastReadPos,
+            'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+      self.__readPos = start + length
+      return bytes(self.__buffer[start:start + length])
     data = self.__stream.read(length)
     if len(data) < length:
       self.fatal(self.__lastReadPos,
@@ -678,7 +2352,47 @@ class BinaryDecoder(coda.io.AbstractDecoder):
     self.__readPos += length
     return data
 
+  def __skipBytes(self, length):
+    if self.__buffer is not None:
+      if self.__readPos + length > self.__bufferEnd:
+        self.fatal(self.__lastReadPos,
+            'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+      self.__readPos += length
+    else:
+      self.__readBytes(length)
+
+  def __readFormat(self, fmt):
+    '''Read a single fixed-width value described by the struct.Struct 'fmt'.'''
+    if self.__buffer is not None:
+      start = self.__readPos
+      if start + fmt.size > self.__bufferEnd:
+        self.fatal(self.__lastReadPos,
+            'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+      self.__readPos = start + fmt.size
+      value, = fmt.unpack_from(self.__buffer, start)
+      return value
+    value, = fmt.unpack(self.__readBytes(fmt.size))
+    return value
+
+  def __readPacked(self, fmt, size):
+    '''Read a block of 'size' bytes and unpack it according to the struct format 'fmt'.'''
+    if self.__buffer is not None:
+      start = self.__readPos
+      if start + size > self.__bufferEnd:
+        self.fatal(self.__lastReadPos,
+            'Unexpected end of file while reading struct: {0}', self.__descriptor.getName())
+      self.__readPos = start + size
+      return struct.unpack_from(fmt, self.__buffer, start)
+    return struct.unpack(fmt, self.__readBytes(size))
+
   def __readUByte(self):
+    if self.__buffer is not None:
+      if self.__readPos >= self.__bufferEnd:
+        self.__atEof = True
+        return None
+      byte = self.__buffer[self.__readPos]
+      self.__readPos += 1
+      return byte
     data = self.__stream.read(1)
     if len(data) == 0:
       self.__atEof = True
@@ -687,9 +2401,14 @@ class BinaryDecoder(coda.io.AbstractDecoder):
     return data[0]
 
   def __pos(self):
+    if self.__buffer is not None:
+      return self.__readPos
     return self.__stream.tell()
 
-  def __getShared(self, index):
+  def __getShared(self, index, expectedType):
+    if index in self.__deferredShared:
+      # Defined in a region that was skipped by lazy decoding
+      return self.__loadAt(self.__deferredShared[index], DataType.SSTRUCT, expectedType)
     try:
       return self.getShared(index)
     except KeyError:
@@ -718,9 +2437,12 @@ class BinaryDecoder(coda.io.AbstractDecoder):
   def __debugf(self, msg, *args, **kwargs):
     data = b''
     if self.__debugPos < self.__readPos:
-      self.__stream.seek(self.__debugPos)
-      data = self.__stream.read(self.__readPos - self.__debugPos)
-      assert self.__stream.tell() == self.__readPos
+      if self.__buffer is not None:
+        data = bytes(self.__buffer[self.__debugPos:self.__readPos])
+      else:
+        self.__stream.seek(self.__debugPos)
+        data = self.__stream.read(self.__readPos - self.__debugPos)
+        assert self.__stream.tell() == self.__readPos
 
     dumpdata = []
     for i in range(0, len(data), 6):
@@ -757,15 +2479,91 @@ class BinaryDecoder(coda.io.AbstractDecoder):
     else:
       return value >> 1
 
+# =============================================================================
+# Field projections
+# =============================================================================
+
+class Projection:
+  '''A subset of the fields of a struct to decode, see BinaryDecoder.decode().'''
+  def __init__(self, fields):
+    # Map of field name to the projection for structs within that field
+    self.fields = fields
+    self.__plans = {}
+
+  def getPlan(self, struct, plan, typeRegistry):
+    '''Return the decoding plan for 'struct', restricted to the projected fields.'''
+    try:
+      return self.__plans[struct]
+    except KeyError:
+      self.checkFields(struct, typeRegistry)
+      result = self.__plans[struct] = {
+          fid: entry for fid, entry in plan.items() if entry[2] in self.fields}
+      return result
+
+  def checkFields(self, struct, typeRegistry):
+    '''Raise an AssertionError if a projected field is not declared by 'struct', one
+       of its base types, or one of their subtypes in 'typeRegistry'. The whole type
+       hierarchy is checked since the projection applies to every subtype that is
+       decoded in place of 'struct'.'''
+    while struct.getBaseType():
+      struct = struct.getBaseType()
+    names = set(field.getName() for field in struct.getFields())
+    for subtype in typeRegistry.getSubtypes(struct).values():
+      names.update(field.getName() for field in subtype.getFields())
+    for name in self.fields:
+      if name not in names:
+        raise AssertionError('Class {0} has no field {1}'.format(struct.getName(), name))
+
+  @staticmethod
+  def create(spec):
+    '''Convert a list or dict of field names into a Projection, or None if all fields
+       are to be decoded.'''
+    if spec is None:
+      return None
+    elif isinstance(spec, str):
+      return Projection({spec: None})
+    elif isinstance(spec, dict):
+      return Projection({name: Projection.create(sub) for name, sub in spec.items()})
+    else:
+      return Projection({name: None for name in spec})
+
 # =============================================================================
 # Factory for binary codecs
 # =============================================================================
 
 class BinaryCodec:
   @staticmethod
-  def createEncoder(outputStream):
-    return BinaryEncoder(outputStream)
+  def createEncoder(outputStream, flushThreshold=BinaryEncoder.DEFAULT_FLUSH_THRESHOLD,
+      framed=False, stringTable=False):
+    '''Create an encoder that writes to 'outputStream'. If 'framed' is true, the output
+       uses the framed format, where struct fields and containers of structs are
+       prefixed with their length so that decoders can skip them quickly. If
+       'stringTable' is true, repeated strings are written as string table references.'''
+    return BinaryEncoder(outputStream, flushThreshold, framed, stringTable)
+
+  @staticmethod
+  def encodeToBytes(obj, framed=False, stringTable=False):
+    '''Encode a single object and return the encoded data as bytes.'''
+    encoder = BinaryEncoder(None, framed=framed, stringTable=stringTable)
+    obj.encode(encoder)
+    return encoder.getBytes()
 
   @staticmethod
   def createDecoder(inputStream, sourcePath=None, typeRegistry=None):
     return BinaryDecoder(inputStream, sourcePath, typeRegistry)
+
+  @staticmethod
+  def createBufferDecoder(buffer, sourcePath=None, typeRegistry=None, lazy=False,
+      bytesViews=False):
+    '''Create a decoder that reads directly from an in-memory buffer. The buffer
+       can be a bytes, bytearray, memoryview or mmap object. If 'lazy' is true, nested
+       structs and containers are decoded on first access, and if 'bytesViews' is true,
+       bytes values are views of the buffer rather than copies; see BinaryDecoder.'''
+    return BinaryDecoder(None, sourcePath, typeRegistry, buffer=buffer, lazy=lazy,
+        bytesViews=bytesViews)
+
+  @staticmethod
+  def createPushDecoder(cls, sourcePath=None, typeRegistry=None, fields=None):
+    '''Create a push decoder for a record stream of instances of 'cls', whose data is
+       passed to feed() as it arrives; see BinaryDecoder.'''
+    return BinaryDecoder(None, sourcePath, typeRegistry, cls=cls, fields=fields)
@@ -0,0 +1,252 @@
+'''Block-compressed record files.
+
+A block file holds a sequence of records, in the same format as a record file (see
+coda.io.recordfile), which are grouped into blocks. Each block is compressed independently
+and has its own entry in the index, so reading a single record only requires one block to
+be decompressed:
+
+  BlockFile ::= Header Block* Index Trailer
+  Header ::= MAGIC byte                       (compression method)
+  Block ::= byte*                             (compressed records)
+  Index ::= (FIXED64 FIXED32 FIXED32)*        (block offset, compressed size, record count)
+  Trailer ::= FIXED64 FIXED64 FIXED64 MAGIC   (index position, block count, record count)
+
+The compression method is one of the keys of COMPRESSION, and applies to every block
+in the file.'''
+
+import bisect
+import io
+import lzma
+import mmap
+import struct
+import zlib
+from coda.io.binarycodec import BinaryCodec, BinaryDecoder
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordWriter
+
+MAGIC = b'CODABLK1'
+TRAILER = struct.Struct('!QQQ8s')
+BLOCK = struct.Struct('!QII')
+
+class Compression:
+  '''A compression method, identified in the file header by 'code'.'''
+  def __init__(self, name, code, compress, decompress):
+    self.name = name
+    self.code = code
+    self.compress = compress
+    self.decompress = decompress
+
+COMPRESSION = {
+  'none': Compression('none', 0, bytes, bytes),
+  'zlib': Compression('zlib', 1, zlib.compress, zlib.decompress),
+  'lzma': Compression('lzma', 2, lzma.compress, lzma.decompress),
+}
+
+COMPRESSION_BY_CODE = {method.code: method for method in COMPRESSION.values()}
+
+class BlockWriter:
+  '''Writes objects to a block file. Records are accumulated until they hold at least
+     'blockSize' bytes of encoded data, and are then compressed as a single block using
+     the method named by 'compression'. The index is written when the writer is closed.'''
+  def __init__(self, stream, compression='zlib', blockSize=65536, framed=False):
+    if compression not in COMPRESSION:
+      raise ValueError('Unknown compression method: {0!r}'.format(compression))
+    self.__stream = stream
+    self.__compression = COMPRESSION[compression]
+    self.__blockSize = blockSize
+    self.__framed = framed
+    self.__block = io.BytesIO()
+    self.__records = RecordWriter(self.__block, framed)
+    self.__blockRecords = 0
+    self.__recordCount = 0
+    self.__blocks = []
+    self.__offset = len(MAGIC) + 1
+    self.__ownsStream = False
+    self.__closed = False
+    stream.write(MAGIC + bytes([self.__compression.code]))
+
+  @staticmethod
+  def open(path, compression='zlib', blockSize=65536, framed=False):
+    '''Create the block file at 'path'. The file is closed when the writer is closed.'''
+    writer = BlockWriter(open(path, 'wb'), compression, blockSize, framed)
+    writer.__ownsStream = True
+    return writer
+
+  def write(self, obj):
+    '''Append 'obj' to the file, and return its record number.'''
+    self.__records.write(obj)
+    self.__blockRecords += 1
+    self.__recordCount += 1
+    if self.__records.getOffset() >= self.__blockSize:
+      self.flushBlock()
+    return self.__recordCount - 1
+
+  def writeAll(self, objects):
+    for obj in objects:
+      self.write(obj)
+    return self
+
+  def flushBlock(self):
+    '''Compress and write the records accumulated so far as a block, even if they are
+       smaller than the block size.'''
+    if self.__blockRecords == 0:
+      return self
+    data = self.__compression.compress(self.__block.getvalue())
+    self.__stream.write(data)
+    self.__blocks.append((self.__offset, len(data), self.__blockRecords))
+    self.__offset += len(data)
+    self.__block = io.BytesIO()
+    self.__records = RecordWriter(self.__block, self.__framed)
+    self.__blockRecords = 0
+    return self
+
+  def close(self):
+    '''Write the last block and the index, and close the stream if it was opened by
+       this writer.'''
+    if self.__closed:
+      return
+    self.__closed = True
+    self.flushBlock()
+    stream = self.__stream
+    stream.write(b''.join(BLOCK.pack(*block) for block in self.__blocks))
+    stream.write(TRAILER.pack(self.__offset, len(self.__blocks), self.__recordCount, MAGIC))
+    stream.flush()
+    if self.__ownsStream:
+      stream.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+class BlockFile:
+  '''Access to the records of a block file held in 'buffer', which can be a bytes,
+     bytearray, memoryview or mmap object. Records are decoded as instances of 'cls'.
+     The most recently decompressed block is cached, so that reading records which are
+     close together only decompresses each block once.'''
+  def __init__(self, buffer, cls, typeRegistry=None):
+    self.__view = memoryview(buffer).cast('B')
+    self.__cls = cls
+    self.__typeRegistry = typeRegistry
+    self.__mmap = None
+    self.__cachedIndex = None
+    self.__cachedBlock = None
+    view = self.__view
+    if len(view) < len(MAGIC) + 1 + TRAILER.size:
+      raise EncodingError('Not a block file: too short')
+    indexPos, blockCount, self.__count, magic = TRAILER.unpack_from(
+        view, len(view) - TRAILER.size)
+    if magic != MAGIC or view[:len(MAGIC)] != MAGIC:
+      raise EncodingError('Not a block file: bad magic number')
+    code = view[len(MAGIC)]
+    if code not in COMPRESSION_BY_CODE:
+      raise EncodingError('Unknown block compression method: {0}'.format(code))
+    self.__compression = COMPRESSION_BY_CODE[code]
+    if indexPos + blockCount * BLOCK.size > len(view) - TRAILER.size:
+      raise EncodingError('Error:{0:x}: Truncated block index'.format(indexPos))
+    self.__blocks = [BLOCK.unpack_from(view, indexPos + i * BLOCK.size)
+                     for i in range(blockCount)]
+    # The record number of the first record in each block
+    self.__firstRecords = []
+    first = 0
+    for offset, size, count in self.__blocks:
+      self.__firstRecords.append(first)
+      first += count
+    if first != self.__count:
+      raise EncodingError('Block index record counts do not match the record count')
+
+  @staticmethod
+  def open(path, cls, typeRegistry=None):
+    '''Open the block file at 'path', which is memory-mapped rather than read.'''
+    with open(path, 'rb') as fh:
+      mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    blockFile = BlockFile(mm, cls, typeRegistry)
+    blockFile.__mmap = mm
+    return blockFile
+
+  def getCompression(self):
+    '''Return the name of the compression method used by this file.'''
+    return self.__compression.name
+
+  def getBlockCount(self):
+    return len(self.__blocks)
+
+  def __len__(self):
+    return self.__count
+
+  def __getitem__(self, index):
+    '''Decode and return record number 'index'.'''
+    return self.__decode(self.getRecord(index))
+
+  def __iter__(self):
+    for blockIndex in range(len(self.__blocks)):
+      data, offsets = self.__readBlock(blockIndex)
+      for start, end in offsets:
+        yield self.__decode(data[start:end])
+
+  def getRecord(self, index):
+    '''Return the encoded data of record number 'index'.'''
+    if index < 0:
+      index += self.__count
+    if index < 0 or index >= self.__count:
+      raise IndexError('Block file record index out of range: {0}'.format(index))
+    blockIndex = bisect.bisect_right(self.__firstRecords, index) - 1
+    data, offsets = self.__readBlock(blockIndex)
+    start, end = offsets[index - self.__firstRecords[blockIndex]]
+    return data[start:end]
+
+  def close(self):
+    '''Release the buffer, and unmap the file if it was opened with open(). Records are
+       decompressed into new buffers, so they remain valid after this. If other views of
+       the buffer still exist, the file is unmapped when they are garbage collected
+       instead.'''
+    self.__cachedBlock = None
+    try:
+      self.__view.release()
+      if self.__mmap is not None:
+        self.__mmap.close()
+    except BufferError:
+      # Other views of the buffer exist.
+      pass
+    self.__mmap = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def __readBlock(self, blockIndex):
+    '''Decompress block number 'blockIndex', returning its data and the start and end
+       of each record in it.'''
+    if self.__cachedIndex == blockIndex:
+      return self.__cachedBlock
+    offset, size, count = self.__blocks[blockIndex]
+    try:
+      data = memoryview(self.__compression.decompress(self.__view[offset:offset + size]))
+    except (zlib.error, lzma.LZMAError) as e:
+      raise EncodingError('Error:{0:x}: Corrupt block: {1}'.format(offset, e))
+    offsets = []
+    pos = 0
+    readVarIntAt = BinaryDecoder.readVarIntAt
+    try:
+      for i in range(count):
+        length, pos = readVarIntAt(data, pos)
+        offsets.append((pos, pos + length))
+        pos += length
+    except IndexError:
+      pos = len(data) + 1
+    if pos > len(data):
+      raise EncodingError('Error:{0:x}: Block has fewer records than its index entry'.format(
+          offset))
+    self.__cachedIndex = blockIndex
+    self.__cachedBlock = data, offsets
+    return self.__cachedBlock
+
+  def __decode(self, data):
+    if not data:
+      # An object with no fields set
+      return self.__cls()
+    return BinaryCodec.createBufferDecoder(
+        data, typeRegistry=self.__typeRegistry).decode(self.__cls)
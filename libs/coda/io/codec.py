@@ -1,6 +1,7 @@
 '''Base classes for CODA codecs.'''
 
 from abc import ABCMeta, abstractmethod
+from coda.types import TypeKind
 
 class EncodingError(Exception):
   '''Base class for exceptions encountered during encoding or decoding.'''
@@ -93,6 +94,11 @@ class Encoder(metaclass=ABCMeta):
     raise NotImplementedError()
     return self
 
+  @abstractmethod
+  def writePackedList(self, elementKind, bits, values):
+    raise NotImplementedError()
+    return self
+
   @abstractmethod
   def writeBeginSet(self, elementKind, length, fixed=False):
     raise NotImplementedError()
@@ -118,6 +124,12 @@ class Encoder(metaclass=ABCMeta):
     raise NotImplementedError()
     return self
 
+  def writeFields(self, value):
+    '''Write the fields of the struct 'value'. Encoders may override this to use a
+       faster, format-specific method where the object provides one.'''
+    value.writeFields(self)
+    return self
+
 class Decoder(metaclass=ABCMeta):
   @abstractmethod
   def decode(self, cls):
@@ -131,6 +143,10 @@ class AbstractEncoder(Encoder):
     self.__nextExternId = -1
     self.__objectRefs = {}
     self.__idsInUse = set()
+    self.__externs = {}
+    # The shared objects themselves, which keep their ids valid for as long as the
+    # table is in use.
+    self.__sharedObjects = []
 
   def getNextSharedId(self):
     '''Return the next unused shared object identifier.'''
@@ -155,6 +171,7 @@ class AbstractEncoder(Encoder):
       raise EncodingError('Extern index {0} is already in use', index)
     self.__idsInUse.add(index)
     self.__objectRefs[id(obj)] = index
+    self.__externs[id(obj)] = index
 
   def addShared(self, obj):
     '''Add an object to the shared object table. If the object has already
@@ -167,14 +184,51 @@ class AbstractEncoder(Encoder):
       index = self.getNextSharedId()
       self.__idsInUse.add(index)
       self.__objectRefs[sid] = index
+      self.__sharedObjects.append(obj)
       #print("Object {0}: {1}".format(index, obj.descriptor().getFullName()))
       return None
 
+  def resetShared(self):
+    '''Remove all of the shared objects from the shared object table, keeping the
+       externs.'''
+    self.__objectRefs = dict(self.__externs)
+    self.__idsInUse = set(self.__externs.values())
+    self.__nextSharedId = 1
+    self.__sharedObjects = []
+
   def getShared(self, obj):
     '''Return the index of an object in the shared object table, or None if
        the object is not in the table.'''
     return self.__objectRefs.get(id(obj))
 
+  def writePackedList(self, elementKind, bits, values):
+    '''Write a list or set of fixed-width numbers. This implementation writes each
+       element individually, as a set if 'values' is a set and as a list otherwise;
+       encoders that have a packed representation can override it to write all of the
+       values as a single block.'''
+    isSet = isinstance(values, (set, frozenset))
+    if isSet:
+      self.writeBeginSet(elementKind, len(values), True)
+    else:
+      self.writeBeginList(elementKind, len(values), True)
+    if elementKind == TypeKind.FLOAT:
+      writeElement = self.writeFloat
+    elif elementKind == TypeKind.DOUBLE:
+      writeElement = self.writeDouble
+    elif bits == 16:
+      writeElement = self.writeFixed16
+    elif bits == 32:
+      writeElement = self.writeFixed32
+    else:
+      writeElement = self.writeFixed64
+    for value in values:
+      writeElement(value)
+    if isSet:
+      self.writeEndSet()
+    else:
+      self.writeEndList()
+    return self
+
 class AbstractDecoder(Decoder):
   '''Abstract base class for decoders.'''
   def __init__(self, typeRegistry=None):
@@ -220,6 +274,23 @@ class AbstractDecoder(Decoder):
     '''Return the shared object with the given id.'''
     return self.__objectRefs[index]
 
+  def setShared(self, index, obj):
+    '''Replace the object at 'index' in the shared object table.'''
+    assert index in self.__objectRefs
+    self.__objectRefs[index] = obj
+
+  def resetShared(self):
+    '''Clear the shared object table. Returns the previous contents of the table, which
+       can be reinstated with restoreShared().'''
+    saved = (self.__objectRefs, self.__nextSharedId)
+    self.__objectRefs = {}
+    self.__nextSharedId = 1
+    return saved
+
+  def restoreShared(self, saved):
+    '''Reinstate the shared object table returned by resetShared().'''
+    self.__objectRefs, self.__nextSharedId = saved
+
   @staticmethod
   def isSubtype(self, st, base):
     while st:
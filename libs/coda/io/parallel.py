@@ -0,0 +1,229 @@
+'''Parallel decoding and encoding of record files, using a pool of worker processes.
+
+When decoding, the parent process scans the record headers of the file to divide it into
+chunks of consecutive records. Each chunk is decoded by a worker, which maps the file
+itself, so only the chunk boundaries are sent to the workers. Decoded objects (or the
+result of a user-supplied callback) are pickled and sent back to the parent. When
+encoding, chunks of objects are pickled and sent to the workers, which return the
+encoded records; the parent writes the records to the file in the original order.
+
+Workers decode using TypeRegistry.INSTANCE, so the modules that define the decoded
+types, and any subtypes that can appear in the file, must be imported in each worker.
+The module that defines 'cls' is always imported; other modules can be named using the
+'modules' argument. Modules which cannot be imported by name, such as modules loaded
+from a file path, are loaded from the same file in the worker.'''
+
+import collections
+import concurrent.futures
+import importlib
+import importlib.util
+import io
+import itertools
+import mmap
+import os
+import pickle
+import sys
+from coda.io.binarycodec import BinaryCodec, BinaryDecoder
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordWriter
+
+# Starting a pool of workers takes tens of milliseconds, and more with the 'spawn' start
+# method, which is about the time needed to decode this much data in a single process.
+# Smaller files are decoded in the calling process.
+MIN_PARALLEL_BYTES = 1 << 20
+
+# Likewise, fewer objects than this are encoded in the calling process.
+MIN_PARALLEL_OBJECTS = 4096
+
+def decodeAll(path, cls, workers=None, callback=None, modules=None, chunkSize=None,
+              mpContext=None, minParallelBytes=MIN_PARALLEL_BYTES):
+  '''Decode the records in the record file at 'path' as instances of 'cls', using
+     'workers' processes (by default, one per CPU). This is a generator which yields
+     the decoded objects in file order.
+
+     If 'callback' is given, it is called in the worker with the list of objects in each
+     chunk, and the values it returns are yielded instead, in file order. This can be used
+     to aggregate the records without sending them back to the parent. 'callback' must be
+     picklable, for example a function defined at the top level of a module.
+
+     'chunkSize' is the number of records in each chunk; by default each worker
+     decodes about four chunks. 'mpContext' is an optional multiprocessing context.
+
+     If there is only one worker, or the file is smaller than 'minParallelBytes', the
+     chunks are decoded in the calling process instead, since starting the workers
+     would take longer than decoding the file.'''
+  if workers is None:
+    workers = os.cpu_count() or 1
+  chunks = splitRecords(path, workers * 4 if chunkSize is None else None, chunkSize)
+  if not chunks:
+    return
+  if workers <= 1 or chunks[-1][1] < minParallelBytes:
+    for start, end in chunks:
+      result = _decodeRange(path, start, end, cls, callback)
+      if callback is None:
+        yield from result
+      else:
+        yield result
+    return
+  moduleRefs = getModuleRefs([cls.__module__] + list(modules or ()))
+  clsRef = (cls.__module__, cls.__qualname__)
+  with concurrent.futures.ProcessPoolExecutor(
+      workers, mp_context=mpContext, initializer=_importModules, initargs=(moduleRefs,)) as pool:
+    # Limit the number of chunks in flight, so that results which have not been consumed
+    # yet do not accumulate in the parent.
+    pending = collections.deque()
+    chunks = collections.deque(chunks)
+    while chunks or pending:
+      while chunks and len(pending) < workers * 2:
+        start, end = chunks.popleft()
+        pending.append(pool.submit(_decodeChunk, path, start, end, clsRef, callback))
+      result = pending.popleft().result()
+      if callback is None:
+        yield from result
+      else:
+        yield result
+
+def encodeAll(objects, path, workers=None, chunkSize=256, framed=False, append=False,
+              modules=None, mpContext=None, minParallelObjects=MIN_PARALLEL_OBJECTS):
+  '''Encode each object in 'objects' as a record, and write the records to the record
+     file at 'path' in order, using 'workers' processes (by default, one per CPU). The
+     objects are sent to the workers in chunks of 'chunkSize' objects, so they must be
+     picklable. If 'append' is false, any existing contents of the file are discarded.
+     Returns the number of records written.
+
+     The output is the same as writing the objects with a RecordWriter.
+
+     If there is only one worker, or there are fewer than 'minParallelObjects' objects,
+     the objects are encoded in the calling process instead.'''
+  if workers is None:
+    workers = os.cpu_count() or 1
+  objects = iter(objects)
+  head = list(itertools.islice(objects, minParallelObjects)) if workers > 1 else []
+  if workers <= 1 or len(head) < minParallelObjects:
+    count = 0
+    with open(path, 'ab' if append else 'wb') as out:
+      writer = RecordWriter(out, framed)
+      for obj in itertools.chain(head, objects):
+        writer.write(obj)
+        count += 1
+    return count
+  moduleNames = list(modules or ())
+  objects = itertools.chain(head, objects)
+  count = 0
+  with open(path, 'ab' if append else 'wb') as out, \
+      concurrent.futures.ProcessPoolExecutor(workers, mp_context=mpContext) as pool:
+    pending = collections.deque()
+    while True:
+      while len(pending) < workers * 2:
+        chunk = list(itertools.islice(objects, chunkSize))
+        if not chunk:
+          break
+        count += len(chunk)
+        moduleRefs = getModuleRefs(moduleNames + [type(obj).__module__ for obj in chunk])
+        pending.append(pool.submit(_encodeChunk, moduleRefs,
+                                   pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL), framed))
+      if not pending:
+        break
+      out.write(pending.popleft().result())
+  return count
+
+def splitRecords(path, chunkCount=None, chunkSize=None):
+  '''Scan the record headers in the file at 'path', and return a list of (start, end)
+     byte ranges dividing the records into chunks. Either 'chunkCount', the approximate
+     number of chunks of equal size in bytes, or 'chunkSize', the number of records in
+     each chunk, must be given.'''
+  with open(path, 'rb') as fh:
+    if os.fstat(fh.fileno()).st_size == 0:
+      return []
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      size = len(mm)
+      chunks = []
+      if chunkSize is None:
+        chunkBytes = max(1, size // max(1, chunkCount))
+      readVarIntAt = BinaryDecoder.readVarIntAt
+      start = pos = 0
+      records = 0
+      while pos < size:
+        try:
+          length, dataPos = readVarIntAt(mm, pos)
+        except IndexError:
+          raise EncodingError('Error:{0:x}: Truncated record length'.format(pos))
+        pos = dataPos + length
+        if pos > size:
+          raise EncodingError('Error:{0:x}: Truncated record, expected {1} bytes, got {2}'.format(
+              dataPos, length, size - dataPos))
+        records += 1
+        if (records >= chunkSize) if chunkSize is not None else (pos - start >= chunkBytes):
+          chunks.append((start, pos))
+          start = pos
+          records = 0
+      if start < size:
+        chunks.append((start, size))
+      return chunks
+
+def getModuleRefs(names):
+  '''Return the name and source file of each of the named modules, so that the modules
+     can be loaded in a worker process.'''
+  refs = []
+  for name in names:
+    if not isinstance(name, str):
+      name = name.__name__
+    if any(ref[0] == name for ref in refs):
+      continue
+    module = sys.modules.get(name)
+    refs.append((name, getattr(module, '__file__', None)))
+  return refs
+
+def _importModules(moduleRefs):
+  for name, path in moduleRefs:
+    if name in sys.modules:
+      continue
+    try:
+      importlib.import_module(name)
+    except ImportError:
+      if path is None:
+        raise
+      spec = importlib.util.spec_from_file_location(name, path)
+      module = importlib.util.module_from_spec(spec)
+      sys.modules[name] = module
+      spec.loader.exec_module(module)
+
+def _encodeChunk(moduleRefs, data, framed):
+  # The chunk is pickled separately from the task, so that the modules defining the
+  # objects can be imported before the objects are unpickled.
+  _importModules(moduleRefs)
+  out = io.BytesIO()
+  RecordWriter(out, framed).writeAll(pickle.loads(data))
+  return out.getvalue()
+
+def _resolveClass(clsRef):
+  moduleName, qualname = clsRef
+  cls = sys.modules[moduleName]
+  for name in qualname.split('.'):
+    cls = getattr(cls, name)
+  return cls
+
+def _decodeChunk(path, start, end, clsRef, callback):
+  return _decodeRange(path, start, end, _resolveClass(clsRef), callback)
+
+def _decodeRange(path, start, end, cls, callback):
+  results = []
+  readVarIntAt = BinaryDecoder.readVarIntAt
+  with open(path, 'rb') as fh:
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      view = memoryview(mm)
+      try:
+        pos = start
+        while pos < end:
+          length, pos = readVarIntAt(view, pos)
+          if length == 0:
+            # An object with no fields set
+            results.append(cls())
+          else:
+            results.append(BinaryCodec.createBufferDecoder(view[pos:pos + length]).decode(cls))
+          pos += length
+      finally:
+        view.release()
+  if callback is not None:
+    return callback(results)
+  return results
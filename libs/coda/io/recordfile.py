@@ -0,0 +1,203 @@
+'''Record files: streams of independently encoded objects.
+
+A record file is a sequence of records, each of which is a VarInt containing the length of
+the record, followed by a single object in the binary encoding. Records are independent
+of each other, so a record file can be appended to, and files can be concatenated.
+
+Optionally, the shared object and string tables can be kept from one record to the next,
+so that shared objects and strings are only written once for a run of records (see
+BinaryEncoder). Such records depend on the records before them, back to the last reset
+point: a record that starts with empty tables. A reader can start at any reset point.
+
+RecordReader reads records from a blocking stream. For a stream that arrives in pieces,
+use a push decoder (BinaryCodec.createPushDecoder()), which decodes the records as the
+data is fed to it.'''
+
+from coda.io.binarycodec import BinaryCodec, BinaryEncoder
+from coda.io.codec import EncodingError
+
+class RecordWriter:
+  '''Writes objects to a stream as a sequence of length-delimited records. If
+     'stringTable' is true, repeated strings within a record are written as string
+     table references. If 'keepTables' is true, the shared object and string tables are
+     kept from one record to the next, and are reset every 'resetInterval' records if
+     that is given, or when reset() is called.'''
+  def __init__(self, stream, framed=False, stringTable=False, keepTables=False,
+      resetInterval=None):
+    self.__stream = stream
+    self.__framed = framed
+    self.__stringTable = stringTable
+    self.__encoder = None
+    if keepTables:
+      self.__encoder = BinaryEncoder(None, framed=framed, stringTable=stringTable,
+          keepTables=True)
+    self.__resetInterval = resetInterval
+    self.__sinceReset = 0
+    self.__resetOffset = 0
+    self.__ownsStream = False
+    self.__offset = 0
+
+  @staticmethod
+  def open(path, append=True, framed=False, stringTable=False, keepTables=False,
+      resetInterval=None):
+    '''Open the record file at 'path' for writing. If 'append' is false, any existing
+       contents are discarded. The file is closed when the writer is closed.'''
+    writer = RecordWriter(open(path, 'ab' if append else 'wb'), framed, stringTable,
+        keepTables, resetInterval)
+    writer.__ownsStream = True
+    return writer
+
+  def write(self, obj):
+    '''Append 'obj' to the stream as a single record.'''
+    encoder = self.__encoder
+    if encoder is None:
+      encoder = BinaryEncoder(None, framed=self.__framed, stringTable=self.__stringTable)
+    elif self.__sinceReset == self.__resetInterval:
+      self.reset()
+    if self.__sinceReset == 0:
+      self.__resetOffset = self.__offset
+    self.__sinceReset += 1
+    obj.encode(encoder)
+    data = encoder.takeBytes()
+    header = encodeLength(len(data))
+    self.__stream.write(header)
+    self.__stream.write(data)
+    self.__offset += len(header) + len(data)
+    return self
+
+  def writeAll(self, objects):
+    '''Append each object in 'objects' as a record.'''
+    for obj in objects:
+      self.write(obj)
+    return self
+
+  def reset(self):
+    '''Make the next record a reset point, which does not depend on earlier records.'''
+    if self.__encoder is not None:
+      self.__encoder.resetTables()
+    self.__sinceReset = 0
+    return self
+
+  def getOffset(self):
+    '''Return the number of bytes written by this writer.'''
+    return self.__offset
+
+  def getResetOffset(self):
+    '''Return the offset of the last reset point written. Reading can start there.'''
+    return self.__resetOffset
+
+  def flush(self):
+    self.__stream.flush()
+    return self
+
+  def close(self):
+    '''Flush the stream, and close it if it was opened by this writer.'''
+    self.__stream.flush()
+    if self.__ownsStream:
+      self.__stream.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+class RecordReader:
+  '''Reads the records in a stream, decoding each one as an instance of 'cls'. Records
+     are read one at a time as the reader is iterated, so memory use does not depend
+     on the size of the stream.'''
+  def __init__(self, stream, cls, typeRegistry=None):
+    self.__stream = stream
+    self.__cls = cls
+    self.__typeRegistry = typeRegistry
+    self.__decoder = None
+    self.__ownsStream = False
+    self.__offset = 0
+
+  @staticmethod
+  def open(path, cls, typeRegistry=None):
+    '''Open the record file at 'path' for reading. The file is closed when the reader
+       is closed.'''
+    reader = RecordReader(open(path, 'rb'), cls, typeRegistry)
+    reader.__ownsStream = True
+    return reader
+
+  def __iter__(self):
+    while True:
+      data = self.readRecord()
+      if data is None:
+        return
+      yield self.decodeRecord(data)
+
+  def read(self):
+    '''Read and decode the next record. Returns None at the end of the stream.'''
+    data = self.readRecord()
+    if data is None:
+      return None
+    return self.decodeRecord(data)
+
+  def readRecord(self):
+    '''Return the encoded data of the next record, without decoding it, or None at the
+       end of the stream.'''
+    length = self.__readLength()
+    if length is None:
+      return None
+    data = self.__stream.read(length)
+    if len(data) < length:
+      raise EncodingError('Error:{0:x}: Truncated record, expected {1} bytes, got {2}'.format(
+          self.__offset, length, len(data)))
+    self.__offset += length
+    return data
+
+  def decodeRecord(self, data):
+    '''Decode the encoded data of a record. Records must be decoded in order, since a
+       record can depend on the shared object and string tables of the ones before.'''
+    if self.__decoder is None:
+      self.__decoder = BinaryCodec.createBufferDecoder(data, typeRegistry=self.__typeRegistry)
+    else:
+      self.__decoder.resetBuffer(data)
+    result = self.__decoder.decode(self.__cls)
+    if result is None:
+      # An object with no fields set
+      return self.__cls()
+    return result
+
+  def getOffset(self):
+    '''Return the number of bytes read by this reader.'''
+    return self.__offset
+
+  def close(self):
+    if self.__ownsStream:
+      self.__stream.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def __readLength(self):
+    result = 0
+    shift = 0
+    start = self.__offset
+    while True:
+      data = self.__stream.read(1)
+      if len(data) == 0:
+        if self.__offset == start:
+          return None
+        raise EncodingError('Error:{0:x}: Truncated record length'.format(start))
+      self.__offset += 1
+      b = data[0]
+      result |= (b & 0x7f) << shift
+      if b < 0x80:
+        return result
+      shift += 7
+
+def encodeLength(length):
+  '''Return the VarInt encoding of a record length.'''
+  result = bytearray()
+  while length > 0x7f:
+    result.append((length & 0x7f) | 0x80)
+    length >>= 7
+  result.append(length)
+  return bytes(result)
@@ -1,6 +1,7 @@
 from .object import Object, ExtensibleObject
 from .bootstrap import createFile, initModule
 from .frozendict import FrozenDict
+from .lazyvalue import LazyValue
 from . import typemixins
 
-__all__ = ['Object', 'ExtensibleObject', 'Codec', 'typemixins']
+__all__ = ['Object', 'ExtensibleObject', 'LazyValue', 'Codec', 'typemixins']
@@ -735,7 +735,7 @@ class FieldOptions(Options):
     if type(self._ignore) is not coda.runtime.FrozenDict:
       self._ignore = coda.runtime.FrozenDict(self._ignore)
     if deep and self._default and self._default.isMutable():
-      self._default.freeze(deep)
+      self._default._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('FieldOptions', 3)
@@ -1220,7 +1220,7 @@ class ListType(CollectionType, coda.runtime.typemixins.ListTypeMixin):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._elementType and self._elementType.isMutable():
-      self._elementType.freeze(deep)
+      self._elementType._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('ListType', 20)
@@ -1293,7 +1293,7 @@ class SetType(CollectionType, coda.runtime.typemixins.SetTypeMixin):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._elementType and self._elementType.isMutable():
-      self._elementType.freeze(deep)
+      self._elementType._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('SetType', 21)
@@ -1371,9 +1371,9 @@ class MapType(CollectionType, coda.runtime.typemixins.MapTypeMixin):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._keyType and self._keyType.isMutable():
-      self._keyType.freeze(deep)
+      self._keyType._freezeInto(deep)
     if deep and self._valueType and self._valueType.isMutable():
-      self._valueType.freeze(deep)
+      self._valueType._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('MapType', 22)
@@ -1486,7 +1486,7 @@ class ModifiedType(Type, coda.runtime.typemixins.ModifiedTypeMixin):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._elementType and self._elementType.isMutable():
-      self._elementType.freeze(deep)
+      self._elementType._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('ModifiedType', 23)
@@ -1620,9 +1620,9 @@ class DeclType(Type, coda.runtime.typemixins.DeclTypeMixin):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._file and self._file.isMutable():
-      self._file.freeze(deep)
+      self._file._freezeInto(deep)
     if deep and self._enclosingType and self._enclosingType.isMutable():
-      self._enclosingType.freeze(deep)
+      self._enclosingType._freezeInto(deep)
 
   def _writeFields(self, encoder):
     encoder.writeSubtypeHeader('DeclType', 41)
@@ -1798,9 +1798,9 @@ class StructType(DeclType):
     def _freezeImpl(self, deep=True):
       super()._freezeImpl(deep)
       if deep and self._type and self._type.isMutable():
-        self._type.freeze(deep)
+        self._type._freezeInto(deep)
       if deep and self._options and self._options.isMutable():
-        self._options.freeze(deep)
+        self._options._freezeInto(deep)
 
     def _writeFields(self, encoder):
       if self.hasName():
@@ -1946,7 +1946,7 @@ class StructType(DeclType):
     def _freezeImpl(self, deep=True):
       super()._freezeImpl(deep)
       if deep and self._type and self._type.isMutable():
-        self._type.freeze(deep)
+        self._type._freezeInto(deep)
 
     def _writeFields(self, encoder):
       if self.hasName():
@@ -2056,9 +2056,9 @@ class StructType(DeclType):
       if type(self._params) is not tuple:
         self._params = tuple(self._params)
       if deep and self._returnType and self._returnType.isMutable():
-        self._returnType.freeze(deep)
+        self._returnType._freezeInto(deep)
       if deep and self._options and self._options.isMutable():
-        self._options.freeze(deep)
+        self._options._freezeInto(deep)
 
     def _writeFields(self, encoder):
       if self.hasName():
@@ -2256,9 +2256,9 @@ class StructType(DeclType):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._options and self._options.isMutable():
-      self._options.freeze(deep)
+      self._options._freezeInto(deep)
     if deep and self._baseType and self._baseType.isMutable():
-      self._baseType.freeze(deep)
+      self._baseType._freezeInto(deep)
     if type(self._fields) is not tuple:
       self._fields = tuple(self._fields)
     if type(self._structs) is not tuple:
@@ -2629,7 +2629,7 @@ class EnumType(DeclType):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._options and self._options.isMutable():
-      self._options.freeze(deep)
+      self._options._freezeInto(deep)
     if type(self._values) is not tuple:
       self._values = tuple(self._values)
 
@@ -2759,13 +2759,13 @@ class ExtensionField(coda.runtime.Object):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._file and self._file.isMutable():
-      self._file.freeze(deep)
+      self._file._freezeInto(deep)
     if deep and self._enclosingType and self._enclosingType.isMutable():
-      self._enclosingType.freeze(deep)
+      self._enclosingType._freezeInto(deep)
     if deep and self._extends and self._extends.isMutable():
-      self._extends.freeze(deep)
+      self._extends._freezeInto(deep)
     if deep and self._type and self._type.isMutable():
-      self._type.freeze(deep)
+      self._type._freezeInto(deep)
 
   def _writeFields(self, encoder):
     if self.hasFile():
@@ -3120,7 +3120,7 @@ class FileDescriptor(coda.runtime.Object):
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
     if deep and self._options.isMutable():
-      self._options.freeze(deep)
+      self._options._freezeInto(deep)
     if type(self._structs) is not tuple:
       self._structs = tuple(self._structs)
     if type(self._enums) is not tuple:
@@ -2,6 +2,7 @@ import collections
 
 class FrozenDict(collections.Mapping):
   '''Immutable dictionary class that can be hashed.'''
+  __slots__ = ['_d', '_hash']
 
   def __init__(self, *args, **kwargs):
     self._d = dict(*args, **kwargs)
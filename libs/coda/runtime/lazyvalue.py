@@ -0,0 +1,36 @@
+class LazyValue:
+  '''Placeholder for a field value that has not been decoded yet. The value is
+     represented as a span of encoded data in the buffer of 'loader', and is decoded
+     the first time that load() is called. Generated classes with the 'lazyFields'
+     option call load() from their getters, and replace the placeholder with the
+     result.'''
+  __slots__ = ['__loader', '__value', 'offset', 'length', 'dataType', 'fieldType']
+
+  def __init__(self, loader, offset, length, dataType, fieldType):
+    self.__loader = loader
+    self.__value = None
+    self.offset = offset
+    self.length = length
+    self.dataType = dataType
+    self.fieldType = fieldType
+
+  def isLoaded(self):
+    'Return true if the value has been decoded.'
+    return self.__loader is None
+
+  def load(self):
+    '''Decode and return the value. The result is cached, so that every holder of
+       this placeholder gets the same object.'''
+    if self.__loader is not None:
+      self.__value = self.__loader.loadValue(self)
+      self.__loader = None
+    return self.__value
+
+  def copy(self):
+    '''Return a new placeholder for the same data, which decodes a value of its own
+       when it is loaded. This placeholder must not have been loaded yet.'''
+    assert self.__loader is not None
+    return LazyValue(self.__loader, self.offset, self.length, self.dataType, self.fieldType)
+
+  def __repr__(self):
+    return 'LazyValue(offset={0}, length={1})'.format(self.offset, self.length)
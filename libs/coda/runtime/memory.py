@@ -0,0 +1,140 @@
+'''Memory footprint reports for graphs of CODA objects.
+
+measure() walks the objects reachable from a root object through their field
+descriptors, and reports the number of instances of each struct type and the bytes
+they use, as computed by sys.getsizeof(). The bytes of each object are divided between
+the object itself (its slots), its mask of present fields, and the values of each of
+its fields: strings, bytes and containers, including the contents of containers.
+Structs held in fields are reported under their own type.
+
+Every value is counted once, however many times it is referred to, so values shared
+between objects (such as the Object.EMPTY_* defaults, or interned strings) are only
+charged to the first field found to hold them. Deferred fields (LazyValue) are not
+loaded; only the placeholder is counted.'''
+
+import sys
+from .frozendict import FrozenDict
+from .object import Object
+
+# Name of the pseudo-field that reports the size of the mask of present fields.
+PRESENT = '(present)'
+
+class TypeFootprint:
+  '''The instances of one struct type in a MemoryReport.'''
+  def __init__(self, name):
+    self.__name = name
+    self.__count = 0
+    self.__size = 0
+    self.__fields = {}
+
+  def getName(self):
+    '''The full name of the struct type.'''
+    return self.__name
+
+  def getCount(self):
+    '''The number of instances.'''
+    return self.__count
+
+  def getSize(self):
+    '''The bytes used by the instances themselves, not including their field values.'''
+    return self.__size
+
+  def getFieldSizes(self):
+    '''A dict of the bytes used by the values of each field, over all instances.'''
+    return self.__fields
+
+  def getTotal(self):
+    '''The bytes used by the instances and their field values.'''
+    return self.__size + sum(self.__fields.values())
+
+  def _add(self, size):
+    self.__count += 1
+    self.__size += size
+
+  def _addField(self, name, size):
+    self.__fields[name] = self.__fields.get(name, 0) + size
+
+class MemoryReport:
+  '''The memory used by a graph of objects, by struct type.'''
+  def __init__(self):
+    self.__types = {}
+
+  def getTypes(self):
+    '''Return the TypeFootprint of each struct type, largest first.'''
+    return sorted(self.__types.values(), key=lambda usage: usage.getTotal(), reverse=True)
+
+  def getType(self, name):
+    '''Return the TypeFootprint of the struct type with the full name 'name', or None.'''
+    return self.__types.get(name)
+
+  def getCount(self):
+    '''The number of objects.'''
+    return sum(usage.getCount() for usage in self.__types.values())
+
+  def getTotal(self):
+    '''The bytes used by all of the objects.'''
+    return sum(usage.getTotal() for usage in self.__types.values())
+
+  def format(self, fields=True):
+    '''Return the report as a table, with a row for each type, and if 'fields' is
+       true, a row for each field of the type that uses memory, largest first.'''
+    lines = ['{0:>12} {1:>10}  {2}'.format('bytes', 'count', 'type')]
+    for usage in self.getTypes():
+      lines.append('{0:12,} {1:10,}  {2}'.format(
+          usage.getTotal(), usage.getCount(), usage.getName()))
+      if fields:
+        fieldSizes = sorted(usage.getFieldSizes().items(), key=lambda item: item[1],
+            reverse=True)
+        for name, size in fieldSizes:
+          if size:
+            lines.append('{0:12,} {1:10}    .{2}'.format(size, '', name))
+    lines.append('{0:12,} {1:10,}  total'.format(self.getTotal(), self.getCount()))
+    return '\n'.join(lines)
+
+  def _typeFootprint(self, name):
+    usage = self.__types.get(name)
+    if usage is None:
+      usage = self.__types[name] = TypeFootprint(name)
+    return usage
+
+def measure(root):
+  '''Return a MemoryReport for the objects reachable from 'root'.'''
+  report = MemoryReport()
+  seen = set()
+  stack = [root]
+  seen.add(id(root))
+  while stack:
+    obj = stack.pop()
+    desc = obj.descriptor()
+    usage = report._typeFootprint(desc.getFullName())
+    usage._add(sys.getsizeof(obj))
+    usage._addField(PRESENT, _sizeOf(obj._present, seen, stack))
+    for field in desc.getAllFields():
+      value = getattr(obj, '_' + field.getName(), None)
+      usage._addField(field.getName(), _sizeOf(value, seen, stack))
+  return report
+
+def _sizeOf(value, seen, stack):
+  '''Return the bytes used by 'value' that have not been counted yet, and add any
+     objects it contains to 'stack'.'''
+  if value is None or id(value) in seen:
+    return 0
+  seen.add(id(value))
+  if isinstance(value, Object):
+    stack.append(value)
+    return 0
+  if isinstance(value, int) and -5 <= value <= 256:
+    # Small ints are preallocated by the interpreter.
+    return 0
+  size = sys.getsizeof(value)
+  if isinstance(value, FrozenDict):
+    size += _sizeOf(value._d, seen, stack)
+  elif isinstance(value, dict):
+    for key, item in value.items():
+      size += _sizeOf(key, seen, stack) + _sizeOf(item, seen, stack)
+  elif isinstance(value, (list, tuple, set, frozenset)):
+    for item in value:
+      size += _sizeOf(item, seen, stack)
+  # Other values are counted by themselves. This includes memoryviews, which don't own
+  # the buffer they refer to, and LazyValues.
+  return size
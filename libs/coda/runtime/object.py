@@ -6,13 +6,41 @@ from .frozendict import FrozenDict
 class ObjectMeta(type):
   '''Metaclass that creates (but does not initialize) a default instance
      for each class. The default instance will be initialized later by
-     the bootstrap code - this avoids the problem with circular references.'''
+     the bootstrap code - this avoids the problem with circular references.
+
+     It also assigns each field in the class's __fields__ table a bit in the mask of
+     present fields, following the bits of the base class. Generated code uses the
+     same bits directly.
+
+     Classes that declare slots but do not define _cloneImpl() (such as the
+     hand-written descriptor classes) have their slots added to __cloneSlots__, which
+     Object._cloneImpl() copies as they are.'''
   def __init__(self, name, bases, nmspc):
     super().__init__(name, bases, nmspc)
+    slots = nmspc.get('__slots__')
+    if slots and '_cloneImpl' not in nmspc:
+      prefix = '_' + name.lstrip('_')
+      self.__cloneSlots__ = self.__cloneSlots__ + tuple(
+          prefix + slot if slot.startswith('__') else slot for slot in slots)
+    fields = nmspc.get('__fields__')
+    if fields:
+      count = self.__fieldCount__
+      bits = dict(self.__fieldBits__)
+      for index, field in enumerate(fields):
+        bits[field[0]] = 1 << (count + index)
+      self.__fieldBits__ = bits
+      self.__fieldCount__ = count + len(fields)
     self.__defaultInstance__ = self.__new__(self)
 
 class Object(metaclass=ObjectMeta):
-  __slots__ = ['__mutable', '__present']
+  # '__state' is True while the object is mutable. Once it is frozen, '__state' is
+  # False until the hash of the object is computed, and then it is the hash, so caching
+  # the hash takes no extra space. '_present' is a mask of the fields that have been
+  # set, see ObjectMeta.
+  __slots__ = ['__state', '_present']
+  __fieldBits__ = {}
+  __fieldCount__ = 0
+  __cloneSlots__ = ()
 
   EMPTY_LIST = ()
   EMPTY_SET = frozenset()
@@ -23,8 +51,8 @@ class Object(metaclass=ObjectMeta):
   '''Base type for serializable objects.'''
   def __init__(self):
     super().__init__()
-    self.__mutable = True
-    self.__present = set()
+    self.__state = True
+    self._present = 0
 
   def __str__(self):
     return self._toStr(set())
@@ -46,10 +74,23 @@ class Object(metaclass=ObjectMeta):
     return self.descriptor().getFullName() + ' {' + '; '.join(fieldValues) + '}'
 
   def __eq__(self, other):
+    if self is other:
+      return True
+    # Frozen objects with different hashes can't be equal.
+    if isinstance(other, Object) and type(self.__state) is int and \
+        type(other.__state) is int and self.__state != other.__state:
+      return False
     return self._equalsImpl(other)
 
   def __hash__(self):
-    return self._hashImpl()
+    '''Only frozen objects can be hashed. The hash is computed once, and cached.'''
+    state = self.__state
+    if type(state) is int:
+      return state
+    result = self._hashImpl()
+    if state is False:
+      self.__state = result
+    return result
 
   def merge(self, src):
     '''Merge the fields of 'src' with this object.'''
@@ -60,22 +101,56 @@ class Object(metaclass=ObjectMeta):
     return type(self) is type(other)
 
   def _hashImpl(self):
-    if self.__mutable:
+    if self.__state is True:
       raise AssertionError('Only immutable values can be hashed. (type={0})'.format(type(self)))
     return hash(type(self))
 
   def _freezeImpl(self, deep):
-    '''Make this object immutable.'''
-    self.__mutable = False
+    '''Make this object immutable. Subclasses convert their fields to immutable
+       values. For a deep freeze, 'deep' is the list of objects waiting to be frozen,
+       and subclasses call _freezeInto(deep) on the objects they refer to; otherwise it
+       is False.'''
+    self.__state = False
+
+  def _cloneImpl(self, memo):
+    '''Return a mutable copy of this object, and add it to 'memo', a dict from the ids
+       of the objects copied so far to their copies. Subclasses copy their fields, using
+       _clone(memo) to copy the objects they refer to.'''
+    cls = type(self)
+    result = cls.__new__(cls)
+    memo[id(self)] = result
+    result.__state = True
+    result._present = self._present
+    for slot in cls.__cloneSlots__:
+      if hasattr(self, slot):
+        setattr(result, slot, getattr(self, slot))
+    return result
+
+  def _clone(self, memo):
+    '''Return the copy of this object in 'memo', copying it if it has not been copied
+       yet. Frozen objects are not copied.'''
+    if self.__state is not True:
+      return self
+    result = memo.get(id(self))
+    if result is None:
+      result = self._cloneImpl(memo)
+    return result
 
   def _isPresent(self, fieldName):
-    return fieldName in self.__present
+    return (self._present & self.__fieldBit(fieldName)) != 0
 
   def _setPresent(self, fieldName):
-    self.__present.add(fieldName)
+    self._present |= self.__fieldBit(fieldName)
 
   def _clearPresent(self, fieldName):
-    self.__present.discard(fieldName)
+    self._present &= ~self.__fieldBit(fieldName)
+
+  def __fieldBit(self, fieldName):
+    try:
+      return self.__fieldBits__[fieldName]
+    except KeyError:
+      raise AssertionError('Class {0} has no field {1}'.format(
+          type(self).__name__, fieldName)) from None
 
   def _initFieldValues(self, init):
     for fieldName, value in init.items():
@@ -114,30 +189,58 @@ class Object(metaclass=ObjectMeta):
     return result
 
   def freeze(self, deep=True):
-    '''Make this object immutable.'''
-    if self.__mutable:
-      self.__mutable = False
-      self._freezeImpl(deep)
+    '''Make this object immutable. If 'deep' is true, the mutable objects that it
+       refers to are frozen as well. Objects that are already frozen are skipped, and
+       objects that are referred to more than once, including cycles, are frozen once.'''
+    if self.__state is True:
+      if not deep:
+        self.__state = False
+        self._freezeImpl(False)
+      else:
+        # The objects referred to by each object are added to 'pending' by _freezeInto()
+        # rather than frozen recursively, so the depth of the graph is not limited by
+        # the stack. Each object stays in 'pending' while its fields are frozen, so that
+        # the list is never empty (and so true) when passed to _freezeImpl().
+        pending = [self]
+        while pending:
+          last = len(pending) - 1
+          obj = pending[last]
+          if obj.__state is True:
+            obj.__state = False
+            obj._freezeImpl(pending)
+          pending[last] = pending[-1]
+          pending.pop()
     return self
 
+  def _freezeInto(self, pending):
+    '''Called by _freezeImpl() during a deep freeze: add this object to 'pending', the
+       list of objects waiting to be frozen, if it is mutable.'''
+    if self.__state is True:
+      pending.append(self)
+
   def isMutable(self):
     'Return true if this object is mutable.'
-    return self.__mutable
+    return self.__state is True
 
   def checkMutable(self):
     'Asserts that this object is mutable.'
-    assert self.__mutable
+    assert self.__state is True
 
   def shallowCopy(self):
     '''Return a mutable, shallow copy of this object.'''
     result = copy.copy(self)
-    result.__mutable = True
-    result.__present = set(self.__present)
+    result.__state = True
     return result
 
+  def clone(self):
+    '''Return a mutable deep copy of this object. Objects that are referred to more than
+       once are copied once, so the copy has the same shape as the original, and frozen
+       objects are shared with the copy rather than copied.'''
+    return self._cloneImpl({})
+
   def encode(self, encoder):
     encoder.fileBegin()
-    self._writeFields(encoder)
+    encoder.writeFields(self)
     encoder.fileEnd()
 
   def writeFields(self, encoder):
@@ -146,6 +249,13 @@ class Object(metaclass=ObjectMeta):
   def _writeFields(self, encoder):
     pass
 
+  def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):
+    pass
+
+  def _loadLazyFields(self):
+    '''Decode any fields that were deferred by a lazy decoder.'''
+    pass
+
   def readFrom(self, streamCodec):
     '''Read the fields of this object from a stream.'''
     pass
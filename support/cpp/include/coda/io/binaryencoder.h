@@ -38,10 +38,10 @@ public:
   Encoder& writeString(const runtime::StringRef& value);
   Encoder& writeBytes(const runtime::StringRef& value);
   Encoder& writeBeginList(
-      coda::descriptors::TypeKind elementKind, size_t length, bool fixed = false);
+      coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits = 0);
   Encoder& writeEndList();
   Encoder& writeBeginSet(
-      coda::descriptors::TypeKind elementKind, size_t length, bool fixed = false);
+      coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits = 0);
   Encoder& writeEndSet();
   Encoder& writeBeginMap(
       coda::descriptors::TypeKind keyKind,
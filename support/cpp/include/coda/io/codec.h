@@ -62,16 +62,17 @@ public:
   /** Write a bytes value to the stream. */
   virtual Encoder& writeBytes(const runtime::StringRef& value) = 0;
 
-  /** Start a list value. */
+  /** Start a list value. If 'fixedBits' is non-zero, the elements are
+      fixed-width values of that many bits, written as a packed list. */
   virtual Encoder& writeBeginList(
-      coda::descriptors::TypeKind elementKind, size_t length, bool fixed = false) = 0;
+      coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits = 0) = 0;
 
   /** Finish a list value. */
   virtual Encoder& writeEndList() = 0;
 
-  /** Start a set value. */
+  /** Start a set value. 'fixedBits' has the same meaning as for lists. */
   virtual Encoder& writeBeginSet(
-      coda::descriptors::TypeKind elementKind, size_t length, bool fixed = false) = 0;
+      coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits = 0) = 0;
 
   /** End a set value. */
   virtual Encoder& writeEndSet() = 0;
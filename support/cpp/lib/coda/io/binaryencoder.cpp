@@ -184,13 +184,25 @@ Encoder& BinaryEncoder::writeBytes(const runtime::StringRef& value) {
 }
 
 Encoder& BinaryEncoder::writeBeginList(
-    coda::descriptors::TypeKind elementKind, size_t length, bool fixed ) {
-  if (fixed) {
+    coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits) {
+  if (fixedBits != 0) {
+    // Packed list: the element code gives the width of every element.
     beginValue(DT_PLIST);
+    if (elementKind == coda::descriptors::TYPE_KIND_INTEGER) {
+      switch (fixedBits) {
+        case 16: writeUByte(DT_FIXED16); break;
+        case 32: writeUByte(DT_FIXED32); break;
+        case 64: writeUByte(DT_FIXED64); break;
+        default:
+          throw EncodingError("Invalid width for packed list");
+      }
+    } else {
+      writeUByte(KIND_TO_DTYPE[elementKind]);
+    }
   } else {
     beginValue(DT_LIST);
+    writeUByte(KIND_TO_DTYPE[elementKind]);
   }
-  writeUByte(KIND_TO_DTYPE[elementKind]);
   writeVarInt(length);
   return *this;
 }
@@ -200,8 +212,8 @@ Encoder& BinaryEncoder::writeEndList() {
 }
 
 Encoder& BinaryEncoder::writeBeginSet(
-    coda::descriptors::TypeKind elementKind, size_t length, bool fixed ) {
-  return writeBeginList(elementKind, length, fixed);
+    coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits) {
+  return writeBeginList(elementKind, length, fixedBits);
 }
 
 Encoder& BinaryEncoder::writeEndSet() {
@@ -109,7 +109,7 @@ Encoder& TextEncoder::writeBytes(const runtime::StringRef& value) {
 }
 
 Encoder& TextEncoder::writeBeginList(
-    coda::descriptors::TypeKind elementKind, size_t length, bool fixed) {
+    coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits) {
   if (states.size() > maxDepth) {
     throw EncodingError("Maximum recursion depth exceeded");
   }
@@ -136,7 +136,7 @@ Encoder& TextEncoder::writeEndList() {
 }
 
 Encoder& TextEncoder::writeBeginSet(
-    coda::descriptors::TypeKind elementKind, size_t length, bool fixed) {
+    coda::descriptors::TypeKind elementKind, size_t length, unsigned fixedBits) {
   if (states.size() > maxDepth) {
     throw EncodingError("Maximum recursion depth exceeded");
   }
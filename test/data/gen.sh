@@ -9,5 +9,6 @@ else
   LIBPATH="$LIBS"
 fi
 PYTHONPATH=$LIBPATH python3 $ROOT/bin/codagen.py ${HERE}/sample.coda\
+    --opt="python:binaryReaders=true;binaryWriters=true;lazyFields=true;materializeBytes=true;compactLayout=true"\
     --out="python:${HERE}"\
     --out="cpp:${HERE}"
@@ -58,6 +58,9 @@ def createSample():
   s1.getMutableListEnum().append(sample.E.E2)
   s1.getMutableListEnum().append(sample.E.E1)
 
+  s1.getMutableListFixedInt().extend([120, 121, 122])
+  s1.getMutableListFixedFloat().extend([130.0, 130.5, 131.0])
+
   s1.getMutableSetInt().add(200)
   s1.getMutableSetInt().add(201)
   s1.getMutableSetInt().add(202)
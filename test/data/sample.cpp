@@ -138,6 +138,18 @@ coda::descriptors::FieldDescriptor S1::Field_listEnum(
     coda::descriptors::FieldOptions::DEFAULT_INSTANCE,
     CODA_OFFSET_OF(S1, _listEnum),
     (size_t)-1);
+coda::descriptors::FieldDescriptor S1::Field_listFixedInt(
+    "listFixedInt", 25,
+    coda::types::List<coda::types::Integer32>::DESCRIPTOR,
+    _options0,
+    CODA_OFFSET_OF(S1, _listFixedInt),
+    (size_t)-1);
+coda::descriptors::FieldDescriptor S1::Field_listFixedFloat(
+    "listFixedFloat", 26,
+    coda::types::List<coda::types::Float>::DESCRIPTOR,
+    _options0,
+    CODA_OFFSET_OF(S1, _listFixedFloat),
+    (size_t)-1);
 coda::descriptors::FieldDescriptor S1::Field_setInt(
     "setInt", 41,
     coda::types::Set<coda::types::Integer32>::DESCRIPTOR,
@@ -199,6 +211,8 @@ coda::descriptors::FieldDescriptor* S1::Fields[] = {
   &S1::Field_listFloat,
   &S1::Field_listString,
   &S1::Field_listEnum,
+  &S1::Field_listFixedInt,
+  &S1::Field_listFixedFloat,
   &S1::Field_setInt,
   &S1::Field_setString,
   &S1::Field_setEnum,
@@ -247,6 +261,8 @@ bool S1::equals(const coda::runtime::Object* other) const {
         _listFloat == ((S1*) other)->_listFloat &&
         _listString == ((S1*) other)->_listString &&
         _listEnum == ((S1*) other)->_listEnum &&
+        _listFixedInt == ((S1*) other)->_listFixedInt &&
+        _listFixedFloat == ((S1*) other)->_listFixedFloat &&
         _setInt == ((S1*) other)->_setInt &&
         _setString == ((S1*) other)->_setString &&
         _setEnum == ((S1*) other)->_setEnum &&
@@ -275,6 +291,8 @@ size_t S1::hashValue() const {
   coda::runtime::hash_combine(hash, coda::runtime::hash(_listFloat));
   coda::runtime::hash_combine(hash, coda::runtime::hash(_listString));
   coda::runtime::hash_combine(hash, coda::runtime::hash(_listEnum));
+  coda::runtime::hash_combine(hash, coda::runtime::hash(_listFixedInt));
+  coda::runtime::hash_combine(hash, coda::runtime::hash(_listFixedFloat));
   coda::runtime::hash_combine(hash, coda::runtime::hash(_setInt));
   coda::runtime::hash_combine(hash, coda::runtime::hash(_setString));
   coda::runtime::hash_combine(hash, coda::runtime::hash(_setEnum));
@@ -309,6 +327,8 @@ void S1::clear() {
   _listFloat.clear();
   _listString.clear();
   _listEnum.clear();
+  _listFixedInt.clear();
+  _listFixedFloat.clear();
   _setInt.clear();
   _setString.clear();
   _setEnum.clear();
@@ -415,6 +435,22 @@ void S1::endWrite(coda::io::Encoder* encoder) const {
     }
     encoder->writeEndList();
   }
+  if (!_listFixedInt.empty()) {
+    encoder->writeFieldHeader("listFixedInt", 25);
+    encoder->writeBeginList(coda::descriptors::TYPE_KIND_INTEGER, _listFixedInt.size(), 32);
+    for (std::vector<int32_t>::const_iterator it = _listFixedInt.begin(), itEnd = _listFixedInt.end(); it != itEnd; ++it) {
+      encoder->writeFixed32(*it);
+    }
+    encoder->writeEndList();
+  }
+  if (!_listFixedFloat.empty()) {
+    encoder->writeFieldHeader("listFixedFloat", 26);
+    encoder->writeBeginList(coda::descriptors::TYPE_KIND_FLOAT, _listFixedFloat.size(), 32);
+    for (std::vector<float>::const_iterator it = _listFixedFloat.begin(), itEnd = _listFixedFloat.end(); it != itEnd; ++it) {
+      encoder->writeFloat(*it);
+    }
+    encoder->writeEndList();
+  }
   if (!_setInt.empty()) {
     encoder->writeFieldHeader("setInt", 41);
     encoder->writeBeginSet(coda::descriptors::TYPE_KIND_INTEGER, _setInt.size());
@@ -720,6 +756,139 @@ void S3::endWrite(coda::io::Encoder* encoder) const {
   S1::endWrite(encoder);
 }
 
+// ============================================================================
+// S4
+// ============================================================================
+
+coda::descriptors::FieldDescriptor S4::Field_sharedLeft(
+    "sharedLeft", 1,
+    coda::types::Modified<S1, false, true>::DESCRIPTOR,
+    coda::descriptors::FieldOptions::DEFAULT_INSTANCE,
+    CODA_OFFSET_OF(S4, _sharedLeft),
+    S4::HAS_SHARED_LEFT);
+coda::descriptors::FieldDescriptor S4::Field_sharedRight(
+    "sharedRight", 2,
+    coda::types::Modified<S1, false, true>::DESCRIPTOR,
+    coda::descriptors::FieldOptions::DEFAULT_INSTANCE,
+    CODA_OFFSET_OF(S4, _sharedRight),
+    S4::HAS_SHARED_RIGHT);
+coda::descriptors::FieldDescriptor S4::Field_sharedList(
+    "sharedList", 3,
+    coda::types::List<coda::types::Modified<S1, false, true> >::DESCRIPTOR,
+    coda::descriptors::FieldOptions::DEFAULT_INSTANCE,
+    CODA_OFFSET_OF(S4, _sharedList),
+    (size_t)-1);
+
+coda::descriptors::FieldDescriptor* S4::Fields[] = {
+  &S4::Field_sharedLeft,
+  &S4::Field_sharedRight,
+  &S4::Field_sharedList,
+};
+
+const uint32_t S4::TYPE_ID = 3;
+
+coda::descriptors::StructDescriptor S4::DESCRIPTOR(
+  "S4",
+  3,
+  &S4::DEFAULT_INSTANCE,
+  FILE,
+  NULL,
+  &S1::DESCRIPTOR,
+  coda::descriptors::StructOptions::DEFAULT_INSTANCE,
+  coda::descriptors::StaticArrayRef<coda::descriptors::StructDescriptor*>(),
+  coda::descriptors::StaticArrayRef<coda::descriptors::EnumDescriptor*>(),
+  S4::Fields,
+  &coda::descriptors::StaticObjectBuilder<S4>::create,
+  (coda::descriptors::PresenceGetter) &S4::isFieldPresent,
+  (coda::descriptors::PresenceSetter) &S4::setFieldPresent
+);
+
+S4 S4::DEFAULT_INSTANCE;
+
+S4::S4()
+  : _sharedLeft(&S1::DEFAULT_INSTANCE)
+  , _sharedRight(&S1::DEFAULT_INSTANCE)
+{
+}
+
+bool S4::equals(const coda::runtime::Object* other) const {
+  return S1::equals(other) &&
+        _sharedLeft == ((S4*) other)->_sharedLeft &&
+        _sharedRight == ((S4*) other)->_sharedRight &&
+        _sharedList == ((S4*) other)->_sharedList;
+}
+
+size_t S4::hashValue() const {
+  size_t hash = S1::hashValue();
+  coda::runtime::hash_combine(hash, coda::runtime::hash(_sharedLeft));
+  coda::runtime::hash_combine(hash, coda::runtime::hash(_sharedRight));
+  coda::runtime::hash_combine(hash, coda::runtime::hash(_sharedList));
+  return hash;
+}
+
+void S4::freezeImpl() {
+  S1::freezeImpl();
+  if (_sharedLeft->isMutable()) {
+    _sharedLeft->freeze();
+  }
+  if (_sharedRight->isMutable()) {
+    _sharedRight->freeze();
+  }
+  for (std::vector<S1*>::const_iterator it = _sharedList.begin(), itEnd = _sharedList.end(); it != itEnd; ++it) {
+    if ((*it)->isMutable()) {
+      (*it)->freeze();
+    }
+  }
+}
+
+void S4::clear() {
+  S1::clear();
+  _sharedLeft = &S1::DEFAULT_INSTANCE;
+  _sharedRight = &S1::DEFAULT_INSTANCE;
+  _sharedList.clear();
+}
+
+void S4::deleteRecursiveImpl(Object** queue) {
+  S1::deleteRecursiveImpl(queue);
+  if (_sharedLeft != &S1::DEFAULT_INSTANCE) {
+    _sharedLeft->queueForDelete(queue);
+  }
+  if (_sharedRight != &S1::DEFAULT_INSTANCE) {
+    _sharedRight->queueForDelete(queue);
+  }
+  for (std::vector<S1*>::const_iterator it = _sharedList.begin(), itEnd = _sharedList.end(); it != itEnd; ++it) {
+    if ((*it) != &S1::DEFAULT_INSTANCE) {
+      (*it)->queueForDelete(queue);
+    }
+  }
+}
+
+void S4::beginWrite(coda::io::Encoder* encoder) const {
+  S1::beginWrite(encoder);
+  encoder->writeSubtypeHeader("S4", coda::descriptors::TYPE_KIND_FLOAT);
+}
+
+void S4::endWrite(coda::io::Encoder* encoder) const {
+  if (hasSharedLeft()) {
+    encoder->writeFieldHeader("sharedLeft", 1);
+    encoder->writeStruct(_sharedLeft, true);
+  }
+  if (hasSharedRight()) {
+    encoder->writeFieldHeader("sharedRight", 2);
+    encoder->writeStruct(_sharedRight, true);
+  }
+  if (!_sharedList.empty()) {
+    encoder->writeFieldHeader("sharedList", 3);
+    encoder->writeBeginList(coda::descriptors::TYPE_KIND_MODIFIED, _sharedList.size());
+    for (std::vector<S1*>::const_iterator it = _sharedList.begin(), itEnd = _sharedList.end(); it != itEnd; ++it) {
+      encoder->writeStruct(*it, true);
+    }
+    encoder->writeEndList();
+  }
+  encoder->writeEndSubtype();
+  S1::endWrite(encoder);
+}
+
 // ============================================================================
 // FILE
 // ============================================================================
@@ -728,6 +897,7 @@ static coda::descriptors::StructDescriptor* FILE_Structs[] = {
   &S1::DESCRIPTOR,
   &S2::DESCRIPTOR,
   &S3::DESCRIPTOR,
+  &S4::DESCRIPTOR,
 };
 
 static coda::descriptors::EnumDescriptor* FILE_Enums[] = {
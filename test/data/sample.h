@@ -75,6 +75,8 @@ public:
     , _listFloat(_src._listFloat)
     , _listString(_src._listString)
     , _listEnum(_src._listEnum)
+    , _listFixedInt(_src._listFixedInt)
+    , _listFixedFloat(_src._listFixedFloat)
     , _setInt(_src._setInt)
     , _setString(_src._setString)
     , _setEnum(_src._setEnum)
@@ -468,6 +470,48 @@ public:
     return *this;
   }
 
+  const std::vector<int32_t>& getListFixedInt() const {
+    return _listFixedInt;
+  }
+
+  std::vector<int32_t>& getMutableListFixedInt() {
+    checkMutable();
+    return _listFixedInt;
+  }
+
+  S1& setListFixedInt(const std::vector<int32_t>& listFixedInt) {
+    checkMutable();
+    _listFixedInt = listFixedInt;
+    return *this;
+  }
+
+  S1& clearListFixedInt() {
+    checkMutable();
+    _listFixedInt.clear();
+    return *this;
+  }
+
+  const std::vector<float>& getListFixedFloat() const {
+    return _listFixedFloat;
+  }
+
+  std::vector<float>& getMutableListFixedFloat() {
+    checkMutable();
+    return _listFixedFloat;
+  }
+
+  S1& setListFixedFloat(const std::vector<float>& listFixedFloat) {
+    checkMutable();
+    _listFixedFloat = listFixedFloat;
+    return *this;
+  }
+
+  S1& clearListFixedFloat() {
+    checkMutable();
+    _listFixedFloat.clear();
+    return *this;
+  }
+
   const std::unordered_set<int32_t>& getSetInt() const {
     return _setInt;
   }
@@ -657,6 +701,8 @@ private:
   std::vector<float> _listFloat;
   std::vector<std::string> _listString;
   std::vector<E> _listEnum;
+  std::vector<int32_t> _listFixedInt;
+  std::vector<float> _listFixedFloat;
   std::unordered_set<int32_t> _setInt;
   std::unordered_set<std::string> _setString;
   std::unordered_set<E, coda::runtime::EnumHash<E> > _setEnum;
@@ -690,6 +736,8 @@ private:
   static coda::descriptors::FieldDescriptor Field_listFloat;
   static coda::descriptors::FieldDescriptor Field_listString;
   static coda::descriptors::FieldDescriptor Field_listEnum;
+  static coda::descriptors::FieldDescriptor Field_listFixedInt;
+  static coda::descriptors::FieldDescriptor Field_listFixedFloat;
   static coda::descriptors::FieldDescriptor Field_setInt;
   static coda::descriptors::FieldDescriptor Field_setString;
   static coda::descriptors::FieldDescriptor Field_setEnum;
@@ -928,6 +976,142 @@ private:
   static coda::descriptors::FieldDescriptor* Fields[];
 };
 
+// ============================================================================
+// S4
+// ============================================================================
+
+class S4 : public S1 {
+public:
+  enum FieldPresentBits {
+    HAS_SHARED_LEFT,
+    HAS_SHARED_RIGHT,
+  };
+
+  S4();
+  S4(const S4& _src)
+    : S1(*this)
+    , _sharedLeft(_src._sharedLeft)
+    , _sharedRight(_src._sharedRight)
+    , _sharedList(_src._sharedList)
+  {}
+
+  coda::descriptors::StructDescriptor* descriptor() const {
+    return &DESCRIPTOR;
+  }
+
+  coda::runtime::Object* clone() const {
+    return new S4(*this);
+  }
+
+  bool equals(const coda::runtime::Object* other) const;
+  size_t hashValue() const;
+  void clear();
+  void freezeImpl();
+  void deleteRecursiveImpl(Object** freeList);
+  void beginWrite(coda::io::Encoder* encoder) const;
+  void endWrite(coda::io::Encoder* encoder) const;
+
+  bool hasSharedLeft() const {
+    return fieldsPresent.test(HAS_SHARED_LEFT);
+  }
+
+  const S1* getSharedLeft() const {
+    return _sharedLeft;
+  }
+
+  S1* getMutableSharedLeft() {
+    checkMutable();
+    fieldsPresent.set(HAS_SHARED_LEFT);
+    return _sharedLeft;
+  }
+
+  S4& setSharedLeft(S1* sharedLeft) {
+    checkMutable();
+    fieldsPresent.set(HAS_SHARED_LEFT);
+    _sharedLeft = sharedLeft;
+    return *this;
+  }
+
+  S4& clearSharedLeft() {
+    checkMutable();
+    fieldsPresent.reset(HAS_SHARED_LEFT);
+    _sharedLeft = &S1::DEFAULT_INSTANCE;
+    return *this;
+  }
+
+  bool hasSharedRight() const {
+    return fieldsPresent.test(HAS_SHARED_RIGHT);
+  }
+
+  const S1* getSharedRight() const {
+    return _sharedRight;
+  }
+
+  S1* getMutableSharedRight() {
+    checkMutable();
+    fieldsPresent.set(HAS_SHARED_RIGHT);
+    return _sharedRight;
+  }
+
+  S4& setSharedRight(S1* sharedRight) {
+    checkMutable();
+    fieldsPresent.set(HAS_SHARED_RIGHT);
+    _sharedRight = sharedRight;
+    return *this;
+  }
+
+  S4& clearSharedRight() {
+    checkMutable();
+    fieldsPresent.reset(HAS_SHARED_RIGHT);
+    _sharedRight = &S1::DEFAULT_INSTANCE;
+    return *this;
+  }
+
+  const std::vector<S1*>& getSharedList() const {
+    return _sharedList;
+  }
+
+  std::vector<S1*>& getMutableSharedList() {
+    checkMutable();
+    return _sharedList;
+  }
+
+  S4& setSharedList(const std::vector<S1*>& sharedList) {
+    checkMutable();
+    _sharedList = sharedList;
+    return *this;
+  }
+
+  S4& clearSharedList() {
+    checkMutable();
+    _sharedList.clear();
+    return *this;
+  }
+
+  static coda::descriptors::StructDescriptor DESCRIPTOR;
+  static S4 DEFAULT_INSTANCE;
+  static const uint32_t TYPE_ID;
+
+private:
+  std::bitset<2> fieldsPresent;
+  S1* _sharedLeft;
+  S1* _sharedRight;
+  std::vector<S1*> _sharedList;
+
+  bool isFieldPresent(size_t index) const {
+    return fieldsPresent[index];
+  }
+
+  void setFieldPresent(size_t index, bool present) {
+    fieldsPresent[index] = present;
+  }
+
+  static coda::descriptors::FieldDescriptor Field_sharedLeft;
+  static coda::descriptors::FieldDescriptor Field_sharedRight;
+  static coda::descriptors::FieldDescriptor Field_sharedList;
+  static coda::descriptors::FieldDescriptor* Fields[];
+};
+
 extern coda::descriptors::StaticFileDescriptor FILE;
 
 } // namespace sample
@@ -36,6 +36,8 @@ class S1(coda.runtime.Object):
     '_listFloat',
     '_listString',
     '_listEnum',
+    '_listFixedInt',
+    '_listFixedFloat',
     '_setInt',
     '_setString',
     '_setEnum',
@@ -59,18 +61,20 @@ class S1(coda.runtime.Object):
     ('scalarDouble', 9, 4, -1),
     ('scalarString', 10, 5, -1),
     ('scalarBytes', 11, 6, -1),
-    ('scalarEnum', 12, 22, -1),
+    ('scalarEnum', 12, 24, -1),
     ('listBoolean', 20, 7, -1),
     ('listInt', 21, 8, -1),
     ('listFloat', 22, 9, -1),
     ('listString', 23, 10, -1),
-    ('listEnum', 24, 12, -1),
-    ('setInt', 41, 13, -1),
-    ('setString', 43, 14, -1),
-    ('setEnum', 44, 16, -1),
-    ('mapIntString', 51, 17, -1),
-    ('mapStringInt', 52, 18, -1),
-    ('mapEnumStruct', 53, 20, -1),
+    ('listEnum', 24, 13, -1),
+    ('listFixedInt', 25, 8, 0),
+    ('listFixedFloat', 26, 9, 0),
+    ('setInt', 41, 14, -1),
+    ('setString', 43, 15, -1),
+    ('setEnum', 44, 17, -1),
+    ('mapIntString', 51, 18, -1),
+    ('mapStringInt', 52, 19, -1),
+    ('mapEnumStruct', 53, 21, -1),
     ('unused', 100, 2, -1),
   )
   __extensions__ = ()
@@ -95,6 +99,8 @@ class S1(coda.runtime.Object):
     self._listFloat = coda.runtime.Object.EMPTY_LIST
     self._listString = coda.runtime.Object.EMPTY_LIST
     self._listEnum = coda.runtime.Object.EMPTY_LIST
+    self._listFixedInt = coda.runtime.Object.EMPTY_LIST
+    self._listFixedFloat = coda.runtime.Object.EMPTY_LIST
     self._setInt = coda.runtime.Object.EMPTY_SET
     self._setString = coda.runtime.Object.EMPTY_SET
     self._setEnum = coda.runtime.Object.EMPTY_SET
@@ -117,17 +123,19 @@ class S1(coda.runtime.Object):
       self._scalarString == other._scalarString and
       self._scalarBytes == other._scalarBytes and
       self._scalarEnum == other._scalarEnum and
-      self._listBoolean == other._listBoolean and
-      self._listInt == other._listInt and
-      self._listFloat == other._listFloat and
-      self._listString == other._listString and
-      self._listEnum == other._listEnum and
-      self._setInt == other._setInt and
-      self._setString == other._setString and
-      self._setEnum == other._setEnum and
-      self._mapIntString == other._mapIntString and
-      self._mapStringInt == other._mapStringInt and
-      self._mapEnumStruct == other._mapEnumStruct and
+      self.getListBoolean() == other.getListBoolean() and
+      self.getListInt() == other.getListInt() and
+      self.getListFloat() == other.getListFloat() and
+      self.getListString() == other.getListString() and
+      self.getListEnum() == other.getListEnum() and
+      self.getListFixedInt() == other.getListFixedInt() and
+      self.getListFixedFloat() == other.getListFixedFloat() and
+      self.getSetInt() == other.getSetInt() and
+      self.getSetString() == other.getSetString() and
+      self.getSetEnum() == other.getSetEnum() and
+      self.getMapIntString() == other.getMapIntString() and
+      self.getMapStringInt() == other.getMapStringInt() and
+      self.getMapEnumStruct() == other.getMapEnumStruct() and
       self._unused == other._unused)
 
   def _hashImpl(self):
@@ -144,45 +152,179 @@ class S1(coda.runtime.Object):
       self._scalarString,
       self._scalarBytes,
       self._scalarEnum,
-      self._listBoolean,
-      self._listInt,
-      self._listFloat,
-      self._listString,
-      self._listEnum,
-      self._setInt,
-      self._setString,
-      self._setEnum,
-      self._mapIntString,
-      self._mapStringInt,
-      self._mapEnumStruct,
+      self.getListBoolean(),
+      self.getListInt(),
+      self.getListFloat(),
+      self.getListString(),
+      self.getListEnum(),
+      self.getListFixedInt(),
+      self.getListFixedFloat(),
+      self.getSetInt(),
+      self.getSetString(),
+      self.getSetEnum(),
+      self.getMapIntString(),
+      self.getMapStringInt(),
+      self.getMapEnumStruct(),
       self._unused))
 
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
+    if type(self._scalarBytes) is memoryview:
+      self._scalarBytes = bytes(self._scalarBytes)
+    if type(self._listBoolean) is coda.runtime.LazyValue:
+      self._listBoolean = self._listBoolean.load()
     if type(self._listBoolean) is not tuple:
       self._listBoolean = tuple(self._listBoolean)
+    if type(self._listInt) is coda.runtime.LazyValue:
+      self._listInt = self._listInt.load()
     if type(self._listInt) is not tuple:
       self._listInt = tuple(self._listInt)
+    if type(self._listFloat) is coda.runtime.LazyValue:
+      self._listFloat = self._listFloat.load()
     if type(self._listFloat) is not tuple:
       self._listFloat = tuple(self._listFloat)
+    if type(self._listString) is coda.runtime.LazyValue:
+      self._listString = self._listString.load()
     if type(self._listString) is not tuple:
       self._listString = tuple(self._listString)
+    if type(self._listEnum) is coda.runtime.LazyValue:
+      self._listEnum = self._listEnum.load()
     if type(self._listEnum) is not tuple:
       self._listEnum = tuple(self._listEnum)
+    if type(self._listFixedInt) is coda.runtime.LazyValue:
+      self._listFixedInt = self._listFixedInt.load()
+    if type(self._listFixedInt) is not tuple:
+      self._listFixedInt = tuple(self._listFixedInt)
+    if type(self._listFixedFloat) is coda.runtime.LazyValue:
+      self._listFixedFloat = self._listFixedFloat.load()
+    if type(self._listFixedFloat) is not tuple:
+      self._listFixedFloat = tuple(self._listFixedFloat)
+    if type(self._setInt) is coda.runtime.LazyValue:
+      self._setInt = self._setInt.load()
     if type(self._setInt) is not frozenset:
-      self._setInt = frozenset(self._setInt)
+      self._setInt = frozenset(self._setInt) if self._setInt else coda.runtime.Object.EMPTY_SET
+    if type(self._setString) is coda.runtime.LazyValue:
+      self._setString = self._setString.load()
     if type(self._setString) is not frozenset:
-      self._setString = frozenset(self._setString)
+      self._setString = frozenset(self._setString) if self._setString else coda.runtime.Object.EMPTY_SET
+    if type(self._setEnum) is coda.runtime.LazyValue:
+      self._setEnum = self._setEnum.load()
     if type(self._setEnum) is not frozenset:
-      self._setEnum = frozenset(self._setEnum)
+      self._setEnum = frozenset(self._setEnum) if self._setEnum else coda.runtime.Object.EMPTY_SET
+    if type(self._mapIntString) is coda.runtime.LazyValue:
+      self._mapIntString = self._mapIntString.load()
     if type(self._mapIntString) is not coda.runtime.FrozenDict:
-      self._mapIntString = coda.runtime.FrozenDict(self._mapIntString)
+      self._mapIntString = coda.runtime.FrozenDict(self._mapIntString) if self._mapIntString else coda.runtime.Object.EMPTY_MAP
+    if type(self._mapStringInt) is coda.runtime.LazyValue:
+      self._mapStringInt = self._mapStringInt.load()
     if type(self._mapStringInt) is not coda.runtime.FrozenDict:
-      self._mapStringInt = coda.runtime.FrozenDict(self._mapStringInt)
+      self._mapStringInt = coda.runtime.FrozenDict(self._mapStringInt) if self._mapStringInt else coda.runtime.Object.EMPTY_MAP
+    if type(self._mapEnumStruct) is coda.runtime.LazyValue:
+      self._mapEnumStruct = self._mapEnumStruct.load()
     if type(self._mapEnumStruct) is not coda.runtime.FrozenDict:
-      self._mapEnumStruct = coda.runtime.FrozenDict(self._mapEnumStruct)
+      self._mapEnumStruct = coda.runtime.FrozenDict(self._mapEnumStruct) if self._mapEnumStruct else coda.runtime.Object.EMPTY_MAP
+    if deep:
+      for v in self._mapEnumStruct.values():
+        if v is not None and v.isMutable():
+          v._freezeInto(deep)
+
+  def _cloneImpl(self, memo):
+    result = super()._cloneImpl(memo)
+    result._scalarBoolean = self._scalarBoolean
+    result._scalarI16 = self._scalarI16
+    result._scalarI32 = self._scalarI32
+    result._scalarI64 = self._scalarI64
+    result._scalarFixedI16 = self._scalarFixedI16
+    result._scalarFixedI32 = self._scalarFixedI32
+    result._scalarFixedI64 = self._scalarFixedI64
+    result._scalarFloat = self._scalarFloat
+    result._scalarDouble = self._scalarDouble
+    result._scalarString = self._scalarString
+    result._scalarBytes = self._scalarBytes
+    result._scalarEnum = self._scalarEnum
+    if type(self._listBoolean) is coda.runtime.LazyValue and not self._listBoolean.isLoaded():
+      result._listBoolean = self._listBoolean.copy()
+    elif self.getListBoolean() is coda.runtime.Object.EMPTY_LIST:
+      result._listBoolean = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listBoolean = list(self._listBoolean)
+    if type(self._listInt) is coda.runtime.LazyValue and not self._listInt.isLoaded():
+      result._listInt = self._listInt.copy()
+    elif self.getListInt() is coda.runtime.Object.EMPTY_LIST:
+      result._listInt = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listInt = list(self._listInt)
+    if type(self._listFloat) is coda.runtime.LazyValue and not self._listFloat.isLoaded():
+      result._listFloat = self._listFloat.copy()
+    elif self.getListFloat() is coda.runtime.Object.EMPTY_LIST:
+      result._listFloat = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listFloat = list(self._listFloat)
+    if type(self._listString) is coda.runtime.LazyValue and not self._listString.isLoaded():
+      result._listString = self._listString.copy()
+    elif self.getListString() is coda.runtime.Object.EMPTY_LIST:
+      result._listString = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listString = list(self._listString)
+    if type(self._listEnum) is coda.runtime.LazyValue and not self._listEnum.isLoaded():
+      result._listEnum = self._listEnum.copy()
+    elif self.getListEnum() is coda.runtime.Object.EMPTY_LIST:
+      result._listEnum = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listEnum = list(self._listEnum)
+    if type(self._listFixedInt) is coda.runtime.LazyValue and not self._listFixedInt.isLoaded():
+      result._listFixedInt = self._listFixedInt.copy()
+    elif self.getListFixedInt() is coda.runtime.Object.EMPTY_LIST:
+      result._listFixedInt = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listFixedInt = list(self._listFixedInt)
+    if type(self._listFixedFloat) is coda.runtime.LazyValue and not self._listFixedFloat.isLoaded():
+      result._listFixedFloat = self._listFixedFloat.copy()
+    elif self.getListFixedFloat() is coda.runtime.Object.EMPTY_LIST:
+      result._listFixedFloat = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._listFixedFloat = list(self._listFixedFloat)
+    if type(self._setInt) is coda.runtime.LazyValue and not self._setInt.isLoaded():
+      result._setInt = self._setInt.copy()
+    elif self.getSetInt() is coda.runtime.Object.EMPTY_SET:
+      result._setInt = coda.runtime.Object.EMPTY_SET
+    else:
+      result._setInt = set(self._setInt)
+    if type(self._setString) is coda.runtime.LazyValue and not self._setString.isLoaded():
+      result._setString = self._setString.copy()
+    elif self.getSetString() is coda.runtime.Object.EMPTY_SET:
+      result._setString = coda.runtime.Object.EMPTY_SET
+    else:
+      result._setString = set(self._setString)
+    if type(self._setEnum) is coda.runtime.LazyValue and not self._setEnum.isLoaded():
+      result._setEnum = self._setEnum.copy()
+    elif self.getSetEnum() is coda.runtime.Object.EMPTY_SET:
+      result._setEnum = coda.runtime.Object.EMPTY_SET
+    else:
+      result._setEnum = set(self._setEnum)
+    if type(self._mapIntString) is coda.runtime.LazyValue and not self._mapIntString.isLoaded():
+      result._mapIntString = self._mapIntString.copy()
+    elif self.getMapIntString() is coda.runtime.Object.EMPTY_MAP:
+      result._mapIntString = coda.runtime.Object.EMPTY_MAP
+    else:
+      result._mapIntString = dict(self._mapIntString)
+    if type(self._mapStringInt) is coda.runtime.LazyValue and not self._mapStringInt.isLoaded():
+      result._mapStringInt = self._mapStringInt.copy()
+    elif self.getMapStringInt() is coda.runtime.Object.EMPTY_MAP:
+      result._mapStringInt = coda.runtime.Object.EMPTY_MAP
+    else:
+      result._mapStringInt = dict(self._mapStringInt)
+    if type(self._mapEnumStruct) is coda.runtime.LazyValue and not self._mapEnumStruct.isLoaded():
+      result._mapEnumStruct = self._mapEnumStruct.copy()
+    elif self.getMapEnumStruct() is coda.runtime.Object.EMPTY_MAP:
+      result._mapEnumStruct = coda.runtime.Object.EMPTY_MAP
+    else:
+      result._mapEnumStruct = {k: v._clone(memo) for k, v in self._mapEnumStruct.items()}
+    result._unused = self._unused
+    return result
 
   def _writeFields(self, encoder):
+    self._loadLazyFields()
     if self.hasScalarBoolean():
       encoder.writeFieldHeader('scalarBoolean', 1)
       encoder.writeBoolean(self._scalarBoolean)
@@ -249,6 +391,12 @@ class S1(coda.runtime.Object):
       for val in self._listEnum:
         encoder.writeInteger(val)
       encoder.writeEndList()
+    if len(self._listFixedInt):
+      encoder.writeFieldHeader('listFixedInt', 25)
+      encoder.writePackedList(2, 32, self._listFixedInt)
+    if len(self._listFixedFloat):
+      encoder.writeFieldHeader('listFixedFloat', 26)
+      encoder.writePackedList(3, 32, self._listFixedFloat)
     if len(self._setInt):
       encoder.writeFieldHeader('setInt', 41)
       encoder.writeBeginSet(2, len(self._setInt))
@@ -292,6 +440,459 @@ class S1(coda.runtime.Object):
       encoder.writeFieldHeader('unused', 100)
       encoder.writeInteger(self._unused)
 
+  def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):
+    """Write the fields of this object to 'out', the output buffer of 'encoder'.
+       'last' is the id of the previous field written, and 'subtype' is true if
+       a subtype header has already been written."""
+    self._loadLazyFields()
+    if self.hasScalarBoolean():
+      value = self._scalarBoolean
+      if last < 1:
+        out.append((0x12 if value else 0x11) - (last << 4))
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarBoolean', 1)
+        encoder.writeBoolean(value)
+      last = 1
+    if self.hasScalarI16():
+      value = self._scalarI16
+      if last < 2:
+        if value == 0 or value == 1:
+          out.append(0x21 + value - (last << 4))
+        else:
+          out.append(0x23 - (last << 4))
+          value = value << 1 if value >= 0 else ~(value << 1)
+          while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+          out.append(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarI16', 2)
+        encoder.writeInteger(value)
+      last = 2
+    if self.hasScalarI32():
+      value = self._scalarI32
+      if last < 3:
+        if value == 0 or value == 1:
+          out.append(0x31 + value - (last << 4))
+        else:
+          out.append(0x33 - (last << 4))
+          value = value << 1 if value >= 0 else ~(value << 1)
+          while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+          out.append(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarI32', 3)
+        encoder.writeInteger(value)
+      last = 3
+    if self.hasScalarI64():
+      value = self._scalarI64
+      if last < 4:
+        if value == 0 or value == 1:
+          out.append(0x41 + value - (last << 4))
+        else:
+          out.append(0x43 - (last << 4))
+          value = value << 1 if value >= 0 else ~(value << 1)
+          while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+          out.append(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarI64', 4)
+        encoder.writeInteger(value)
+      last = 4
+    if self.hasScalarFixedI16():
+      value = self._scalarFixedI16
+      if last < 5:
+        if value == 0 or value == 1:
+          out.append(0x51 + value - (last << 4))
+        else:
+          out.append(0x54 - (last << 4))
+          out += encoder.FIXED16.pack(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarFixedI16', 5)
+        encoder.writeFixed16(value)
+      last = 5
+    if self.hasScalarFixedI32():
+      value = self._scalarFixedI32
+      if last < 6:
+        out.append(0x65 - (last << 4))
+        out += encoder.FIXED32.pack(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarFixedI32', 6)
+        encoder.writeFixed32(value)
+      last = 6
+    if self.hasScalarFixedI64():
+      value = self._scalarFixedI64
+      if last < 7:
+        out.append(0x75 - (last << 4))
+        out += encoder.FIXED32.pack(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarFixedI64', 7)
+        encoder.writeFixed32(value)
+      last = 7
+    if self.hasScalarFloat():
+      value = self._scalarFloat
+      if last < 8:
+        out.append(0x87 - (last << 4))
+        out += encoder.FLOAT.pack(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarFloat', 8)
+        encoder.writeFloat(value)
+      last = 8
+    if self.hasScalarDouble():
+      value = self._scalarDouble
+      if last < 9:
+        out.append(0x98 - (last << 4))
+        out += encoder.DOUBLE.pack(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarDouble', 9)
+        encoder.writeDouble(value)
+      last = 9
+    if self.hasScalarString():
+      value = self._scalarString
+      if last < 10 and not encoder.usesStringTable():
+        out.append(0xa9 - (last << 4))
+        value = value.encode()
+        length = len(value)
+        while length > 0x7f:
+          out.append((length & 0x7f) | 0x80)
+          length >>= 7
+        out.append(length)
+        out += value
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarString', 10)
+        encoder.writeString(value)
+      last = 10
+    if self.hasScalarBytes():
+      value = self._scalarBytes
+      if last < 11:
+        out.append(0xb9 - (last << 4))
+        length = len(value)
+        while length > 0x7f:
+          out.append((length & 0x7f) | 0x80)
+          length >>= 7
+        out.append(length)
+        out += value
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarBytes', 11)
+        encoder.writeBytes(value)
+      last = 11
+    if self.hasScalarEnum():
+      value = self._scalarEnum
+      if last < 12:
+        if value == 0 or value == 1:
+          out.append(0xc1 + value - (last << 4))
+        else:
+          out.append(0xc3 - (last << 4))
+          value = value << 1 if value >= 0 else ~(value << 1)
+          while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+          out.append(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('scalarEnum', 12)
+        encoder.writeInteger(value)
+      last = 12
+    if len(self._listBoolean):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listBoolean', 20)
+      encoder.writeBeginList(1, len(self._listBoolean))
+      for val in self._listBoolean:
+        encoder.writeBoolean(val)
+      encoder.writeEndList()
+      last = 20
+    if len(self._listInt):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listInt', 21)
+      encoder.writeBeginList(2, len(self._listInt))
+      for val in self._listInt:
+        encoder.writeInteger(val)
+      encoder.writeEndList()
+      last = 21
+    if len(self._listFloat):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listFloat', 22)
+      encoder.writeBeginList(3, len(self._listFloat))
+      for val in self._listFloat:
+        encoder.writeFloat(val)
+      encoder.writeEndList()
+      last = 22
+    if len(self._listString):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listString', 23)
+      encoder.writeBeginList(5, len(self._listString))
+      for val in self._listString:
+        encoder.writeString(val)
+      encoder.writeEndList()
+      last = 23
+    if len(self._listEnum):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listEnum', 24)
+      encoder.writeBeginList(31, len(self._listEnum))
+      for val in self._listEnum:
+        encoder.writeInteger(val)
+      encoder.writeEndList()
+      last = 24
+    if len(self._listFixedInt):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listFixedInt', 25)
+      encoder.writePackedList(2, 32, self._listFixedInt)
+      last = 25
+    if len(self._listFixedFloat):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('listFixedFloat', 26)
+      encoder.writePackedList(3, 32, self._listFixedFloat)
+      last = 26
+    if len(self._setInt):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('setInt', 41)
+      encoder.writeBeginSet(2, len(self._setInt))
+      for val in self._setInt:
+        encoder.writeInteger(val)
+      encoder.writeEndSet()
+      last = 41
+    if len(self._setString):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('setString', 43)
+      encoder.writeBeginSet(5, len(self._setString))
+      for val in self._setString:
+        encoder.writeString(val)
+      encoder.writeEndSet()
+      last = 43
+    if len(self._setEnum):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('setEnum', 44)
+      encoder.writeBeginSet(31, len(self._setEnum))
+      for val in self._setEnum:
+        encoder.writeInteger(val)
+      encoder.writeEndSet()
+      last = 44
+    if len(self._mapIntString):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('mapIntString', 51)
+      encoder.writeBeginMap(2, 5, len(self._mapIntString))
+      for key, val in self._mapIntString.items():
+        encoder.writeInteger(key)
+        encoder.writeString(val)
+      encoder.writeEndMap()
+      last = 51
+    if len(self._mapStringInt):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('mapStringInt', 52)
+      encoder.writeBeginMap(5, 2, len(self._mapStringInt))
+      for key, val in self._mapStringInt.items():
+        encoder.writeString(key)
+        encoder.writeInteger(val)
+      encoder.writeEndMap()
+      last = 52
+    if len(self._mapEnumStruct):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('mapEnumStruct', 53)
+      encoder.writeBeginMap(31, 30, len(self._mapEnumStruct))
+      for key, val in self._mapEnumStruct.items():
+        encoder.writeInteger(key)
+        encoder.writeStruct(val)
+      encoder.writeEndMap()
+      last = 53
+    if self.hasUnused():
+      value = self._unused
+      if 85 <= last < 100:
+        if value == 0 or value == 1:
+          out.append(0x641 + value - (last << 4))
+        else:
+          out.append(0x643 - (last << 4))
+          value = value << 1 if value >= 0 else ~(value << 1)
+          while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+          out.append(value)
+      else:
+        encoder.resumeFields(last, subtype)
+        encoder.writeFieldHeader('unused', 100)
+        encoder.writeInteger(value)
+      last = 100
+
+  def _readFieldsBinary(self, buf, pos, ctx, fid=0):
+    """Read fields from the binary buffer 'buf' starting at 'pos', where 'fid'
+       is the id of the previous field. Returns the position and id at which
+       reading stopped; the field header at that position is left for 'ctx'."""
+    end = len(buf)
+    while pos < end:
+      header = buf[pos]
+      dt = header & 0x0f
+      if header < 0x10 or dt == 0 or dt == 15:
+        break
+      nfid = fid + (header >> 4)
+      if nfid == 1:
+        if dt == 2:
+          self._scalarBoolean = True
+        elif dt == 1:
+          self._scalarBoolean = False
+        else:
+          break
+        pos += 1
+        self._present |= 0x1
+      elif nfid == 2:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarI16 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarI16 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarI16, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x2
+      elif nfid == 3:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarI32 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarI32 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarI32, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x4
+      elif nfid == 4:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarI64 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarI64 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarI64, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x8
+      elif nfid == 5:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarFixedI16 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarFixedI16 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarFixedI16, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x10
+      elif nfid == 6:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarFixedI32 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarFixedI32 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarFixedI32, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x20
+      elif nfid == 7:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarFixedI64 = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarFixedI64 = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._scalarFixedI64, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x40
+      elif nfid == 8:
+        if dt != 7 and dt != 8:
+          break
+        self._scalarFloat, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        self._present |= 0x80
+      elif nfid == 9:
+        if dt != 7 and dt != 8:
+          break
+        self._scalarDouble, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        self._present |= 0x100
+      elif nfid == 10:
+        if dt != 9:
+          break
+        self._scalarString, pos = ctx.readStringAt(buf, pos + 1)
+        self._present |= 0x200
+      elif nfid == 11:
+        if dt != 9:
+          break
+        self._scalarBytes, pos = ctx.readBytesAt(buf, pos + 1)
+        self._present |= 0x400
+      elif nfid == 12:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._scalarEnum = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._scalarEnum = dt - 1
+          pos += 1
+        else:
+          break
+        self._present |= 0x800
+      elif nfid == 100:
+        if dt == 3:
+          value, pos = ctx.readVarIntAt(buf, pos + 1)
+          self._unused = (value >> 1) ^ -(value & 1)
+        elif dt == 1 or dt == 2:
+          self._unused = dt - 1
+          pos += 1
+        elif dt <= 6:
+          self._unused, pos = ctx.readFormatAt(buf, pos + 1, dt)
+        else:
+          break
+        self._present |= 0x2000000
+      else:
+        break
+      fid = nfid
+    return pos, fid
+
+  def _loadLazyFields(self):
+    super()._loadLazyFields()
+    if type(self._listBoolean) is coda.runtime.LazyValue:
+      self._listBoolean = self._listBoolean.load()
+    if type(self._listInt) is coda.runtime.LazyValue:
+      self._listInt = self._listInt.load()
+    if type(self._listFloat) is coda.runtime.LazyValue:
+      self._listFloat = self._listFloat.load()
+    if type(self._listString) is coda.runtime.LazyValue:
+      self._listString = self._listString.load()
+    if type(self._listEnum) is coda.runtime.LazyValue:
+      self._listEnum = self._listEnum.load()
+    if type(self._listFixedInt) is coda.runtime.LazyValue:
+      self._listFixedInt = self._listFixedInt.load()
+    if type(self._listFixedFloat) is coda.runtime.LazyValue:
+      self._listFixedFloat = self._listFixedFloat.load()
+    if type(self._setInt) is coda.runtime.LazyValue:
+      self._setInt = self._setInt.load()
+    if type(self._setString) is coda.runtime.LazyValue:
+      self._setString = self._setString.load()
+    if type(self._setEnum) is coda.runtime.LazyValue:
+      self._setEnum = self._setEnum.load()
+    if type(self._mapIntString) is coda.runtime.LazyValue:
+      self._mapIntString = self._mapIntString.load()
+    if type(self._mapStringInt) is coda.runtime.LazyValue:
+      self._mapStringInt = self._mapStringInt.load()
+    if type(self._mapEnumStruct) is coda.runtime.LazyValue:
+      self._mapEnumStruct = self._mapEnumStruct.load()
+
   def merge(self, src):
     """@return S1"""
     if src.hasScalarBoolean():
@@ -323,6 +924,8 @@ class S1(coda.runtime.Object):
     self.getMutableListFloat().extend(src.getListFloat())
     self.getMutableListString().extend(src.getListString())
     self.getMutableListEnum().extend(src.getListEnum())
+    self.getMutableListFixedInt().extend(src.getListFixedInt())
+    self.getMutableListFixedFloat().extend(src.getListFixedFloat())
     self.getMutableSetInt().update(src.getSetInt())
     self.getMutableSetString().update(src.getSetString())
     self.getMutableSetEnum().update(src.getSetEnum())
@@ -334,7 +937,7 @@ class S1(coda.runtime.Object):
     return self
 
   def hasScalarBoolean(self):
-    return self._isPresent('scalarBoolean')
+    return (self._present & 0x1) != 0
 
   def isScalarBoolean(self):
     return self._scalarBoolean
@@ -343,18 +946,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarBoolean = scalarBoolean
-    self._setPresent('scalarBoolean')
+    self._present |= 0x1
     return self
 
   def clearScalarBoolean(self):
     """@return S1"""
     self.checkMutable()
     self._scalarBoolean = False
-    self._clearPresent('scalarBoolean')
+    self._present &= ~0x1
     return self
 
   def hasScalarI16(self):
-    return self._isPresent('scalarI16')
+    return (self._present & 0x2) != 0
 
   def getScalarI16(self):
     return self._scalarI16
@@ -363,18 +966,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarI16 = scalarI16
-    self._setPresent('scalarI16')
+    self._present |= 0x2
     return self
 
   def clearScalarI16(self):
     """@return S1"""
     self.checkMutable()
     self._scalarI16 = 0
-    self._clearPresent('scalarI16')
+    self._present &= ~0x2
     return self
 
   def hasScalarI32(self):
-    return self._isPresent('scalarI32')
+    return (self._present & 0x4) != 0
 
   def getScalarI32(self):
     return self._scalarI32
@@ -383,18 +986,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarI32 = scalarI32
-    self._setPresent('scalarI32')
+    self._present |= 0x4
     return self
 
   def clearScalarI32(self):
     """@return S1"""
     self.checkMutable()
     self._scalarI32 = 0
-    self._clearPresent('scalarI32')
+    self._present &= ~0x4
     return self
 
   def hasScalarI64(self):
-    return self._isPresent('scalarI64')
+    return (self._present & 0x8) != 0
 
   def getScalarI64(self):
     return self._scalarI64
@@ -403,18 +1006,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarI64 = scalarI64
-    self._setPresent('scalarI64')
+    self._present |= 0x8
     return self
 
   def clearScalarI64(self):
     """@return S1"""
     self.checkMutable()
     self._scalarI64 = 0
-    self._clearPresent('scalarI64')
+    self._present &= ~0x8
     return self
 
   def hasScalarFixedI16(self):
-    return self._isPresent('scalarFixedI16')
+    return (self._present & 0x10) != 0
 
   def getScalarFixedI16(self):
     return self._scalarFixedI16
@@ -423,18 +1026,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI16 = scalarFixedI16
-    self._setPresent('scalarFixedI16')
+    self._present |= 0x10
     return self
 
   def clearScalarFixedI16(self):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI16 = 0
-    self._clearPresent('scalarFixedI16')
+    self._present &= ~0x10
     return self
 
   def hasScalarFixedI32(self):
-    return self._isPresent('scalarFixedI32')
+    return (self._present & 0x20) != 0
 
   def getScalarFixedI32(self):
     return self._scalarFixedI32
@@ -443,18 +1046,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI32 = scalarFixedI32
-    self._setPresent('scalarFixedI32')
+    self._present |= 0x20
     return self
 
   def clearScalarFixedI32(self):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI32 = 0
-    self._clearPresent('scalarFixedI32')
+    self._present &= ~0x20
     return self
 
   def hasScalarFixedI64(self):
-    return self._isPresent('scalarFixedI64')
+    return (self._present & 0x40) != 0
 
   def getScalarFixedI64(self):
     return self._scalarFixedI64
@@ -463,18 +1066,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI64 = scalarFixedI64
-    self._setPresent('scalarFixedI64')
+    self._present |= 0x40
     return self
 
   def clearScalarFixedI64(self):
     """@return S1"""
     self.checkMutable()
     self._scalarFixedI64 = 0
-    self._clearPresent('scalarFixedI64')
+    self._present &= ~0x40
     return self
 
   def hasScalarFloat(self):
-    return self._isPresent('scalarFloat')
+    return (self._present & 0x80) != 0
 
   def getScalarFloat(self):
     return self._scalarFloat
@@ -483,18 +1086,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarFloat = scalarFloat
-    self._setPresent('scalarFloat')
+    self._present |= 0x80
     return self
 
   def clearScalarFloat(self):
     """@return S1"""
     self.checkMutable()
     self._scalarFloat = 0.0
-    self._clearPresent('scalarFloat')
+    self._present &= ~0x80
     return self
 
   def hasScalarDouble(self):
-    return self._isPresent('scalarDouble')
+    return (self._present & 0x100) != 0
 
   def getScalarDouble(self):
     return self._scalarDouble
@@ -503,18 +1106,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarDouble = scalarDouble
-    self._setPresent('scalarDouble')
+    self._present |= 0x100
     return self
 
   def clearScalarDouble(self):
     """@return S1"""
     self.checkMutable()
     self._scalarDouble = 0.0
-    self._clearPresent('scalarDouble')
+    self._present &= ~0x100
     return self
 
   def hasScalarString(self):
-    return self._isPresent('scalarString')
+    return (self._present & 0x200) != 0
 
   def getScalarString(self):
     return self._scalarString
@@ -523,18 +1126,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarString = scalarString
-    self._setPresent('scalarString')
+    self._present |= 0x200
     return self
 
   def clearScalarString(self):
     """@return S1"""
     self.checkMutable()
     self._scalarString = coda.runtime.Object.EMPTY_STRING
-    self._clearPresent('scalarString')
+    self._present &= ~0x200
     return self
 
   def hasScalarBytes(self):
-    return self._isPresent('scalarBytes')
+    return (self._present & 0x400) != 0
 
   def getScalarBytes(self):
     return self._scalarBytes
@@ -543,18 +1146,18 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarBytes = scalarBytes
-    self._setPresent('scalarBytes')
+    self._present |= 0x400
     return self
 
   def clearScalarBytes(self):
     """@return S1"""
     self.checkMutable()
     self._scalarBytes = coda.runtime.Object.EMPTY_BYTES
-    self._clearPresent('scalarBytes')
+    self._present &= ~0x400
     return self
 
   def hasScalarEnum(self):
-    return self._isPresent('scalarEnum')
+    return (self._present & 0x800) != 0
 
   def getScalarEnum(self):
     return self._scalarEnum
@@ -563,21 +1166,25 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._scalarEnum = scalarEnum
-    self._setPresent('scalarEnum')
+    self._present |= 0x800
     return self
 
   def clearScalarEnum(self):
     """@return S1"""
     self.checkMutable()
     self._scalarEnum = 0
-    self._clearPresent('scalarEnum')
+    self._present &= ~0x800
     return self
 
   def getListBoolean(self):
+    if type(self._listBoolean) is coda.runtime.LazyValue:
+      self._listBoolean = self._listBoolean.load()
     return self._listBoolean
 
   def getMutableListBoolean(self):
     self.checkMutable()
+    if type(self._listBoolean) is coda.runtime.LazyValue:
+      self._listBoolean = self._listBoolean.load()
     if self._listBoolean is coda.runtime.Object.EMPTY_LIST:
       self._listBoolean = []
     return self._listBoolean
@@ -595,10 +1202,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getListInt(self):
+    if type(self._listInt) is coda.runtime.LazyValue:
+      self._listInt = self._listInt.load()
     return self._listInt
 
   def getMutableListInt(self):
     self.checkMutable()
+    if type(self._listInt) is coda.runtime.LazyValue:
+      self._listInt = self._listInt.load()
     if self._listInt is coda.runtime.Object.EMPTY_LIST:
       self._listInt = []
     return self._listInt
@@ -616,10 +1227,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getListFloat(self):
+    if type(self._listFloat) is coda.runtime.LazyValue:
+      self._listFloat = self._listFloat.load()
     return self._listFloat
 
   def getMutableListFloat(self):
     self.checkMutable()
+    if type(self._listFloat) is coda.runtime.LazyValue:
+      self._listFloat = self._listFloat.load()
     if self._listFloat is coda.runtime.Object.EMPTY_LIST:
       self._listFloat = []
     return self._listFloat
@@ -637,10 +1252,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getListString(self):
+    if type(self._listString) is coda.runtime.LazyValue:
+      self._listString = self._listString.load()
     return self._listString
 
   def getMutableListString(self):
     self.checkMutable()
+    if type(self._listString) is coda.runtime.LazyValue:
+      self._listString = self._listString.load()
     if self._listString is coda.runtime.Object.EMPTY_LIST:
       self._listString = []
     return self._listString
@@ -658,10 +1277,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getListEnum(self):
+    if type(self._listEnum) is coda.runtime.LazyValue:
+      self._listEnum = self._listEnum.load()
     return self._listEnum
 
   def getMutableListEnum(self):
     self.checkMutable()
+    if type(self._listEnum) is coda.runtime.LazyValue:
+      self._listEnum = self._listEnum.load()
     if self._listEnum is coda.runtime.Object.EMPTY_LIST:
       self._listEnum = []
     return self._listEnum
@@ -678,11 +1301,65 @@ class S1(coda.runtime.Object):
     self._listEnum = coda.runtime.Object.EMPTY_LIST
     return self
 
+  def getListFixedInt(self):
+    if type(self._listFixedInt) is coda.runtime.LazyValue:
+      self._listFixedInt = self._listFixedInt.load()
+    return self._listFixedInt
+
+  def getMutableListFixedInt(self):
+    self.checkMutable()
+    if type(self._listFixedInt) is coda.runtime.LazyValue:
+      self._listFixedInt = self._listFixedInt.load()
+    if self._listFixedInt is coda.runtime.Object.EMPTY_LIST:
+      self._listFixedInt = []
+    return self._listFixedInt
+
+  def setListFixedInt(self, listFixedInt):
+    """@return S1"""
+    self.checkMutable()
+    self._listFixedInt = listFixedInt
+    return self
+
+  def clearListFixedInt(self):
+    """@return S1"""
+    self.checkMutable()
+    self._listFixedInt = coda.runtime.Object.EMPTY_LIST
+    return self
+
+  def getListFixedFloat(self):
+    if type(self._listFixedFloat) is coda.runtime.LazyValue:
+      self._listFixedFloat = self._listFixedFloat.load()
+    return self._listFixedFloat
+
+  def getMutableListFixedFloat(self):
+    self.checkMutable()
+    if type(self._listFixedFloat) is coda.runtime.LazyValue:
+      self._listFixedFloat = self._listFixedFloat.load()
+    if self._listFixedFloat is coda.runtime.Object.EMPTY_LIST:
+      self._listFixedFloat = []
+    return self._listFixedFloat
+
+  def setListFixedFloat(self, listFixedFloat):
+    """@return S1"""
+    self.checkMutable()
+    self._listFixedFloat = listFixedFloat
+    return self
+
+  def clearListFixedFloat(self):
+    """@return S1"""
+    self.checkMutable()
+    self._listFixedFloat = coda.runtime.Object.EMPTY_LIST
+    return self
+
   def getSetInt(self):
+    if type(self._setInt) is coda.runtime.LazyValue:
+      self._setInt = self._setInt.load()
     return self._setInt
 
   def getMutableSetInt(self):
     self.checkMutable()
+    if type(self._setInt) is coda.runtime.LazyValue:
+      self._setInt = self._setInt.load()
     if self._setInt is coda.runtime.Object.EMPTY_SET:
       self._setInt = set()
     return self._setInt
@@ -700,10 +1377,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getSetString(self):
+    if type(self._setString) is coda.runtime.LazyValue:
+      self._setString = self._setString.load()
     return self._setString
 
   def getMutableSetString(self):
     self.checkMutable()
+    if type(self._setString) is coda.runtime.LazyValue:
+      self._setString = self._setString.load()
     if self._setString is coda.runtime.Object.EMPTY_SET:
       self._setString = set()
     return self._setString
@@ -721,10 +1402,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getSetEnum(self):
+    if type(self._setEnum) is coda.runtime.LazyValue:
+      self._setEnum = self._setEnum.load()
     return self._setEnum
 
   def getMutableSetEnum(self):
     self.checkMutable()
+    if type(self._setEnum) is coda.runtime.LazyValue:
+      self._setEnum = self._setEnum.load()
     if self._setEnum is coda.runtime.Object.EMPTY_SET:
       self._setEnum = set()
     return self._setEnum
@@ -742,10 +1427,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getMapIntString(self):
+    if type(self._mapIntString) is coda.runtime.LazyValue:
+      self._mapIntString = self._mapIntString.load()
     return self._mapIntString
 
   def getMutableMapIntString(self):
     self.checkMutable()
+    if type(self._mapIntString) is coda.runtime.LazyValue:
+      self._mapIntString = self._mapIntString.load()
     if self._mapIntString is coda.runtime.Object.EMPTY_MAP:
       self._mapIntString = {}
     return self._mapIntString
@@ -763,10 +1452,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getMapStringInt(self):
+    if type(self._mapStringInt) is coda.runtime.LazyValue:
+      self._mapStringInt = self._mapStringInt.load()
     return self._mapStringInt
 
   def getMutableMapStringInt(self):
     self.checkMutable()
+    if type(self._mapStringInt) is coda.runtime.LazyValue:
+      self._mapStringInt = self._mapStringInt.load()
     if self._mapStringInt is coda.runtime.Object.EMPTY_MAP:
       self._mapStringInt = {}
     return self._mapStringInt
@@ -784,10 +1477,14 @@ class S1(coda.runtime.Object):
     return self
 
   def getMapEnumStruct(self):
+    if type(self._mapEnumStruct) is coda.runtime.LazyValue:
+      self._mapEnumStruct = self._mapEnumStruct.load()
     return self._mapEnumStruct
 
   def getMutableMapEnumStruct(self):
     self.checkMutable()
+    if type(self._mapEnumStruct) is coda.runtime.LazyValue:
+      self._mapEnumStruct = self._mapEnumStruct.load()
     if self._mapEnumStruct is coda.runtime.Object.EMPTY_MAP:
       self._mapEnumStruct = {}
     return self._mapEnumStruct
@@ -805,7 +1502,7 @@ class S1(coda.runtime.Object):
     return self
 
   def hasUnused(self):
-    return self._isPresent('unused')
+    return (self._present & 0x2000000) != 0
 
   def getUnused(self):
     return self._unused
@@ -814,14 +1511,14 @@ class S1(coda.runtime.Object):
     """@return S1"""
     self.checkMutable()
     self._unused = unused
-    self._setPresent('unused')
+    self._present |= 0x2000000
     return self
 
   def clearUnused(self):
     """@return S1"""
     self.checkMutable()
     self._unused = 0
-    self._clearPresent('unused')
+    self._present &= ~0x2000000
     return self
 
 # =============================================================================
@@ -837,8 +1534,8 @@ class S2(S1):
   __structs__ = ()
   __enums__ = ()
   __fields__ = (
-    ('left', 1, 21, -1),
-    ('right', 2, 21, -1),
+    ('left', 1, 23, -1),
+    ('right', 2, 23, -1),
   )
   __extensions__ = ()
   TYPE_ID = 1
@@ -850,22 +1547,39 @@ class S2(S1):
 
   def _equalsImpl(self, other):
     return (super()._equalsImpl(other) and
-      self._left == other._left and
-      self._right == other._right)
+      self.getLeft() == other.getLeft() and
+      self.getRight() == other.getRight())
 
   def _hashImpl(self):
     return hash((super()._hashImpl(),
-      self._left,
-      self._right))
+      self.getLeft(),
+      self.getRight()))
 
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
+    if type(self._left) is coda.runtime.LazyValue:
+      self._left = self._left.load()
     if deep and self._left.isMutable():
-      self._left.freeze(deep)
+      self._left._freezeInto(deep)
+    if type(self._right) is coda.runtime.LazyValue:
+      self._right = self._right.load()
     if deep and self._right.isMutable():
-      self._right.freeze(deep)
+      self._right._freezeInto(deep)
+
+  def _cloneImpl(self, memo):
+    result = super()._cloneImpl(memo)
+    if type(self._left) is coda.runtime.LazyValue and not self._left.isLoaded():
+      result._left = self._left.copy()
+    else:
+      result._left = self.getLeft()._clone(memo)
+    if type(self._right) is coda.runtime.LazyValue and not self._right.isLoaded():
+      result._right = self._right.copy()
+    else:
+      result._right = self.getRight()._clone(memo)
+    return result
 
   def _writeFields(self, encoder):
+    self._loadLazyFields()
     encoder.writeSubtypeHeader('S2', 1)
     if self.hasLeft():
       encoder.writeFieldHeader('left', 1)
@@ -875,6 +1589,37 @@ class S2(S1):
       encoder.writeStruct(self._right)
     super()._writeFields(encoder)
 
+  def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):
+    """Write the fields of this object to 'out', the output buffer of 'encoder'.
+       'last' is the id of the previous field written, and 'subtype' is true if
+       a subtype header has already been written."""
+    self._loadLazyFields()
+    if subtype:
+      encoder.resumeFields(last, subtype)
+      __class__._writeFields(self, encoder)
+      return
+    out += b'\x1f'
+    last = 0
+    subtype = True
+    if self.hasLeft():
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('left', 1)
+      encoder.writeStruct(self._left)
+      last = 1
+    if self.hasRight():
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('right', 2)
+      encoder.writeStruct(self._right)
+      last = 2
+    super()._writeFieldsBinary(out, encoder, last, subtype)
+
+  def _loadLazyFields(self):
+    super()._loadLazyFields()
+    if type(self._left) is coda.runtime.LazyValue:
+      self._left = self._left.load()
+    if type(self._right) is coda.runtime.LazyValue:
+      self._right = self._right.load()
+
   def merge(self, src):
     """@return S2"""
     super().merge(src)
@@ -885,17 +1630,21 @@ class S2(S1):
     return self
 
   def hasLeft(self):
-    return self._isPresent('left')
+    return (self._present & 0x4000000) != 0
 
   def getLeft(self):
     """@return S1"""
+    if type(self._left) is coda.runtime.LazyValue:
+      self._left = self._left.load()
     return self._left
 
   def getMutableLeft(self):
     """@return S1"""
     self.checkMutable()
+    if type(self._left) is coda.runtime.LazyValue:
+      self._left = self._left.load()
     if self._left is S1.defaultInstance() or not self._left.isMutable():
-      self._setPresent('left')
+      self._present |= 0x4000000
       self._left = self._left.shallowCopy()
     return self._left
 
@@ -903,28 +1652,32 @@ class S2(S1):
     """@return S2"""
     self.checkMutable()
     self._left = left
-    self._setPresent('left')
+    self._present |= 0x4000000
     return self
 
   def clearLeft(self):
     """@return S2"""
     self.checkMutable()
     self._left = S1.defaultInstance()
-    self._clearPresent('left')
+    self._present &= ~0x4000000
     return self
 
   def hasRight(self):
-    return self._isPresent('right')
+    return (self._present & 0x8000000) != 0
 
   def getRight(self):
     """@return S1"""
+    if type(self._right) is coda.runtime.LazyValue:
+      self._right = self._right.load()
     return self._right
 
   def getMutableRight(self):
     """@return S1"""
     self.checkMutable()
+    if type(self._right) is coda.runtime.LazyValue:
+      self._right = self._right.load()
     if self._right is S1.defaultInstance() or not self._right.isMutable():
-      self._setPresent('right')
+      self._present |= 0x8000000
       self._right = self._right.shallowCopy()
     return self._right
 
@@ -932,14 +1685,14 @@ class S2(S1):
     """@return S2"""
     self.checkMutable()
     self._right = right
-    self._setPresent('right')
+    self._present |= 0x8000000
     return self
 
   def clearRight(self):
     """@return S2"""
     self.checkMutable()
     self._right = S1.defaultInstance()
-    self._clearPresent('right')
+    self._present &= ~0x8000000
     return self
 
 # =============================================================================
@@ -956,9 +1709,9 @@ class S3(S1):
   __structs__ = ()
   __enums__ = ()
   __fields__ = (
-    ('sList', 1, 11, -1),
-    ('sSet', 2, 15, -1),
-    ('sMap', 3, 19, -1),
+    ('sList', 1, 12, -1),
+    ('sSet', 2, 16, -1),
+    ('sMap', 3, 20, -1),
   )
   __extensions__ = ()
   TYPE_ID = 2
@@ -971,26 +1724,67 @@ class S3(S1):
 
   def _equalsImpl(self, other):
     return (super()._equalsImpl(other) and
-      self._sList == other._sList and
-      self._sSet == other._sSet and
-      self._sMap == other._sMap)
+      self.getSList() == other.getSList() and
+      self.getSSet() == other.getSSet() and
+      self.getSMap() == other.getSMap())
 
   def _hashImpl(self):
     return hash((super()._hashImpl(),
-      self._sList,
-      self._sSet,
-      self._sMap))
+      self.getSList(),
+      self.getSSet(),
+      self.getSMap()))
 
   def _freezeImpl(self, deep=True):
     super()._freezeImpl(deep)
+    if type(self._sList) is coda.runtime.LazyValue:
+      self._sList = self._sList.load()
     if type(self._sList) is not tuple:
       self._sList = tuple(self._sList)
+    if deep:
+      for v in self._sList:
+        if v is not None and v.isMutable():
+          v._freezeInto(deep)
+    if type(self._sSet) is coda.runtime.LazyValue:
+      self._sSet = self._sSet.load()
     if type(self._sSet) is not frozenset:
-      self._sSet = frozenset(self._sSet)
+      self._sSet = frozenset(self._sSet) if self._sSet else coda.runtime.Object.EMPTY_SET
+    if deep:
+      for v in self._sSet:
+        if v is not None and v.isMutable():
+          v._freezeInto(deep)
+    if type(self._sMap) is coda.runtime.LazyValue:
+      self._sMap = self._sMap.load()
     if type(self._sMap) is not coda.runtime.FrozenDict:
-      self._sMap = coda.runtime.FrozenDict(self._sMap)
+      self._sMap = coda.runtime.FrozenDict(self._sMap) if self._sMap else coda.runtime.Object.EMPTY_MAP
+    if deep:
+      for v in self._sMap.values():
+        if v is not None and v.isMutable():
+          v._freezeInto(deep)
+
+  def _cloneImpl(self, memo):
+    result = super()._cloneImpl(memo)
+    if type(self._sList) is coda.runtime.LazyValue and not self._sList.isLoaded():
+      result._sList = self._sList.copy()
+    elif self.getSList() is coda.runtime.Object.EMPTY_LIST:
+      result._sList = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._sList = [v._clone(memo) for v in self._sList]
+    if type(self._sSet) is coda.runtime.LazyValue and not self._sSet.isLoaded():
+      result._sSet = self._sSet.copy()
+    elif self.getSSet() is coda.runtime.Object.EMPTY_SET:
+      result._sSet = coda.runtime.Object.EMPTY_SET
+    else:
+      result._sSet = set(self._sSet)
+    if type(self._sMap) is coda.runtime.LazyValue and not self._sMap.isLoaded():
+      result._sMap = self._sMap.copy()
+    elif self.getSMap() is coda.runtime.Object.EMPTY_MAP:
+      result._sMap = coda.runtime.Object.EMPTY_MAP
+    else:
+      result._sMap = {k: v._clone(memo) for k, v in self._sMap.items()}
+    return result
 
   def _writeFields(self, encoder):
+    self._loadLazyFields()
     encoder.writeSubtypeHeader('S3', 2)
     if len(self._sList):
       encoder.writeFieldHeader('sList', 1)
@@ -1013,6 +1807,54 @@ class S3(S1):
       encoder.writeEndMap()
     super()._writeFields(encoder)
 
+  def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):
+    """Write the fields of this object to 'out', the output buffer of 'encoder'.
+       'last' is the id of the previous field written, and 'subtype' is true if
+       a subtype header has already been written."""
+    self._loadLazyFields()
+    if subtype:
+      encoder.resumeFields(last, subtype)
+      __class__._writeFields(self, encoder)
+      return
+    out += b'/'
+    last = 0
+    subtype = True
+    if len(self._sList):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sList', 1)
+      encoder.writeBeginList(30, len(self._sList))
+      for val in self._sList:
+        encoder.writeStruct(val)
+      encoder.writeEndList()
+      last = 1
+    if len(self._sSet):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sSet', 2)
+      encoder.writeBeginSet(30, len(self._sSet))
+      for val in self._sSet:
+        encoder.writeStruct(val)
+      encoder.writeEndSet()
+      last = 2
+    if len(self._sMap):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sMap', 3)
+      encoder.writeBeginMap(5, 30, len(self._sMap))
+      for key, val in self._sMap.items():
+        encoder.writeString(key)
+        encoder.writeStruct(val)
+      encoder.writeEndMap()
+      last = 3
+    super()._writeFieldsBinary(out, encoder, last, subtype)
+
+  def _loadLazyFields(self):
+    super()._loadLazyFields()
+    if type(self._sList) is coda.runtime.LazyValue:
+      self._sList = self._sList.load()
+    if type(self._sSet) is coda.runtime.LazyValue:
+      self._sSet = self._sSet.load()
+    if type(self._sMap) is coda.runtime.LazyValue:
+      self._sMap = self._sMap.load()
+
   def merge(self, src):
     """@return S3"""
     super().merge(src)
@@ -1022,10 +1864,14 @@ class S3(S1):
     return self
 
   def getSList(self):
+    if type(self._sList) is coda.runtime.LazyValue:
+      self._sList = self._sList.load()
     return self._sList
 
   def getMutableSList(self):
     self.checkMutable()
+    if type(self._sList) is coda.runtime.LazyValue:
+      self._sList = self._sList.load()
     if self._sList is coda.runtime.Object.EMPTY_LIST:
       self._sList = []
     return self._sList
@@ -1043,10 +1889,14 @@ class S3(S1):
     return self
 
   def getSSet(self):
+    if type(self._sSet) is coda.runtime.LazyValue:
+      self._sSet = self._sSet.load()
     return self._sSet
 
   def getMutableSSet(self):
     self.checkMutable()
+    if type(self._sSet) is coda.runtime.LazyValue:
+      self._sSet = self._sSet.load()
     if self._sSet is coda.runtime.Object.EMPTY_SET:
       self._sSet = set()
     return self._sSet
@@ -1064,10 +1914,14 @@ class S3(S1):
     return self
 
   def getSMap(self):
+    if type(self._sMap) is coda.runtime.LazyValue:
+      self._sMap = self._sMap.load()
     return self._sMap
 
   def getMutableSMap(self):
     self.checkMutable()
+    if type(self._sMap) is coda.runtime.LazyValue:
+      self._sMap = self._sMap.load()
     if self._sMap is coda.runtime.Object.EMPTY_MAP:
       self._sMap = {}
     return self._sMap
@@ -1084,9 +1938,232 @@ class S3(S1):
     self._sMap = coda.runtime.Object.EMPTY_MAP
     return self
 
+# =============================================================================
+# S4
+# =============================================================================
+
+class S4(S1):
+  __slots__ = [
+    '_sharedLeft',
+    '_sharedRight',
+    '_sharedList',
+  ]
+
+  __structs__ = ()
+  __enums__ = ()
+  __fields__ = (
+    ('sharedLeft', 1, 22, -1),
+    ('sharedRight', 2, 22, -1),
+    ('sharedList', 3, 11, -1),
+  )
+  __extensions__ = ()
+  TYPE_ID = 3
+
+  def __init__(self):
+    super().__init__()
+    self._sharedLeft = S1.defaultInstance()
+    self._sharedRight = S1.defaultInstance()
+    self._sharedList = coda.runtime.Object.EMPTY_LIST
+
+  def _equalsImpl(self, other):
+    return (super()._equalsImpl(other) and
+      self.getSharedLeft() == other.getSharedLeft() and
+      self.getSharedRight() == other.getSharedRight() and
+      self.getSharedList() == other.getSharedList())
+
+  def _hashImpl(self):
+    return hash((super()._hashImpl(),
+      self.getSharedLeft(),
+      self.getSharedRight(),
+      self.getSharedList()))
+
+  def _freezeImpl(self, deep=True):
+    super()._freezeImpl(deep)
+    if type(self._sharedLeft) is coda.runtime.LazyValue:
+      self._sharedLeft = self._sharedLeft.load()
+    if deep and self._sharedLeft and self._sharedLeft.isMutable():
+      self._sharedLeft._freezeInto(deep)
+    if type(self._sharedRight) is coda.runtime.LazyValue:
+      self._sharedRight = self._sharedRight.load()
+    if deep and self._sharedRight and self._sharedRight.isMutable():
+      self._sharedRight._freezeInto(deep)
+    if type(self._sharedList) is coda.runtime.LazyValue:
+      self._sharedList = self._sharedList.load()
+    if type(self._sharedList) is not tuple:
+      self._sharedList = tuple(self._sharedList)
+    if deep:
+      for v in self._sharedList:
+        if v is not None and v.isMutable():
+          v._freezeInto(deep)
+
+  def _cloneImpl(self, memo):
+    result = super()._cloneImpl(memo)
+    result._sharedLeft = self.getSharedLeft() and self._sharedLeft._clone(memo)
+    result._sharedRight = self.getSharedRight() and self._sharedRight._clone(memo)
+    if self.getSharedList() is coda.runtime.Object.EMPTY_LIST:
+      result._sharedList = coda.runtime.Object.EMPTY_LIST
+    else:
+      result._sharedList = [v._clone(memo) for v in self._sharedList]
+    return result
+
+  def _writeFields(self, encoder):
+    self._loadLazyFields()
+    encoder.writeSubtypeHeader('S4', 3)
+    if self.hasSharedLeft():
+      encoder.writeFieldHeader('sharedLeft', 1)
+      encoder.writeStruct(self._sharedLeft, True)
+    if self.hasSharedRight():
+      encoder.writeFieldHeader('sharedRight', 2)
+      encoder.writeStruct(self._sharedRight, True)
+    if len(self._sharedList):
+      encoder.writeFieldHeader('sharedList', 3)
+      encoder.writeBeginList(30, len(self._sharedList))
+      for val in self._sharedList:
+        encoder.writeStruct(val, True)
+      encoder.writeEndList()
+    super()._writeFields(encoder)
+
+  def _writeFieldsBinary(self, out, encoder, last=0, subtype=False):
+    """Write the fields of this object to 'out', the output buffer of 'encoder'.
+       'last' is the id of the previous field written, and 'subtype' is true if
+       a subtype header has already been written."""
+    self._loadLazyFields()
+    if subtype:
+      encoder.resumeFields(last, subtype)
+      __class__._writeFields(self, encoder)
+      return
+    out += b'?'
+    last = 0
+    subtype = True
+    if self.hasSharedLeft():
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sharedLeft', 1)
+      encoder.writeStruct(self._sharedLeft, True)
+      last = 1
+    if self.hasSharedRight():
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sharedRight', 2)
+      encoder.writeStruct(self._sharedRight, True)
+      last = 2
+    if len(self._sharedList):
+      encoder.resumeFields(last, subtype)
+      encoder.writeFieldHeader('sharedList', 3)
+      encoder.writeBeginList(30, len(self._sharedList))
+      for val in self._sharedList:
+        encoder.writeStruct(val, True)
+      encoder.writeEndList()
+      last = 3
+    super()._writeFieldsBinary(out, encoder, last, subtype)
+
+  def _loadLazyFields(self):
+    super()._loadLazyFields()
+    if type(self._sharedLeft) is coda.runtime.LazyValue:
+      self._sharedLeft = self._sharedLeft.load()
+    if type(self._sharedRight) is coda.runtime.LazyValue:
+      self._sharedRight = self._sharedRight.load()
+    if type(self._sharedList) is coda.runtime.LazyValue:
+      self._sharedList = self._sharedList.load()
+
+  def merge(self, src):
+    """@return S4"""
+    super().merge(src)
+    if src.hasSharedLeft():
+      self.setSharedLeft(src.getSharedLeft())
+    if src.hasSharedRight():
+      self.setSharedRight(src.getSharedRight())
+    self.getMutableSharedList().extend(src.getSharedList())
+    return self
+
+  def hasSharedLeft(self):
+    return (self._present & 0x4000000) != 0
+
+  def getSharedLeft(self):
+    if type(self._sharedLeft) is coda.runtime.LazyValue:
+      self._sharedLeft = self._sharedLeft.load()
+    return self._sharedLeft
+
+  def getMutableSharedLeft(self):
+    self.checkMutable()
+    if type(self._sharedLeft) is coda.runtime.LazyValue:
+      self._sharedLeft = self._sharedLeft.load()
+    if self._sharedLeft is S1.defaultInstance() or not self._sharedLeft.isMutable():
+      self._present |= 0x4000000
+      self._sharedLeft = self._sharedLeft.shallowCopy()
+    return self._sharedLeft
+
+  def setSharedLeft(self, sharedLeft):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedLeft = sharedLeft
+    self._present |= 0x4000000
+    return self
+
+  def clearSharedLeft(self):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedLeft = S1.defaultInstance()
+    self._present &= ~0x4000000
+    return self
+
+  def hasSharedRight(self):
+    return (self._present & 0x8000000) != 0
+
+  def getSharedRight(self):
+    if type(self._sharedRight) is coda.runtime.LazyValue:
+      self._sharedRight = self._sharedRight.load()
+    return self._sharedRight
+
+  def getMutableSharedRight(self):
+    self.checkMutable()
+    if type(self._sharedRight) is coda.runtime.LazyValue:
+      self._sharedRight = self._sharedRight.load()
+    if self._sharedRight is S1.defaultInstance() or not self._sharedRight.isMutable():
+      self._present |= 0x8000000
+      self._sharedRight = self._sharedRight.shallowCopy()
+    return self._sharedRight
+
+  def setSharedRight(self, sharedRight):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedRight = sharedRight
+    self._present |= 0x8000000
+    return self
+
+  def clearSharedRight(self):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedRight = S1.defaultInstance()
+    self._present &= ~0x8000000
+    return self
+
+  def getSharedList(self):
+    if type(self._sharedList) is coda.runtime.LazyValue:
+      self._sharedList = self._sharedList.load()
+    return self._sharedList
+
+  def getMutableSharedList(self):
+    self.checkMutable()
+    if type(self._sharedList) is coda.runtime.LazyValue:
+      self._sharedList = self._sharedList.load()
+    if self._sharedList is coda.runtime.Object.EMPTY_LIST:
+      self._sharedList = []
+    return self._sharedList
+
+  def setSharedList(self, sharedList):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedList = sharedList
+    return self
+
+  def clearSharedList(self):
+    """@return S4"""
+    self.checkMutable()
+    self._sharedList = coda.runtime.Object.EMPTY_LIST
+    return self
+
 FILE = coda.runtime.createFile('sample.coda', '/home/talin/Projects/coda/coda/test/data', 'sample',
   structs = (
-    S1, S2, S3,
+    S1, S2, S3, S4,
   ),
   enums = (
     E,
@@ -1103,6 +2180,7 @@ FILE = coda.runtime.createFile('sample.coda', '/home/talin/Projects/coda/coda/te
     t.ListType().setElementType(t.I32),
     t.ListType().setElementType(t.FLOAT),
     t.ListType().setElementType(t.STRING),
+    t.ListType().setElementType(t.ModifiedType().setElementType(S1.DESCRIPTOR).setShared(True)),
     t.ListType().setElementType(S1.DESCRIPTOR),
     t.ListType().setElementType(E.DESCRIPTOR),
     t.SetType().setElementType(t.I32),
@@ -1113,6 +2191,7 @@ FILE = coda.runtime.createFile('sample.coda', '/home/talin/Projects/coda/coda/te
     t.MapType().setKeyType(t.STRING).setValueType(t.I32),
     t.MapType().setKeyType(t.STRING).setValueType(S1.DESCRIPTOR),
     t.MapType().setKeyType(E.DESCRIPTOR).setValueType(S1.DESCRIPTOR),
+    t.ModifiedType().setElementType(S1.DESCRIPTOR).setShared(True),
     S1.DESCRIPTOR,
     E.DESCRIPTOR,
   ),
@@ -1122,5 +2201,5 @@ FILE = coda.runtime.createFile('sample.coda', '/home/talin/Projects/coda/coda/te
   ), fileOptions=1, module=globals())
 
 __all__ = [
-  'S1', 'S2', 'S3', 'E'
+  'S1', 'S2', 'S3', 'S4', 'E'
 ]
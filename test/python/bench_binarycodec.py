@@ -0,0 +1,300 @@
+'''Benchmarks for CODA binary serialization.
+
+Run directly: python3 bench_binarycodec.py'''
+
+import copy
+import io
+import mmap
+import os
+import sys
+import tempfile
+import timeit
+from coda.io.archive import Archive, ArchiveWriter
+from coda.io.binarycodec import BinaryCodec
+from coda.io.blockfile import BlockFile, BlockWriter
+from coda.io.parallel import decodeAll, encodeAll
+from coda.io.recordfile import RecordReader, RecordWriter
+import finddata
+
+sample = finddata.sample
+
+def createS1(i):
+  s1 = sample.S1()
+  s1.setScalarBoolean(True)
+  s1.setScalarI16(11 + i)
+  s1.setScalarI32(12 + i)
+  s1.setScalarI64(13 + i)
+  s1.setScalarFixedI16(14)
+  s1.setScalarFixedI32(15)
+  s1.setScalarFixedI64(16)
+  s1.setScalarFloat(55.0)
+  s1.setScalarDouble(56.0)
+  s1.setScalarString("alpha\n\t")
+  s1.setScalarBytes(b"beta")
+  s1.setScalarEnum(sample.E.E1)
+  s1.getMutableListBoolean().extend([True, False, True])
+  s1.getMutableListInt().extend([100, 101, 102])
+  s1.getMutableListFloat().extend([110.0, 110.1, 110.2])
+  s1.getMutableListString().extend(['beta', 'delta\0', 'yin-yan: ☯'])
+  s1.getMutableListEnum().extend([sample.E.E1, sample.E.E2, sample.E.E1])
+  s1.getMutableSetInt().update([200, 201, 202])
+  s1.getMutableMapIntString()[300] = 'three_oh_oh'
+  s1.getMutableMapStringInt()['three_oh_oh'] = 300
+  return s1
+
+def createLargeSample(count):
+  '''Create an S3 whose list contains 'count' populated S1 structs, similar
+     to the contents of test/data/sample.dat.'''
+  s3 = sample.S3()
+  for i in range(count):
+    s3.getMutableSList().append(createS1(i))
+  return s3
+
+def encode(obj):
+  stream = io.BytesIO()
+  obj.encode(BinaryCodec.createEncoder(stream))
+  return stream.getvalue()
+
+def best(fn, number):
+  '''Return the fastest of 'number' runs of 'fn', in seconds.'''
+  return min(timeit.repeat(fn, number=1, repeat=number))
+
+def report(name, seconds, size):
+  print('{0:<32} {1:8.2f} ms   {2:8.2f} MB/s'.format(
+      name, seconds * 1000, size / seconds / 1e6))
+
+def benchDecode(data, number):
+  report('decode (BytesIO stream)', best(
+      lambda: BinaryCodec.createDecoder(io.BytesIO(data)).decode(sample.S3), number), len(data))
+  report('decode (bytes buffer)', best(
+      lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S3), number), len(data))
+  report('decode (lazy buffer)', best(
+      lambda: BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S3), number), len(data))
+
+  fd, path = tempfile.mkstemp(suffix='.dat')
+  try:
+    with os.fdopen(fd, 'wb') as fh:
+      fh.write(data)
+    def decodeFile():
+      with open(path, 'rb') as fh:
+        BinaryCodec.createDecoder(fh).decode(sample.S3)
+    def decodeMmap():
+      with open(path, 'rb') as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+          BinaryCodec.createBufferDecoder(mm).decode(sample.S3)
+    report('decode (file stream)', best(decodeFile, number), len(data))
+    report('decode (mmap buffer)', best(decodeMmap, number), len(data))
+  finally:
+    os.remove(path)
+
+def withoutGenerated(method, fn):
+  '''Call 'fn' with the generated method 'method' removed from the sample classes,
+     so that the generic encoder or decoder is used instead.'''
+  saved = {}
+  for cls in (sample.S1, sample.S2, sample.S3):
+    if method in vars(cls):
+      saved[cls] = vars(cls)[method]
+      delattr(cls, method)
+    cls.DESCRIPTOR._plans.clear()
+  try:
+    fn()
+  finally:
+    for cls in (sample.S1, sample.S2, sample.S3):
+      if cls in saved:
+        setattr(cls, method, saved[cls])
+      cls.DESCRIPTOR._plans.clear()
+
+def benchEncode(obj, number):
+  size = len(BinaryCodec.encodeToBytes(obj))
+  report('encode (BytesIO stream)', best(
+      lambda: obj.encode(BinaryCodec.createEncoder(io.BytesIO())), number), size)
+  report('encode (bytes)', best(
+      lambda: BinaryCodec.encodeToBytes(obj), number), size)
+  withoutGenerated('_writeFieldsBinary', lambda: report('encode (bytes, generic)', best(
+      lambda: BinaryCodec.encodeToBytes(obj), number), size))
+
+def benchFieldsReader(count, number):
+  '''Compare the generated _readFieldsBinary() methods against the generic decoder,
+     for structs containing only scalar fields.'''
+  s3 = sample.S3()
+  for i in range(count):
+    s1 = createS1(i)
+    for name in ('ListBoolean', 'ListInt', 'ListFloat', 'ListString', 'ListEnum',
+                 'SetInt', 'MapIntString', 'MapStringInt'):
+      getattr(s1, 'clear' + name)()
+    s3.getMutableSList().append(s1)
+  data = BinaryCodec.encodeToBytes(s3)
+  decode = lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S3)
+  report('decode scalars (generated)', best(decode, number), len(data))
+  withoutGenerated('_readFieldsBinary', lambda:
+      report('decode scalars (generic)', best(decode, number), len(data)))
+
+def benchProjection(count, number):
+  '''Decode a struct where the projected field holds about 10% of the bytes.'''
+  large = createLargeSample(count)
+  small = createS1(0)
+  small.getMutableListInt().extend(range(count * 6))
+  s2 = sample.S2()
+  s2.setLeft(small)
+  s2.setRight(large)
+  data = BinaryCodec.encodeToBytes(s2)
+  projected = len(BinaryCodec.encodeToBytes(small))
+  print('Projection: {0} of {1} bytes ({2:.0f}%)'.format(
+      projected, len(data), 100.0 * projected / len(data)))
+  report('decode all fields', best(
+      lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S2), number), len(data))
+  report('decode projected', best(
+      lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S2, fields=['left']),
+      number), len(data))
+  framed = BinaryCodec.encodeToBytes(s2, framed=True)
+  report('decode projected (framed)', best(
+      lambda: BinaryCodec.createBufferDecoder(framed).decode(sample.S2, fields=['left']),
+      number), len(framed))
+
+def benchPackedList(count, number):
+  values = [0.25 * i for i in range(count)]
+  unpacked = sample.S1()
+  unpacked.getMutableListFloat().extend(values)
+  packed = sample.S1()
+  packed.getMutableListFixedFloat().extend(values)
+  for name, obj in (('list[float]', unpacked), ('list[float] [fixed]', packed)):
+    data = BinaryCodec.encodeToBytes(obj)
+    report('decode ' + name, best(
+        lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S1), number), len(data))
+
+def benchStringTable(obj, number):
+  '''Compare the size and decoding time of the sample with and without a string table.'''
+  for name, stringTable in (('', False), (' (string table)', True)):
+    data = BinaryCodec.encodeToBytes(obj, stringTable=stringTable)
+    print('Encoded{0}: {1} bytes'.format(name, len(data)))
+    report('encode' + name, best(
+        lambda: BinaryCodec.encodeToBytes(obj, stringTable=stringTable), number), len(data))
+    report('decode' + name, best(
+        lambda: BinaryCodec.createBufferDecoder(data).decode(sample.S3), number), len(data))
+
+def benchBytesViews(size, number):
+  '''Compare decoding a large bytes field by copying it against returning a view.'''
+  data = BinaryCodec.encodeToBytes(sample.S1().setScalarBytes(bytes(size)))
+  for name, bytesViews in (('', False), (' (views)', True)):
+    report('decode bytes' + name, best(
+        lambda: BinaryCodec.createBufferDecoder(data, bytesViews=bytesViews).decode(sample.S1),
+        number), len(data))
+
+def benchDedup(count, number):
+  '''Time adding frozen structs, half of them duplicates, to a set.'''
+  objects = [createS1(i % (count // 2)).freeze() for i in range(count)]
+  def dedup():
+    return len(set(objects))
+  seconds = best(dedup, number)
+  print('{0:<32} {1:8.2f} ms'.format('dedup frozen structs', seconds * 1000))
+
+def benchClone(count, number):
+  '''Compare Object.clone() against copy.deepcopy() for a struct holding a list of
+     structs, half of them frozen.'''
+  s3 = sample.S3()
+  s3.getMutableSList().extend(createS1(i).freeze() if i % 2 else createS1(i)
+                              for i in range(count))
+  print('{0:<32} {1:8.2f} ms'.format('clone', best(s3.clone, number) * 1000))
+  print('{0:<32} {1:8.2f} ms'.format('deepcopy', best(lambda: copy.deepcopy(s3), number) * 1000))
+
+def benchArchive(count, number):
+  '''Compare reading the last record of an archive against scanning a record file.'''
+  records = io.BytesIO()
+  RecordWriter(records).writeAll(createS1(i) for i in range(count))
+  data = records.getvalue()
+  def scan():
+    for record in RecordReader(io.BytesIO(data), sample.S1):
+      pass
+  report('record file scan to last', best(scan, number), len(data))
+  stream = io.BytesIO()
+  with ArchiveWriter(stream) as writer:
+    writer.writeAll(createS1(i) for i in range(count))
+  archive = Archive(stream.getvalue(), sample.S1)
+  report('archive[-1]', best(lambda: archive[-1], number), len(data))
+
+def benchBlockFile(count, number):
+  '''Compare the size of a block file and the cost of reading one record from it, for
+     each compression method.'''
+  for compression in ('none', 'zlib', 'lzma'):
+    stream = io.BytesIO()
+    with BlockWriter(stream, compression) as writer:
+      writer.writeAll(createS1(i) for i in range(count))
+    data = stream.getvalue()
+    print('Block file ({0}): {1} bytes'.format(compression, len(data)))
+    def readOne():
+      BlockFile(data, sample.S1)[count // 2]
+    report('block file[n] ({0})'.format(compression), best(readOne, number), len(data))
+
+def benchParallel(count, number):
+  '''Compare decoding and encoding a record file in a single process against using
+     2, 4 and 8 worker processes.'''
+  fd, path = tempfile.mkstemp(suffix='.rec')
+  os.close(fd)
+  try:
+    with RecordWriter.open(path, append=False) as writer:
+      writer.writeAll(createS1(i) for i in range(count))
+    size = os.path.getsize(path)
+    def decodeSerial():
+      with RecordReader.open(path, sample.S1) as reader:
+        for record in reader:
+          pass
+    report('decode records (serial)', best(decodeSerial, number), size)
+    for workers in (2, 4, 8):
+      def decodeParallel():
+        for record in decodeAll(path, sample.S1, workers=workers, minParallelBytes=0):
+          pass
+      report('decode records ({0} workers)'.format(workers), best(decodeParallel, number), size)
+    objects = [createS1(i) for i in range(count)]
+    def encodeSerial():
+      with RecordWriter.open(path, append=False) as writer:
+        writer.writeAll(objects)
+    report('encode records (serial)', best(encodeSerial, number), size)
+    for workers in (2, 4, 8):
+      report('encode records ({0} workers)'.format(workers), best(
+          lambda: encodeAll(objects, path, workers=workers, minParallelObjects=0), number), size)
+  finally:
+    os.remove(path)
+
+def benchKeepTables(count, number):
+  '''Compare the size of a stream of records which refer to the same shared objects and
+     strings, with and without keeping the tables across records.'''
+  shared = [createS1(i) for i in range(10)]
+  objects = [sample.S4().setSharedLeft(shared[i % 10]).setSharedRight(shared[i * 7 % 10])
+             for i in range(count)]
+  for name, options in (('', {}), (' (keep tables)', {'keepTables': True, 'resetInterval': 100}),
+                        (' (keep tables, strings)',
+                         {'keepTables': True, 'resetInterval': 100, 'stringTable': True})):
+    stream = io.BytesIO()
+    RecordWriter(stream, **options).writeAll(objects)
+    data = stream.getvalue()
+    print('Record stream{0}: {1} bytes'.format(name, len(data)))
+    def decode():
+      for record in RecordReader(io.BytesIO(data), sample.S1):
+        pass
+    report('decode records' + name, best(decode, number), len(data))
+
+def main(argv=None):
+  if argv is None:
+    argv = sys.argv[1:]
+  count = int(argv[0]) if argv else 2000
+  number = 5
+  obj = createLargeSample(count)
+  data = encode(obj)
+  print('Sample: {0} structs, {1} bytes'.format(count, len(data)))
+  benchEncode(obj, number)
+  benchDecode(data, number)
+  benchFieldsReader(count * 5, number)
+  benchProjection(count, number)
+  benchPackedList(count * 100, number)
+  benchStringTable(obj, number)
+  benchBytesViews(count * 10000, number)
+  benchDedup(count * 10, number)
+  benchClone(count * 10, number)
+  benchArchive(count, number)
+  benchBlockFile(count, number)
+  benchKeepTables(count, number)
+  benchParallel(count * 10, number)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -10,4 +10,4 @@ datadir = this.parent.parent / 'data'
 loader = importlib.machinery.SourceFileLoader('sample', str(datadir / 'sample.py'))
 sample = loader.load_module()
 sampleTxt = datadir / 'sample.txt'
-sampleBin = datadir / 'sample.bin'
+sampleBin = datadir / 'sample.dat'
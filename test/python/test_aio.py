@@ -0,0 +1,94 @@
+'''Unit tests for asyncio record streams'''
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+from coda.io.aio import readRecords, writeRecords
+from coda.io.codec import EncodingError
+import finddata
+
+sample = finddata.sample
+
+def createRecord(i):
+  s1 = sample.S1()
+  s1.setScalarI32(i)
+  s1.setScalarString('record {0}'.format(i))
+  if i % 10:
+    s1.getMutableListInt().extend(range(i % 10))
+  return s1
+
+async def generateRecords(count):
+  for i in range(count):
+    yield createRecord(i)
+    await asyncio.sleep(0)
+
+class AioTest(unittest.TestCase):
+  def collect(self, startServer, connect, write):
+    '''Start a server with 'startServer' that reads records from each connection, then
+       connect to it with 'connect' and write records with 'write'.'''
+    async def run():
+      received = asyncio.get_running_loop().create_future()
+      async def handle(reader, writer):
+        try:
+          records = readRecords(reader, sample.S1, readSize=7)
+          received.set_result([record async for record in records])
+        except Exception as e:
+          received.set_exception(e)
+        writer.close()
+      server = await startServer(handle)
+      async with server:
+        reader, writer = await connect(server)
+        count = await write(writer)
+        writer.close()
+        await writer.wait_closed()
+        return count, await received
+    return asyncio.run(run())
+
+  def startTcp(self, handle):
+    return asyncio.start_server(handle, '127.0.0.1', 0)
+
+  def connectTcp(self, server):
+    return asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+
+  def testTcp(self):
+    count, records = self.collect(self.startTcp, self.connectTcp,
+        lambda writer: writeRecords(writer, (createRecord(i) for i in range(100))))
+    self.assertEqual(100, count)
+    self.assertEqual([createRecord(i) for i in range(100)], records)
+
+  def testAsyncIterable(self):
+    shared = createRecord(3)
+    objects = [sample.S4().setSharedLeft(shared).setSharedRight(createRecord(i))
+               for i in range(20)]
+    async def generate():
+      for obj in objects:
+        yield obj
+    count, records = self.collect(self.startTcp, self.connectTcp,
+        lambda writer: writeRecords(writer, generate(), keepTables=True, resetInterval=8))
+    self.assertEqual(20, count)
+    self.assertEqual(objects, records)
+    self.assertIs(records[0].getSharedLeft(), records[7].getSharedLeft())
+
+  @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Requires Unix sockets')
+  def testUnixSocket(self):
+    path = os.path.join(tempfile.mkdtemp(), 'records.sock')
+    self.addCleanup(os.rmdir, os.path.dirname(path))
+    self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+    count, records = self.collect(
+        lambda handle: asyncio.start_unix_server(handle, path),
+        lambda server: asyncio.open_unix_connection(path),
+        lambda writer: writeRecords(writer, generateRecords(30)))
+    self.assertEqual(30, count)
+    self.assertEqual([createRecord(i) for i in range(30)], records)
+
+  def testTruncatedStream(self):
+    async def write(writer):
+      await writeRecords(writer, [createRecord(1)])
+      writer.write(b'\x20\x01')
+      return 1
+    with self.assertRaises(EncodingError):
+      self.collect(self.startTcp, self.connectTcp, write)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,117 @@
+'''Unit tests for CODA indexed archives'''
+import io
+import os
+import tempfile
+import unittest
+from coda.io.archive import Archive, ArchiveWriter
+from coda.io.binarycodec import BinaryCodec
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordReader
+import finddata
+
+sample = finddata.sample
+
+def createRecord(i):
+  s1 = sample.S1()
+  s1.setScalarI32(i - 10)
+  s1.setScalarString('record {0}'.format(i))
+  if i > 0:
+    s1.getMutableListInt().extend(range(i))
+  return s1
+
+def createArchive(count, keyField=None):
+  stream = io.BytesIO()
+  ArchiveWriter(stream, keyField).writeAll(createRecord(i) for i in range(count)).close()
+  return stream.getvalue()
+
+class ArchiveTest(unittest.TestCase):
+  def testRandomAccess(self):
+    archive = Archive(createArchive(50), sample.S1)
+    self.assertEqual(50, len(archive))
+    self.assertEqual(createRecord(17), archive[17])
+    self.assertEqual(createRecord(0), archive[0])
+    self.assertEqual(createRecord(49), archive[-1])
+    with self.assertRaises(IndexError):
+      archive[50]
+    self.assertEqual([createRecord(i) for i in range(50)], list(archive))
+
+  def testRecordsAreRecordFile(self):
+    # The records can also be read sequentially, up to the start of the index.
+    data = createArchive(5)
+    reader = RecordReader(io.BytesIO(data), sample.S1)
+    self.assertEqual([createRecord(i) for i in range(5)], [reader.read() for _ in range(5)])
+
+  def testLookupIntegerKey(self):
+    archive = Archive(createArchive(30, keyField='scalarI32'), sample.S1)
+    self.assertEqual(createRecord(3), archive.lookup(-7))
+    self.assertEqual(createRecord(29), archive.lookup(19))
+    self.assertEqual(12, archive.indexOf(2))
+    with self.assertRaises(KeyError):
+      archive.lookup(20)
+
+  def testLookupStringKey(self):
+    archive = Archive(createArchive(30, keyField='scalarString'), sample.S1)
+    self.assertEqual(createRecord(21), archive.lookup('record 21'))
+    self.assertEqual(30, len(archive.keys()))
+    with self.assertRaises(KeyError):
+      archive.lookup('record 30')
+
+  def testUnknownKeyField(self):
+    with self.assertRaises(AssertionError):
+      ArchiveWriter(io.BytesIO(), 'scalarI33').write(createRecord(0))
+
+  def testRecordsWithoutKey(self):
+    stream = io.BytesIO()
+    with ArchiveWriter(stream, keyField='scalarString') as writer:
+      writer.write(createRecord(1))
+      writer.write(sample.S1())
+      with self.assertRaises(EncodingError):
+        writer.write(createRecord(1))
+    archive = Archive(stream.getvalue(), sample.S1)
+    self.assertEqual(2, len(archive))
+    self.assertEqual(sample.S1(), archive[1])
+    self.assertEqual([0], [archive.indexOf(key) for key in archive.keys()])
+
+  def testEmptyArchive(self):
+    archive = Archive(createArchive(0, keyField='scalarI32'), sample.S1)
+    self.assertEqual(0, len(archive))
+    self.assertEqual([], list(archive))
+    with self.assertRaises(KeyError):
+      archive.lookup(1)
+
+  def testNotAnArchive(self):
+    with self.assertRaises(EncodingError):
+      Archive(b'', sample.S1)
+    with self.assertRaises(EncodingError):
+      Archive(createArchive(3)[:-1], sample.S1)
+
+  def testOpenFile(self):
+    fd, path = tempfile.mkstemp(suffix='.arc')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    with ArchiveWriter.open(path, keyField='scalarI32', framed=True) as writer:
+      writer.writeAll(createRecord(i) for i in range(100))
+    with Archive.open(path, sample.S1) as archive:
+      self.assertEqual(100, len(archive))
+      self.assertEqual(createRecord(42), archive[42])
+      self.assertEqual(createRecord(99), archive.lookup(89))
+
+  def testLazyRecords(self):
+    archive = Archive(createArchive(10), sample.S1, lazy=True)
+    self.assertEqual(list(range(7)), archive[7].getListInt())
+
+  def testCloseWithLazyRecords(self):
+    fd, path = tempfile.mkstemp(suffix='.arc')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    with ArchiveWriter.open(path) as writer:
+      writer.writeAll(createRecord(i) for i in range(10))
+    with Archive.open(path, sample.S1, lazy=True) as archive:
+      record = archive[7]
+      data = archive.getRecord(3)
+    # The file stays mapped while they refer to it.
+    self.assertEqual(list(range(7)), record.getListInt())
+    self.assertEqual(createRecord(3), BinaryCodec.createBufferDecoder(data).decode(sample.S1))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -2,8 +2,13 @@
 import io
 import unittest
 from coda import descriptors
-from coda.io.binarycodec import BinaryCodec
+from coda.io.binarycodec import BinaryCodec, BinaryDecoder, DataType
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordWriter, encodeLength
+from coda import types
+from coda.runtime import descdata, LazyValue
 from coda.runtime.descdata import BoolValue
+import finddata
 
 class BinaryCodecTest(unittest.TestCase):
   def setUp(self):
@@ -32,3 +37,530 @@ class BinaryCodecTest(unittest.TestCase):
     st = decoder.decode(descriptors.StructType)
     self.assertIsInstance(st, descriptors.StructType)
     self.assertEqual(st.getFullName(), descriptors.StructType.DESCRIPTOR.getFullName())
+
+  def testDecodeSampleFromBuffer(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    for buffer in (data, bytearray(data), memoryview(data)):
+      decoder = BinaryCodec.createBufferDecoder(buffer)
+      result = decoder.decode(sample.S2)
+      self.assertIsInstance(result, sample.S2)
+      s1 = result.getLeft()
+      self.assertEqual(15, s1.getScalarFixedI32())
+      self.assertEqual("alpha\n\t", s1.getScalarString())
+      self.assertEqual(b"beta", s1.getScalarBytes())
+      self.assertListEqual([True, False, True], s1.getListBoolean())
+      self.assertListEqual(['beta', 'delta\0', 'yin-yan: ☯'], s1.getListString())
+      self.assertListEqual([120, 121, 122], s1.getListFixedInt())
+      self.assertListEqual([130.0, 130.5, 131.0], s1.getListFixedFloat())
+      self.assertEqual(2, len(result.getRight().getSList()))
+
+  def testBufferDecoderMatchesStreamDecoder(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    fromStream = BinaryCodec.createDecoder(io.BytesIO(data)).decode(sample.S2)
+    fromBuffer = BinaryCodec.createBufferDecoder(data).decode(sample.S2)
+    self.assertEqual(fromStream, fromBuffer)
+
+  def testEncodeToBytes(self):
+    st = descriptors.StructType.DESCRIPTOR
+    encoder = BinaryCodec.createEncoder(self.buffer)
+    st.encode(encoder)
+    self.assertEqual(self.buffer.getvalue(), BinaryCodec.encodeToBytes(st))
+
+  def testEncoderFlushThreshold(self):
+    st = descriptors.StructType.DESCRIPTOR
+    expected = BinaryCodec.encodeToBytes(st)
+    encoder = BinaryCodec.createEncoder(self.buffer, flushThreshold=16)
+    encoder.fileBegin()
+    st.writeFields(encoder)
+    # Completed structs larger than the threshold have already been written out.
+    self.assertGreater(len(self.buffer.getvalue()), 0)
+    self.assertLess(len(self.buffer.getvalue()), len(expected))
+    encoder.fileEnd()
+    self.assertEqual(expected, self.buffer.getvalue())
+
+  def testPackedList(self):
+    sample = finddata.sample
+    source = sample.S1()
+    source.getMutableListFixedInt().extend(range(1000))
+    source.getMutableListFixedFloat().extend([0.5 * i for i in range(1000)])
+    data = BinaryCodec.encodeToBytes(source)
+    # Field header, element type, 2-byte length and 4 bytes per element, for each list.
+    # The first field id doesn't fit in the header byte, so is followed by a varint.
+    self.assertEqual((2 + 1 + 2 + 4000) + (1 + 1 + 2 + 4000), len(data))
+    self.assertEqual(DataType.PLIST, data[0])
+    self.assertEqual(25, data[1])
+    self.assertEqual(DataType.FIXED32, data[2])
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S1)
+      self.assertListEqual(list(range(1000)), result.getListFixedInt())
+      self.assertListEqual([0.5 * i for i in range(1000)], result.getListFixedFloat())
+
+  def testPackedListRange(self):
+    sample = finddata.sample
+    source = sample.S1()
+    source.getMutableListFixedInt().extend([1, -1])
+    with self.assertRaises(EncodingError) as cm:
+      BinaryCodec.encodeToBytes(source)
+    self.assertIn('listFixedInt', cm.exception.msg())
+
+  def testGeneratedFieldsReader(self):
+    sample = finddata.sample
+    self.assertIn('_readFieldsBinary', vars(sample.S1))
+    source = sample.S1()
+    source.setScalarBoolean(False)
+    source.setScalarI16(-3)
+    source.setScalarI32(1)
+    source.setScalarI64(-(1 << 40))
+    source.setScalarFixedI32(15)
+    source.setScalarDouble(56.5)
+    source.setScalarString('yin-yan: ☯')
+    source.setScalarBytes(b'beta')
+    # A list field in the middle is read by the generic decoder.
+    source.getMutableListInt().extend([1, 2, 3])
+    source.setScalarEnum(sample.E.E2)
+    data = BinaryCodec.encodeToBytes(source)
+    result = BinaryCodec.createBufferDecoder(data).decode(sample.S1)
+    self.assertEqual(source, result)
+    self.assertFalse(result.hasScalarFloat())
+    self.assertTrue(result.hasScalarBoolean())
+    self.assertEqual(-(1 << 40), result.getScalarI64())
+
+    with self.assertRaises(EncodingError):
+      BinaryCodec.createBufferDecoder(data[:12]).decode(sample.S1)
+
+  def testGeneratedFieldsWriter(self):
+    sample = finddata.sample
+    self.assertIn('_writeFieldsBinary', vars(sample.S1))
+
+    def encodeGeneric(obj):
+      encoder = BinaryCodec.createEncoder(None)
+      encoder.fileBegin()
+      obj._writeFields(encoder)
+      return encoder.getBytes()
+
+    s1 = sample.S1()
+    s1.setScalarBoolean(True)
+    s1.setScalarI16(0)
+    s1.setScalarI32(-1000)
+    s1.setScalarI64(1 << 40)
+    s1.setScalarFixedI16(1)
+    s1.setScalarFixedI32(15)
+    s1.setScalarFloat(55.5)
+    s1.setScalarDouble(-56.0)
+    s1.setScalarString('yin-yan: ☯' * 20)
+    s1.setScalarBytes(b'beta')
+    s1.getMutableListInt().extend([1, 2, 3])
+    s1.getMutableListFixedFloat().extend([0.5, 1.5])
+    s1.setUnused(7)
+    s3 = sample.S3()
+    s3.getMutableSList().extend([s1, sample.S1()])
+    for obj in (s1, s3):
+      data = BinaryCodec.encodeToBytes(obj)
+      self.assertEqual(encodeGeneric(obj), data)
+      self.assertEqual(obj, BinaryCodec.createBufferDecoder(data).decode(type(obj)))
+    s3.setScalarString('base')
+    self.assertEqual(encodeGeneric(s3), BinaryCodec.encodeToBytes(s3))
+
+    # Base class fields are written after subclass fields, and must not go backwards.
+    s2 = sample.S2()
+    s2.setLeft(sample.S1())
+    s2.setScalarBoolean(True)
+    with self.assertRaises(EncodingError):
+      encodeGeneric(s2)
+    with self.assertRaises(EncodingError):
+      BinaryCodec.encodeToBytes(s2)
+
+  def hideFields(self, struct, *fieldIds):
+    '''Make the binary decoder treat the given fields of 'struct' as unknown, as a
+       reader built from an older version of the schema would.'''
+    plan = dict(BinaryDecoder.buildPlan(struct))
+    for fid in fieldIds:
+      del plan[fid]
+    struct._plans[BinaryDecoder] = plan
+    self.addCleanup(struct._plans.clear)
+
+  def testSkipUnknownFields(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    expected = BinaryCodec.createBufferDecoder(data).decode(sample.S2)
+    # Field 'left' holds an S1 with every kind of value, including maps of structs
+    # and subtypes.
+    self.hideFields(sample.S2.DESCRIPTOR, 1)
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S2)
+      self.assertFalse(result.hasLeft())
+      self.assertEqual(expected.getRight(), result.getRight())
+
+  def testSkipUnknownSharedStruct(self):
+    Field = descriptors.StructType.Field
+    options = descdata.FieldOptions()
+    options.setNullable(True)
+    listType = types.ListType().setElementType(types.IntegerType().setBits(32))
+    st = descriptors.StructType().setName('Test')
+    st.getMutableFields().extend([
+        Field().setName('a').setId(1).setOptions(options),
+        Field().setName('b').setId(2).setType(listType),
+        Field().setName('c').setId(3).setType(listType),
+    ])
+    data = BinaryCodec.encodeToBytes(st)
+    # The skipped options struct still takes up a shared object index, so the
+    # reference to the list type in field 'c' resolves to the right object.
+    self.hideFields(Field.DESCRIPTOR, 4)
+    result = BinaryCodec.createBufferDecoder(data).decode(descriptors.StructType)
+    a, b, c = result.getFields()
+    self.assertFalse(a.hasOptions())
+    self.assertEqual(32, b.getType().getElementType().getBits())
+    self.assertIs(b.getType(), c.getType())
+
+  def testDecodeProjection(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S2, fields=['left'])
+      self.assertFalse(result.hasRight())
+      self.assertEqual("alpha\n\t", result.getLeft().getScalarString())
+      self.assertListEqual([100, 101, 102], result.getLeft().getListInt())
+
+  def testDecodeNestedProjection(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S2, fields={
+          'left': ['scalarString', 'listInt'],
+          'right': {'sList': []}})
+      left = result.getLeft()
+      self.assertEqual("alpha\n\t", left.getScalarString())
+      self.assertListEqual([100, 101, 102], left.getListInt())
+      self.assertFalse(left.hasScalarI32())
+      self.assertEqual(0, len(left.getListFloat()))
+      self.assertEqual(0, len(left.getMapEnumStruct()))
+      sList = result.getRight().getSList()
+      self.assertEqual(2, len(sList))
+      self.assertIsInstance(sList[1], sample.S2)
+
+  def testDecodeProjectionUnknownField(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    # Fields of base types and of other subtypes in the hierarchy are allowed.
+    result = BinaryCodec.createBufferDecoder(data).decode(
+        sample.S2, fields=['left', 'scalarString', 'sharedLeft'])
+    self.assertEqual("alpha\n\t", result.getLeft().getScalarString())
+    with self.assertRaisesRegex(AssertionError, 'Class S1 has no field leftt'):
+      BinaryCodec.createBufferDecoder(data).decode(sample.S2, fields=['leftt'])
+    with self.assertRaisesRegex(AssertionError, 'Class S1 has no field bogus'):
+      BinaryCodec.createBufferDecoder(data).decode(sample.S2, fields={'left': ['bogus']})
+
+  def testLazyDecode(self):
+    sample = finddata.sample
+    data = finddata.sampleBin.read_bytes()
+    expected = BinaryCodec.createBufferDecoder(data).decode(sample.S2)
+    result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S2)
+    self.assertIsInstance(result._right, LazyValue)
+    self.assertEqual("alpha\n\t", result.getLeft().getScalarString())
+    self.assertIsInstance(result._right, LazyValue)
+    self.assertEqual(expected.getRight(), result.getRight())
+    self.assertEqual(expected, result)
+    # Deferred fields are loaded when encoding.
+    result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S2)
+    encoded = BinaryCodec.encodeToBytes(result)
+    self.assertEqual(expected, BinaryCodec.createBufferDecoder(encoded).decode(sample.S2))
+
+  def testLazyDecodeSharedReferences(self):
+    sample = finddata.sample
+    a = sample.S1().setScalarString('a')
+    b = sample.S1().setScalarString('b')
+    source = sample.S4()
+    source.setSharedLeft(a)
+    source.setSharedRight(a)
+    source.setSharedList([b, a])
+    data = BinaryCodec.encodeToBytes(source)
+
+    # The reference in 'sharedRight' is to a struct in a field that was deferred.
+    result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S4)
+    self.assertIsInstance(result._sharedLeft, LazyValue)
+    self.assertEqual('a', result.getSharedRight().getScalarString())
+    self.assertIs(result.getSharedRight(), result.getSharedLeft())
+    self.assertEqual('b', result.getSharedList()[0].getScalarString())
+    self.assertIs(result.getSharedLeft(), result.getSharedList()[1])
+
+    # Loading the list first resolves its reference into the deferred 'sharedLeft'.
+    result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S4)
+    b2, a2 = result.getSharedList()
+    self.assertIsInstance(result._sharedLeft, LazyValue)
+    self.assertIs(a2, result.getSharedLeft())
+    self.assertIs(a2, result.getSharedRight())
+    self.assertEqual(source, result)
+
+  def testFramedFormat(self):
+    sample = finddata.sample
+    expected = BinaryCodec.createBufferDecoder(finddata.sampleBin.read_bytes()).decode(sample.S2)
+    data = BinaryCodec.encodeToBytes(expected, framed=True)
+    self.assertEqual(bytes([DataType.FORMAT, 1]), data[:2])
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data),
+        BinaryCodec.createBufferDecoder(data, lazy=True)):
+      self.assertEqual(expected, decoder.decode(sample.S2))
+
+  def testFramedSkip(self):
+    sample = finddata.sample
+    expected = BinaryCodec.createBufferDecoder(finddata.sampleBin.read_bytes()).decode(sample.S2)
+    data = BinaryCodec.encodeToBytes(expected, framed=True)
+    self.hideFields(sample.S2.DESCRIPTOR, 1)
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S2)
+      self.assertFalse(result.hasLeft())
+      self.assertEqual(expected.getRight(), result.getRight())
+
+  def testFramedSkipSharedStructs(self):
+    sample = finddata.sample
+    a = sample.S1().setScalarString('a')
+    b = sample.S1().setScalarString('b')
+    c = sample.S1().setScalarString('c')
+    source = sample.S2().setLeft(sample.S4().setSharedLeft(a).setSharedList([b]))
+
+    # Lazy decoding still locates the shared structs within a skipped frame.
+    source.setRight(sample.S4().setSharedLeft(a).setSharedRight(b))
+    data = BinaryCodec.encodeToBytes(source, framed=True)
+    result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S2)
+    right = result.getRight()
+    self.assertEqual('b', right.getSharedRight().getScalarString())
+    self.assertIs(right.getSharedLeft(), result.getLeft().getSharedLeft())
+
+    # Skipping 'left' reserves the indices of the shared structs within it.
+    source.setRight(sample.S4().setSharedLeft(c).setSharedRight(c))
+    data = BinaryCodec.encodeToBytes(source, framed=True)
+    self.hideFields(sample.S2.DESCRIPTOR, 1)
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      right = decoder.decode(sample.S2).getRight()
+      self.assertEqual('c', right.getSharedLeft().getScalarString())
+      self.assertIs(right.getSharedLeft(), right.getSharedRight())
+
+  def createRepeatedStrings(self, count):
+    sample = finddata.sample
+    s3 = sample.S3()
+    for i in range(count):
+      s1 = sample.S1().setScalarString('/src/module/file.coda').setScalarBytes(b'identifier')
+      s1.getMutableListString().extend(['identifier', 'type name', 'identifier'])
+      s1.getMutableMapStringInt()['key {0}'.format(i % 3)] = i
+      s3.getMutableSList().append(s1)
+    return s3
+
+  def testStringTable(self):
+    sample = finddata.sample
+    expected = BinaryCodec.createBufferDecoder(finddata.sampleBin.read_bytes()).decode(sample.S2)
+    data = BinaryCodec.encodeToBytes(expected, stringTable=True)
+    self.assertEqual(bytes([DataType.FORMAT, 2]), data[:2])
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data),
+        BinaryCodec.createBufferDecoder(data, lazy=True)):
+      self.assertEqual(expected, decoder.decode(sample.S2))
+
+  def testStringTableRepeatedStrings(self):
+    sample = finddata.sample
+    source = self.createRepeatedStrings(50)
+    data = BinaryCodec.encodeToBytes(source, stringTable=True)
+    self.assertLess(len(data), len(BinaryCodec.encodeToBytes(source)) / 2)
+    for decoder in (
+        BinaryCodec.createDecoder(io.BytesIO(data)),
+        BinaryCodec.createBufferDecoder(data)):
+      result = decoder.decode(sample.S3)
+      self.assertEqual(source, result)
+      first, last = result.getSList()[0], result.getSList()[-1]
+      # Repeated strings are the same object.
+      self.assertIs(first.getScalarString(), last.getScalarString())
+      self.assertIs(first.getListString()[0], last.getListString()[2])
+      self.assertIs(first.getListString()[0], last.getListString()[0])
+      self.assertEqual(b'identifier', last.getScalarBytes())
+
+  def testStringTableSkip(self):
+    # Skipped fields still define string table entries used by later fields.
+    sample = finddata.sample
+    source = sample.S2().setLeft(self.createRepeatedStrings(1).getSList()[0])
+    source.setRight(self.createRepeatedStrings(2).getSList()[1])
+    for framed in (False, True):
+      data = BinaryCodec.encodeToBytes(source, framed=framed, stringTable=True)
+      right = BinaryCodec.createBufferDecoder(data).decode(sample.S2, fields=['right']).getRight()
+      self.assertEqual(source.getRight(), right)
+      result = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S2)
+      self.assertEqual(source.getRight(), result.getRight())
+      self.assertEqual(source.getLeft(), result.getLeft())
+      self.assertIs(result.getLeft().getScalarString(), result.getRight().getScalarString())
+    self.hideFields(sample.S2.DESCRIPTOR, 1)
+    for framed in (False, True):
+      data = BinaryCodec.encodeToBytes(source, framed=framed, stringTable=True)
+      for decoder in (
+          BinaryCodec.createDecoder(io.BytesIO(data)),
+          BinaryCodec.createBufferDecoder(data)):
+        result = decoder.decode(sample.S2)
+        self.assertFalse(result.hasLeft())
+        self.assertEqual(source.getRight(), result.getRight())
+
+  def testBytesViews(self):
+    sample = finddata.sample
+    source = sample.S1().setScalarBytes(b'\x00\x01blob' * 100).setScalarString('text')
+    data = BinaryCodec.encodeToBytes(sample.S2().setLeft(source))
+    buffer = bytearray(data)
+    for fields, lazy in ((None, False), (None, True), (['left'], False)):
+      result = BinaryCodec.createBufferDecoder(
+          buffer, lazy=lazy, bytesViews=True).decode(sample.S2, fields=fields)
+      value = result.getLeft().getScalarBytes()
+      self.assertIsInstance(value, memoryview)
+      self.assertTrue(value.readonly)
+      self.assertEqual(source.getScalarBytes(), value)
+      self.assertEqual(source, result.getLeft())
+      self.assertTrue(types.BytesType().isAssignable(value))
+      # Re-encoding a view writes the same data.
+      self.assertEqual(data, BinaryCodec.encodeToBytes(result))
+      # The view refers to the buffer, so the buffer cannot be resized.
+      with self.assertRaises(BufferError):
+        buffer.append(0)
+      result.freeze()
+      self.assertIs(bytes, type(result.getLeft().getScalarBytes()))
+      del value
+      buffer.append(0)
+      buffer.pop()
+    # Views of a read-only buffer hash like bytes.
+    result = BinaryCodec.createBufferDecoder(data, bytesViews=True).decode(sample.S2)
+    value = result.getLeft().getScalarBytes()
+    self.assertIsInstance(value, memoryview)
+    self.assertEqual(hash(source.getScalarBytes()), hash(value))
+    result = BinaryCodec.createBufferDecoder(data).decode(sample.S2)
+    self.assertIs(bytes, type(result.getLeft().getScalarBytes()))
+
+class PushDecoderTest(unittest.TestCase):
+  def createStream(self, records, **options):
+    stream = io.BytesIO()
+    RecordWriter(stream, **options).writeAll(records)
+    return stream.getvalue()
+
+  def createRecord(self, i):
+    s1 = finddata.sample.S1()
+    s1.setScalarI32(i)
+    s1.setScalarString('record {0}'.format(i))
+    if i > 0:
+      s1.getMutableListInt().extend(range(i))
+    return s1
+
+  def decodePieces(self, decoder, data, size):
+    result = []
+    for pos in range(0, len(data), size):
+      result.extend(decoder.feed(data[pos:pos + size]).objects())
+    decoder.close()
+    return result
+
+  def testFeedOneByteAtATime(self):
+    sample = finddata.sample
+    expected = BinaryCodec.createBufferDecoder(finddata.sampleBin.read_bytes()).decode(sample.S2)
+    for options in ({}, {'framed': True}, {'stringTable': True},
+        {'framed': True, 'stringTable': True}):
+      data = self.createStream([expected], **options)
+      decoder = BinaryCodec.createPushDecoder(sample.S2)
+      # Nothing is returned until the last byte of the record has been fed.
+      for pos in range(len(data) - 1):
+        self.assertEqual([], list(decoder.feed(data[pos:pos + 1]).objects()))
+      self.assertEqual([expected], list(decoder.feed(data[-1:]).objects()))
+      decoder.close()
+
+  def testFeedPieces(self):
+    records = [self.createRecord(i) for i in range(10)]
+    data = self.createStream(records)
+    for size in (1, 3, 17, len(data)):
+      decoder = BinaryCodec.createPushDecoder(finddata.sample.S1)
+      self.assertEqual(records, self.decodePieces(decoder, data, size))
+
+  def testPartialRecord(self):
+    data = self.createStream([self.createRecord(i) for i in range(3)])
+    decoder = BinaryCodec.createPushDecoder(finddata.sample.S1)
+    decoder.feed(data[:-2])
+    self.assertEqual([self.createRecord(0), self.createRecord(1)], list(decoder.objects()))
+    self.assertEqual([], list(decoder.objects()))
+    with self.assertRaises(EncodingError):
+      decoder.close()
+    decoder.feed(data[-2:])
+    self.assertEqual([self.createRecord(2)], list(decoder.objects()))
+    decoder.close()
+
+  def testTruncatedRecord(self):
+    data = BinaryCodec.encodeToBytes(self.createRecord(3))
+    # The record is one byte shorter than the object in it.
+    data = encodeLength(len(data) - 1) + data + encodeLength(0)
+    decoder = BinaryCodec.createPushDecoder(finddata.sample.S1)
+    with self.assertRaisesRegex(EncodingError, 'Unexpected end of record'):
+      self.decodePieces(decoder, data, 1)
+
+  def testKeepTables(self):
+    sample = finddata.sample
+    shared = self.createRecord(5)
+    records = [sample.S4().setSharedLeft(shared).setSharedRight(self.createRecord(i))
+               for i in range(6)]
+    data = self.createStream(records, stringTable=True, keepTables=True, resetInterval=4)
+    decoder = BinaryCodec.createPushDecoder(sample.S1)
+    decoded = self.decodePieces(decoder, data, 5)
+    self.assertEqual(records, decoded)
+    self.assertIs(decoded[0].getSharedLeft(), decoded[3].getSharedLeft())
+    self.assertIsNot(decoded[0].getSharedLeft(), decoded[4].getSharedLeft())
+
+  def testEmptyRecords(self):
+    sample = finddata.sample
+    data = self.createStream([sample.S1(), sample.S1()])
+    decoder = BinaryCodec.createPushDecoder(sample.S1).feed(data)
+    self.assertEqual([sample.S1(), sample.S1()], list(decoder.objects()))
+
+  def testSkipUnknownFields(self):
+    sample = finddata.sample
+    a = sample.S1().setScalarString('a')
+    b = sample.S1().setScalarString('b')
+    c = sample.S1().setScalarString('c')
+    source = sample.S2().setLeft(sample.S4().setSharedLeft(a).setSharedList([b]))
+    source.setRight(sample.S4().setSharedLeft(c).setSharedRight(c))
+    # Skipping 'left' reserves the indices of the shared structs within it.
+    BinaryCodecTest.hideFields(self, sample.S2.DESCRIPTOR, 1)
+    for options in ({}, {'framed': True}, {'stringTable': True},
+        {'framed': True, 'stringTable': True}):
+      data = self.createStream([source], **options)
+      decoder = BinaryCodec.createPushDecoder(sample.S2)
+      result, = self.decodePieces(decoder, data, 1)
+      self.assertFalse(result.hasLeft())
+      right = result.getRight()
+      self.assertEqual('c', right.getSharedLeft().getScalarString())
+      self.assertIs(right.getSharedLeft(), right.getSharedRight())
+
+  def testProjection(self):
+    sample = finddata.sample
+    expected = BinaryCodec.createBufferDecoder(finddata.sampleBin.read_bytes()).decode(sample.S2)
+    data = self.createStream([expected, expected])
+    decoder = BinaryCodec.createPushDecoder(sample.S2, fields={
+        'left': ['scalarString', 'listInt'],
+        'right': {'sList': []}})
+    for result in self.decodePieces(decoder, data, 7):
+      left = result.getLeft()
+      self.assertEqual("alpha\n\t", left.getScalarString())
+      self.assertListEqual([100, 101, 102], left.getListInt())
+      self.assertFalse(left.hasScalarI32())
+      self.assertEqual(0, len(left.getMapEnumStruct()))
+      self.assertEqual(2, len(result.getRight().getSList()))
+
+  def testDescriptors(self):
+    data = self.createStream([descriptors.StructType.DESCRIPTOR])
+    decoder = BinaryCodec.createPushDecoder(descriptors.StructType)
+    st, = self.decodePieces(decoder, data, 1)
+    self.assertEqual(st.getFullName(), descriptors.StructType.DESCRIPTOR.getFullName())
+    self.assertEqual(
+        [f.getName() for f in descriptors.StructType.DESCRIPTOR.getFields()],
+        [f.getName() for f in st.getFields()])
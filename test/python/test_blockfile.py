@@ -0,0 +1,101 @@
+'''Unit tests for CODA block-compressed record files'''
+import io
+import os
+import tempfile
+import unittest
+from coda.io.binarycodec import BinaryCodec
+from coda.io.blockfile import BlockFile, BlockWriter
+from coda.io.codec import EncodingError
+import finddata
+
+sample = finddata.sample
+
+def createRecord(i):
+  s1 = sample.S1()
+  s1.setScalarI32(i)
+  s1.setScalarString('record {0}'.format(i))
+  if i % 20:
+    s1.getMutableListInt().extend(range(i % 20))
+  return s1
+
+def createBlockFile(count, compression='zlib', blockSize=1024):
+  stream = io.BytesIO()
+  BlockWriter(stream, compression, blockSize).writeAll(
+      createRecord(i) for i in range(count)).close()
+  return stream.getvalue()
+
+class BlockFileTest(unittest.TestCase):
+  def testRandomAccess(self):
+    for compression in ('none', 'zlib', 'lzma'):
+      blockFile = BlockFile(createBlockFile(200, compression), sample.S1)
+      self.assertEqual(compression, blockFile.getCompression())
+      self.assertEqual(200, len(blockFile))
+      self.assertGreater(blockFile.getBlockCount(), 1)
+      self.assertEqual(createRecord(123), blockFile[123])
+      self.assertEqual(createRecord(0), blockFile[0])
+      self.assertEqual(createRecord(199), blockFile[-1])
+      self.assertEqual(createRecord(1), blockFile[1])
+      with self.assertRaises(IndexError):
+        blockFile[200]
+      self.assertEqual([createRecord(i) for i in range(200)], list(blockFile))
+
+  def testCompresses(self):
+    uncompressed = createBlockFile(200, 'none')
+    self.assertLess(len(createBlockFile(200, 'zlib')), len(uncompressed) / 2)
+    self.assertLess(len(createBlockFile(200, 'lzma')), len(uncompressed) / 2)
+
+  def testEmptyRecords(self):
+    stream = io.BytesIO()
+    with BlockWriter(stream) as writer:
+      writer.write(sample.S1())
+      writer.flushBlock()
+      writer.write(createRecord(3))
+    blockFile = BlockFile(stream.getvalue(), sample.S1)
+    self.assertEqual(2, blockFile.getBlockCount())
+    self.assertEqual([sample.S1(), createRecord(3)], list(blockFile))
+
+  def testEmptyFile(self):
+    blockFile = BlockFile(createBlockFile(0), sample.S1)
+    self.assertEqual(0, len(blockFile))
+    self.assertEqual(0, blockFile.getBlockCount())
+    self.assertEqual([], list(blockFile))
+
+  def testFramedRecords(self):
+    stream = io.BytesIO()
+    BlockWriter(stream, framed=True).writeAll(createRecord(i) for i in range(10)).close()
+    self.assertEqual([createRecord(i) for i in range(10)],
+                     list(BlockFile(stream.getvalue(), sample.S1)))
+
+  def testInvalid(self):
+    with self.assertRaises(ValueError):
+      BlockWriter(io.BytesIO(), 'snappy')
+    with self.assertRaises(EncodingError):
+      BlockFile(b'not a block file' * 4, sample.S1)
+    data = bytearray(createBlockFile(50, blockSize=100000))
+    data[20] ^= 0xff
+    blockFile = BlockFile(data, sample.S1)
+    with self.assertRaises(EncodingError):
+      blockFile[0]
+
+  def testOpenFile(self):
+    fd, path = tempfile.mkstemp(suffix='.blk')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    with BlockWriter.open(path, 'lzma', blockSize=512) as writer:
+      writer.writeAll(createRecord(i) for i in range(30))
+    with BlockFile.open(path, sample.S1) as blockFile:
+      self.assertEqual(createRecord(29), blockFile[29])
+      self.assertEqual(createRecord(7), blockFile[7])
+
+  def testCloseWithRecords(self):
+    fd, path = tempfile.mkstemp(suffix='.blk')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    with BlockWriter.open(path, 'none', blockSize=512) as writer:
+      writer.writeAll(createRecord(i) for i in range(30))
+    with BlockFile.open(path, sample.S1) as blockFile:
+      data = blockFile.getRecord(7)
+    self.assertEqual(createRecord(7), BinaryCodec.createBufferDecoder(data).decode(sample.S1))
+
+if __name__ == '__main__':
+  unittest.main()
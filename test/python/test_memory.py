@@ -0,0 +1,68 @@
+'''Unit tests for CODA memory footprint reports'''
+import sys
+import unittest
+from coda.runtime import FrozenDict, Object
+from coda.runtime.memory import PRESENT, measure
+import finddata
+
+sample = finddata.sample
+
+def createS1(i):
+  s1 = sample.S1()
+  s1.setScalarI32(1000 + i)
+  s1.setScalarString('record {0}'.format(i))
+  s1.getMutableListInt().extend(range(1000, 1000 + i))
+  s1.getMutableMapIntString()[1000 + i] = 'value {0}'.format(i)
+  return s1
+
+class MemoryTest(unittest.TestCase):
+  def testMeasure(self):
+    s3 = sample.S3()
+    s3.getMutableSList().extend(createS1(i) for i in range(10))
+    report = measure(s3)
+    self.assertEqual(11, report.getCount())
+    s1 = report.getType('sample.S1')
+    self.assertEqual(10, s1.getCount())
+    self.assertEqual(10 * sys.getsizeof(s3.getSList()[0]), s1.getSize())
+    fields = s1.getFieldSizes()
+    self.assertEqual(
+        sum(sys.getsizeof(s.getScalarString()) for s in s3.getSList()), fields['scalarString'])
+    # Containers include their contents.
+    self.assertEqual(
+        sum(sys.getsizeof(s.getListInt()) + sum(map(sys.getsizeof, s.getListInt()))
+            for s in s3.getSList()),
+        fields['listInt'])
+    self.assertGreater(fields['mapIntString'], 0)
+    # The defaults are shared, so they are counted once.
+    self.assertEqual(0, fields['setInt'])
+    self.assertIn(PRESENT, fields)
+    self.assertEqual(report.getTotal(), sum(usage.getTotal() for usage in report.getTypes()))
+    self.assertEqual('sample.S1', report.getTypes()[0].getName())
+    text = report.format()
+    self.assertIn('sample.S1', text)
+    self.assertIn('.scalarString', text)
+
+  def testSharedObjects(self):
+    shared = createS1(3)
+    s4 = sample.S4().setSharedLeft(shared).setSharedRight(shared)
+    s4.getMutableSharedList().extend([shared, shared])
+    report = measure(s4)
+    self.assertEqual(1, report.getType('sample.S1').getCount())
+    self.assertEqual(1, report.getType('sample.S4').getCount())
+    self.assertEqual(2, report.getCount())
+
+  def testCompactLayout(self):
+    # Empty collections are replaced by the shared empty instances when frozen.
+    s1 = sample.S1()
+    s1.getMutableSetInt()
+    s1.getMutableMapIntString()
+    s1.getMutableMapStringInt()[''] = 0
+    s1.freeze()
+    self.assertIs(Object.EMPTY_SET, s1.getSetInt())
+    self.assertIs(Object.EMPTY_MAP, s1.getMapIntString())
+    self.assertIsInstance(s1.getMapStringInt(), FrozenDict)
+    self.assertEqual({'': 0}, dict(s1.getMapStringInt()))
+    self.assertFalse(hasattr(s1.getMapStringInt(), '__dict__'))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,6 +1,9 @@
 '''Unit tests for CODA object class'''
 from coda import descriptors
+from coda.io.binarycodec import BinaryCodec
 import unittest
+from unittest import mock
+import finddata
 
 class ObjectTest(unittest.TestCase):
   def testEq(self):
@@ -22,3 +25,219 @@ class ObjectTest(unittest.TestCase):
     self.assertEqual(hash(v1), hash(v2))
     self.assertNotEqual(hash(v1), hash(v3))
     self.assertNotEqual(hash(v1), hash(v4))
+
+  def testPresence(self):
+    sample = finddata.sample
+    s4 = sample.S4().setSharedLeft(sample.S1()).setScalarI32(0)
+    self.assertTrue(s4.hasSharedLeft())
+    self.assertTrue(s4.hasScalarI32())
+    self.assertFalse(s4.hasSharedRight())
+    self.assertFalse(s4.hasScalarI16())
+    fields = {field.getName(): field for field in sample.S4.DESCRIPTOR.getAllFields()}
+    self.assertTrue(fields['sharedLeft'].isPresent(s4))
+    self.assertTrue(fields['scalarI32'].isPresent(s4))
+    self.assertFalse(fields['scalarI16'].isPresent(s4))
+    fields['scalarI16'].setValue(s4, 7)
+    self.assertTrue(s4.hasScalarI16())
+    copy = s4.shallowCopy()
+    s4.clearScalarI32()
+    self.assertFalse(s4.hasScalarI32())
+    self.assertFalse(fields['scalarI32'].isPresent(s4))
+    self.assertTrue(copy.hasScalarI32())
+    self.assertTrue(s4.hasSharedLeft())
+
+  def testPresenceBits(self):
+    # Every field in a class hierarchy has its own bit, the same one used by the
+    # generated accessors.
+    sample = finddata.sample
+    for cls in (sample.S1, sample.S2, sample.S3, sample.S4, descriptors.FieldOptions):
+      names = [field.getName() for field in cls.DESCRIPTOR.getAllFields()]
+      self.assertEqual(len(names), len(set(cls.__fieldBits__[name] for name in names)))
+      for name in names:
+        hasMethod = getattr(cls, 'has' + name[0].upper() + name[1:], None)
+        if hasMethod is not None:
+          obj = cls()
+          obj._setPresent(name)
+          self.assertTrue(hasMethod(obj), name)
+
+  def testPresenceUnknownField(self):
+    s1 = finddata.sample.S1()
+    for method in (s1._isPresent, s1._setPresent, s1._clearPresent):
+      with self.assertRaises(AssertionError):
+        method('scalarI33')
+
+  def testHashCached(self):
+    sample = finddata.sample
+    s1 = sample.S1().setScalarI32(5).setScalarString('five').freeze()
+    expected = hash(s1)
+    with mock.patch.object(sample.S1, '_hashImpl') as hashImpl:
+      self.assertEqual(expected, hash(s1))
+      self.assertFalse(hashImpl.called)
+    copy = s1.shallowCopy()
+    with self.assertRaises(AssertionError):
+      hash(copy)
+    copy.setScalarI32(6).freeze()
+    self.assertNotEqual(expected, hash(copy))
+
+  def testHashCachedInState(self):
+    # The cached hash shares a slot with the mutable flag, so small hashes must not be
+    # mistaken for it.
+    sample = finddata.sample
+    for value in (0, 1):
+      s1 = sample.S1().freeze()
+      with mock.patch.object(sample.S1, '_hashImpl', return_value=value) as hashImpl:
+        self.assertEqual(value, hash(s1))
+        self.assertEqual(value, hash(s1))
+        self.assertEqual(1, hashImpl.call_count)
+      self.assertFalse(s1.isMutable())
+      self.assertTrue(s1.shallowCopy().isMutable())
+
+  def testEqualityShortCircuit(self):
+    sample = finddata.sample
+    s1 = sample.S1().setScalarI32(5).freeze()
+    s2 = sample.S1().setScalarI32(6).freeze()
+    s3 = sample.S1().setScalarI32(5).freeze()
+    with mock.patch.object(sample.S1, '_equalsImpl') as equalsImpl:
+      self.assertTrue(s1 == s1)
+      # Hashes have not been computed yet, so the fields are compared.
+      s1 == s2
+      self.assertTrue(equalsImpl.called)
+      equalsImpl.reset_mock()
+      hash(s1), hash(s2)
+      self.assertFalse(s1 == s2)
+      self.assertFalse(equalsImpl.called)
+    hash(s3)
+    self.assertEqual(s1, s3)
+    self.assertEqual(1, len({s1, s3}))
+    self.assertEqual(2, len({s1, s2, s3}))
+
+  def testFreezeDeepGraph(self):
+    sample = finddata.sample
+    root = node = sample.S2()
+    for i in range(100000):
+      child = sample.S2()
+      node.setLeft(child)
+      node = child
+    root.freeze()
+    self.assertFalse(node.isMutable())
+
+  def testFreezeDeepArgument(self):
+    # Any true value of 'deep' freezes the whole graph.
+    sample = finddata.sample
+    for deep in (True, 1, [None]):
+      s2 = sample.S2().setLeft(sample.S1())
+      self.assertIs(s2, s2.freeze(deep))
+      self.assertFalse(s2.isMutable())
+      self.assertFalse(s2.getLeft().isMutable())
+    s2 = sample.S2().setLeft(sample.S1()).freeze(False)
+    self.assertTrue(s2.getLeft().isMutable())
+
+  def testFreezeShared(self):
+    sample = finddata.sample
+    a = sample.S4()
+    b = sample.S4().setSharedLeft(a)
+    a.setSharedLeft(b).setSharedRight(b)
+    a.getMutableSharedList().extend([b, sample.S1()])
+    with mock.patch.object(sample.S4, '_freezeImpl', autospec=True,
+        side_effect=sample.S4._freezeImpl) as freezeImpl:
+      a.freeze()
+      self.assertEqual(2, freezeImpl.call_count)
+    self.assertFalse(b.isMutable())
+    self.assertFalse(a.getSharedList()[1].isMutable())
+
+  def testFreezeSkipsFrozen(self):
+    sample = finddata.sample
+    frozen = sample.S1().freeze()
+    mutable = sample.S1()
+    s3 = sample.S3()
+    s3.getMutableSList().extend([frozen, mutable])
+    with mock.patch.object(sample.S1, '_freezeImpl', autospec=True,
+        side_effect=sample.S1._freezeImpl) as freezeImpl:
+      copy = s3.shallowCopy().freeze(False)
+      self.assertTrue(mutable.isMutable())
+      s3.freeze()
+      # S3._freezeImpl() calls S1._freezeImpl() for the S3 itself.
+      self.assertEqual([id(copy), id(s3), id(mutable)],
+          [id(args[0]) for args, kw in freezeImpl.call_args_list])
+    self.assertFalse(mutable.isMutable())
+
+  def testClone(self):
+    sample = finddata.sample
+    s3 = sample.S3().setScalarI32(3).setScalarString('three')
+    s3.getMutableListInt().extend([1, 2, 3])
+    s3.getMutableMapIntString()[1] = 'one'
+    child = sample.S1().setScalarI32(4)
+    s3.getMutableSList().append(child)
+    s3.getMutableSMap()[5] = child
+    copy = s3.clone()
+    self.assertEqual(s3, copy)
+    self.assertTrue(copy.isMutable())
+    self.assertIsNot(s3.getListInt(), copy.getListInt())
+    self.assertIsNot(s3.getMapIntString(), copy.getMapIntString())
+    self.assertIsNot(child, copy.getSList()[0])
+    # A struct referred to twice is copied once.
+    self.assertIs(copy.getSList()[0], copy.getSMap()[5])
+    copy.getMutableListInt().append(4)
+    copy.getSList()[0].setScalarI32(5)
+    self.assertEqual([1, 2, 3], s3.getListInt())
+    self.assertEqual(4, child.getScalarI32())
+
+  def testCloneShared(self):
+    sample = finddata.sample
+    a = sample.S4()
+    b = sample.S4().setSharedLeft(a)
+    a.setSharedLeft(b).setSharedRight(b)
+    copy = a.clone()
+    self.assertIsNot(b, copy.getSharedLeft())
+    self.assertIs(copy.getSharedLeft(), copy.getSharedRight())
+    self.assertIs(copy, copy.getSharedLeft().getSharedLeft())
+
+  def testCloneFrozen(self):
+    sample = finddata.sample
+    frozen = sample.S1().setScalarI32(1).freeze()
+    s2 = sample.S2().setLeft(frozen).setRight(sample.S1())
+    copy = s2.clone()
+    self.assertIs(frozen, copy.getLeft())
+    self.assertIsNot(s2.getRight(), copy.getRight())
+    # A frozen object is copied only at the root.
+    s2.freeze()
+    copy = s2.clone()
+    self.assertTrue(copy.isMutable())
+    self.assertIs(s2.getRight(), copy.getRight())
+    copy.getMutableRight().setScalarI32(2)
+    self.assertFalse(s2.getRight().hasScalarI32())
+
+  def testCloneLazy(self):
+    sample = finddata.sample
+    s3 = sample.S3()
+    s3.getMutableSList().extend(sample.S1().setScalarI32(i) for i in range(3))
+    data = BinaryCodec.encodeToBytes(s3)
+    for loadFirst in (False, True):
+      source = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S3)
+      if loadFirst:
+        source.getSList()
+      copy = source.clone()
+      copy.getMutableSList()[0] = sample.S1().setScalarI32(99)
+      copy.getSList()[1].setScalarI32(98)
+      self.assertEqual([0, 1, 2], [s1.getScalarI32() for s1 in source.getSList()])
+      self.assertEqual([99, 98, 2], [s1.getScalarI32() for s1 in copy.getSList()])
+      # A second clone gets its own placeholders too.
+      self.assertEqual(s3, source.clone())
+
+  def testCloneLazyShared(self):
+    sample = finddata.sample
+    shared = sample.S1().setScalarI32(1)
+    s4 = sample.S4().setSharedLeft(shared).setSharedRight(shared)
+    s4.getMutableSharedList().append(shared)
+    data = BinaryCodec.encodeToBytes(s4)
+    copy = BinaryCodec.createBufferDecoder(data, lazy=True).decode(sample.S4).clone()
+    self.assertIs(copy.getSharedLeft(), copy.getSharedRight())
+    self.assertIs(copy.getSharedLeft(), copy.getSharedList()[0])
+
+  def testCloneDescriptor(self):
+    # Classes without a generated _cloneImpl() have their slots copied as they are.
+    field = descriptors.StructType.Field().setName('test').setId(1)
+    copy = field.clone()
+    self.assertTrue(copy.isMutable())
+    self.assertEqual('test', copy.getName())
+    self.assertEqual(1, copy.getId())
@@ -0,0 +1,160 @@
+'''Unit tests for parallel decoding and encoding of CODA record files'''
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+from coda.io.codec import EncodingError
+from coda.io.parallel import decodeAll, encodeAll, splitRecords
+from coda.io.recordfile import RecordReader, RecordWriter
+import finddata
+
+sample = finddata.sample
+
+def createRecord(i):
+  s1 = sample.S1()
+  s1.setScalarI32(i)
+  s1.setScalarString('record {0}'.format(i))
+  if i % 10:
+    s1.getMutableListInt().extend(range(i % 10))
+  return s1
+
+def sumScalarI32(records):
+  return sum(record.getScalarI32() for record in records)
+
+def createTempFile(test):
+  fd, path = tempfile.mkstemp(suffix='.rec')
+  os.close(fd)
+  test.addCleanup(os.remove, path)
+  return path
+
+class ParallelDecodeTest(unittest.TestCase):
+  def createFile(self, records):
+    path = createTempFile(self)
+    with RecordWriter.open(path, append=False) as writer:
+      writer.writeAll(records)
+    return path
+
+  def testDecodeAll(self):
+    path = self.createFile(createRecord(i) for i in range(100))
+    self.assertEqual([createRecord(i) for i in range(100)],
+                     list(decodeAll(path, sample.S1, workers=2, minParallelBytes=0)))
+    self.assertEqual([createRecord(i) for i in range(100)],
+                     list(decodeAll(path, sample.S1, workers=3, chunkSize=7,
+                                    minParallelBytes=0)))
+
+  def testCallback(self):
+    path = self.createFile(createRecord(i) for i in range(100))
+    results = list(decodeAll(path, sample.S1, workers=2, callback=sumScalarI32, chunkSize=10,
+                           minParallelBytes=0))
+    self.assertEqual(10, len(results))
+    self.assertEqual(sum(range(100)), sum(results))
+
+  def testSubtypes(self):
+    s2 = sample.S2().setLeft(createRecord(1))
+    path = self.createFile([createRecord(0), s2, sample.S1()])
+    records = list(decodeAll(path, sample.S1, workers=2, minParallelBytes=0))
+    self.assertEqual([createRecord(0), s2, sample.S1()], records)
+    self.assertIsInstance(records[1], sample.S2)
+
+  def testSpawnedWorkers(self):
+    # Spawned workers do not inherit the parent's modules, so the module containing
+    # the sample types has to be loaded from its file.
+    path = self.createFile(createRecord(i) for i in range(20))
+    records = decodeAll(path, sample.S1, workers=2, minParallelBytes=0,
+                        mpContext=multiprocessing.get_context('spawn'))
+    self.assertEqual([createRecord(i) for i in range(20)], list(records))
+
+  def testInProcess(self):
+    path = self.createFile(createRecord(i) for i in range(100))
+    with mock.patch('concurrent.futures.ProcessPoolExecutor') as pool:
+      # The file is too small to be worth starting the workers.
+      self.assertEqual([createRecord(i) for i in range(100)],
+                       list(decodeAll(path, sample.S1, workers=2)))
+      results = list(decodeAll(path, sample.S1, workers=1, callback=sumScalarI32,
+                               chunkSize=10, minParallelBytes=0))
+      self.assertEqual(10, len(results))
+      self.assertEqual(sum(range(100)), sum(results))
+      self.assertFalse(pool.called)
+
+  def testEmptyFile(self):
+    path = self.createFile([])
+    self.assertEqual([], list(decodeAll(path, sample.S1, workers=2, minParallelBytes=0)))
+
+  def testSplitRecords(self):
+    path = self.createFile(createRecord(i) for i in range(10))
+    chunks = splitRecords(path, chunkSize=3)
+    self.assertEqual(4, len(chunks))
+    self.assertEqual(0, chunks[0][0])
+    self.assertEqual(os.path.getsize(path), chunks[-1][1])
+    for (start, end), (nextStart, nextEnd) in zip(chunks, chunks[1:]):
+      self.assertEqual(end, nextStart)
+    self.assertEqual(1, len(splitRecords(path, chunkCount=1)))
+
+  def testTruncatedFile(self):
+    path = self.createFile(createRecord(i) for i in range(10))
+    with open(path, 'r+b') as fh:
+      fh.truncate(os.path.getsize(path) - 1)
+    with self.assertRaises(EncodingError):
+      list(decodeAll(path, sample.S1, workers=2, minParallelBytes=0))
+
+class ParallelEncodeTest(unittest.TestCase):
+  def encodeSerial(self, records, framed=False):
+    path = createTempFile(self)
+    with RecordWriter.open(path, append=False, framed=framed) as writer:
+      writer.writeAll(records)
+    with open(path, 'rb') as fh:
+      return fh.read()
+
+  def testEncodeAll(self):
+    path = createTempFile(self)
+    count = encodeAll((createRecord(i) for i in range(100)), path, workers=2, chunkSize=7,
+                      minParallelObjects=0)
+    self.assertEqual(100, count)
+    with open(path, 'rb') as fh:
+      self.assertEqual(self.encodeSerial(createRecord(i) for i in range(100)), fh.read())
+    with RecordReader.open(path, sample.S1) as reader:
+      self.assertEqual([createRecord(i) for i in range(100)], list(reader))
+
+  def testFramedAndAppend(self):
+    path = createTempFile(self)
+    encodeAll([createRecord(i) for i in range(5)], path, workers=2, framed=True,
+              minParallelObjects=0)
+    encodeAll([createRecord(i) for i in range(5, 10)], path, workers=2, framed=True,
+              append=True, minParallelObjects=0)
+    with open(path, 'rb') as fh:
+      self.assertEqual(
+          self.encodeSerial((createRecord(i) for i in range(10)), framed=True), fh.read())
+
+  def testMixedTypes(self):
+    path = createTempFile(self)
+    records = [createRecord(0), sample.S2().setLeft(createRecord(1)), sample.S1()]
+    self.assertEqual(3, encodeAll(records, path, workers=2, minParallelObjects=0))
+    with RecordReader.open(path, sample.S1) as reader:
+      self.assertEqual(records, list(reader))
+
+  def testSpawnedWorkers(self):
+    path = createTempFile(self)
+    encodeAll((createRecord(i) for i in range(20)), path, workers=2, chunkSize=4,
+              minParallelObjects=0, mpContext=multiprocessing.get_context('spawn'))
+    with RecordReader.open(path, sample.S1) as reader:
+      self.assertEqual([createRecord(i) for i in range(20)], list(reader))
+
+  def testEmpty(self):
+    path = createTempFile(self)
+    self.assertEqual(0, encodeAll([], path, workers=2, minParallelObjects=0))
+    self.assertEqual(0, os.path.getsize(path))
+
+  def testInProcess(self):
+    path = createTempFile(self)
+    with mock.patch('concurrent.futures.ProcessPoolExecutor') as pool:
+      # Too few objects to be worth starting the workers.
+      self.assertEqual(100, encodeAll((createRecord(i) for i in range(100)), path, workers=2))
+      encodeAll([createRecord(i) for i in range(100, 110)], path, workers=1, append=True,
+                minParallelObjects=0)
+      self.assertFalse(pool.called)
+    with open(path, 'rb') as fh:
+      self.assertEqual(self.encodeSerial(createRecord(i) for i in range(110)), fh.read())
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,138 @@
+'''Unit tests for CODA record files'''
+import io
+import os
+import tempfile
+import unittest
+from coda.io.binarycodec import BinaryCodec
+from coda.io.codec import EncodingError
+from coda.io.recordfile import RecordReader, RecordWriter
+import finddata
+
+sample = finddata.sample
+
+def createRecord(i):
+  s1 = sample.S1()
+  s1.setScalarI32(i)
+  s1.setScalarString('record {0}'.format(i))
+  if i > 0:
+    s1.getMutableListInt().extend(range(i))
+  return s1
+
+class RecordFileTest(unittest.TestCase):
+  def testWriteRead(self):
+    stream = io.BytesIO()
+    writer = RecordWriter(stream)
+    writer.writeAll(createRecord(i) for i in range(20))
+    self.assertEqual(len(stream.getvalue()), writer.getOffset())
+    stream.seek(0)
+    records = list(RecordReader(stream, sample.S1))
+    self.assertEqual(20, len(records))
+    for i, record in enumerate(records):
+      self.assertEqual(createRecord(i), record)
+
+  def testEmptyStream(self):
+    reader = RecordReader(io.BytesIO(), sample.S1)
+    self.assertEqual([], list(reader))
+    self.assertIsNone(reader.read())
+
+  def testEmptyRecord(self):
+    # An object with no fields set encodes as an empty record.
+    stream = io.BytesIO()
+    RecordWriter(stream).write(sample.S1()).write(createRecord(3))
+    stream.seek(0)
+    reader = RecordReader(stream, sample.S1)
+    self.assertEqual(sample.S1(), reader.read())
+    self.assertEqual(createRecord(3), reader.read())
+    self.assertIsNone(reader.read())
+
+  def testSubtypeRecords(self):
+    stream = io.BytesIO()
+    s2 = sample.S2().setLeft(createRecord(1)).setRight(createRecord(2))
+    RecordWriter(stream).write(s2).write(createRecord(3))
+    stream.seek(0)
+    first, second = RecordReader(stream, sample.S1)
+    self.assertIsInstance(first, sample.S2)
+    self.assertEqual(createRecord(2), first.getRight())
+    self.assertEqual(createRecord(3), second)
+
+  def testFramedRecords(self):
+    stream = io.BytesIO()
+    RecordWriter(stream, framed=True).writeAll(createRecord(i) for i in range(5))
+    stream.seek(0)
+    self.assertEqual([createRecord(i) for i in range(5)], list(RecordReader(stream, sample.S1)))
+
+  def testTruncatedRecord(self):
+    stream = io.BytesIO()
+    RecordWriter(stream).write(createRecord(1)).write(createRecord(5))
+    data = stream.getvalue()
+    reader = RecordReader(io.BytesIO(data[:-1]), sample.S1)
+    self.assertEqual(createRecord(1), reader.read())
+    with self.assertRaises(EncodingError):
+      reader.read()
+
+  def testAppendToFile(self):
+    fd, path = tempfile.mkstemp(suffix='.rec')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    with RecordWriter.open(path, append=False) as writer:
+      writer.write(createRecord(1))
+    with RecordWriter.open(path) as writer:
+      writer.write(createRecord(2))
+    with RecordReader.open(path, sample.S1) as reader:
+      self.assertEqual([createRecord(1), createRecord(2)], list(reader))
+
+  def testKeepTables(self):
+    shared = createRecord(10)
+    records = [sample.S4().setSharedLeft(shared).setSharedRight(createRecord(i))
+               for i in range(10)]
+    sizes = []
+    for keepTables in (False, True):
+      stream = io.BytesIO()
+      RecordWriter(stream, keepTables=keepTables).writeAll(records)
+      sizes.append(len(stream.getvalue()))
+      stream.seek(0)
+      decoded = list(RecordReader(stream, sample.S1))
+      self.assertEqual(records, decoded)
+      self.assertEqual(keepTables, decoded[0].getSharedLeft() is decoded[9].getSharedLeft())
+    self.assertLess(sizes[1], sizes[0] - 9 * len(BinaryCodec.encodeToBytes(shared)) // 2)
+
+  def testKeepStringTable(self):
+    records = [createRecord(i % 3) for i in range(12)]
+    stream = io.BytesIO()
+    RecordWriter(stream, framed=True, stringTable=True, keepTables=True).writeAll(records)
+    stream.seek(0)
+    self.assertEqual(records, list(RecordReader(stream, sample.S1)))
+
+  def testResetPoints(self):
+    shared = createRecord(10)
+    records = [sample.S4().setSharedLeft(shared).setSharedRight(createRecord(i))
+               for i in range(10)]
+    stream = io.BytesIO()
+    writer = RecordWriter(stream, stringTable=True, keepTables=True, resetInterval=4)
+    resetOffsets = []
+    for record in records:
+      writer.write(record)
+      resetOffsets.append(writer.getResetOffset())
+    self.assertEqual(3, len(set(resetOffsets)))
+    data = stream.getvalue()
+    for i in (4, 8):
+      reader = RecordReader(io.BytesIO(data[resetOffsets[i]:]), sample.S1)
+      self.assertEqual(records[i:], list(reader))
+    # A record that continues the tables of an earlier one can't be read on its own.
+    reader = RecordReader(io.BytesIO(data[resetOffsets[4]:]), sample.S1)
+    reader.readRecord()
+    with self.assertRaises(EncodingError):
+      reader.read()
+
+  def testExplicitReset(self):
+    stream = io.BytesIO()
+    writer = RecordWriter(stream, keepTables=True)
+    writer.write(sample.S1()).write(createRecord(2))
+    offset = writer.reset().getOffset()
+    writer.write(createRecord(3))
+    self.assertEqual(offset, writer.getResetOffset())
+    reader = RecordReader(io.BytesIO(stream.getvalue()[offset:]), sample.S1)
+    self.assertEqual([createRecord(3)], list(reader))
+
+if __name__ == '__main__':
+  unittest.main()
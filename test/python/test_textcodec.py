@@ -1,9 +1,11 @@
 '''Unit tests for CODA text serialization'''
 import io
 import unittest
+from unittest import mock
 from coda import descriptors
 from coda.io.textcodec import TextCodec
 from coda.runtime.descdata import BoolValue
+from coda.types import TypeKind
 import finddata
 
 class TextCodecTest(unittest.TestCase):
@@ -36,6 +38,15 @@ class TextCodecTest(unittest.TestCase):
     self.assertIsInstance(st, descriptors.StructType)
     self.assertEqual(st.getFullName(), descriptors.StructType.DESCRIPTOR.getFullName())
     
+  def testPackedSet(self):
+    buffer = io.StringIO()
+    encoder = TextCodec.createEncoder(buffer)
+    with mock.patch.object(encoder, 'writeBeginSet', wraps=encoder.writeBeginSet) as beginSet:
+      encoder.writePackedList(TypeKind.INTEGER, 32, {1, 2})
+      encoder.writePackedList(TypeKind.INTEGER, 32, [3])
+    self.assertEqual(1, beginSet.call_count)
+    self.assertIn('3', buffer.getvalue())
+
   def testDecodeSample(self):
     sample = finddata.sample
     
@@ -103,6 +114,8 @@ class TextCodecTest(unittest.TestCase):
     self.assertListEqual([110.0, 110.1, 110.2], s1.getListFloat())
     self.assertListEqual(['beta', 'delta\0', 'yin-yan: ☯'], s1.getListString())
     self.assertListEqual([sample.E.E1, sample.E.E2, sample.E.E1], s1.getListEnum())
+    self.assertListEqual([120, 121, 122], s1.getListFixedInt())
+    self.assertListEqual([130.0, 130.5, 131.0], s1.getListFixedFloat())
 
     # Sets
     self.assertSetEqual({200, 201, 202}, s1.getSetInt())